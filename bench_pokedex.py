@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+PyDex Benchmarks: Repeatable performance measurements, fully offline.
+
+Every benchmark runs against a local `mock_pokeapi.MockPokeAPI` server (with
+optional latency, jitter and error rates, and optionally recorded fixtures)
+and a throwaway cache directory, so results don't depend on the live
+PokeAPI or on what happens to be cached on this machine.
+
+Benchmarks:
+- single_cold: one lookup with an empty cache (includes the name listing).
+- single_warm: the same lookup answered from the cache.
+- batch_cold / batch_warm: looking up the whole mock dex with `fetch_many`.
+- cli_startup: `import pokedex` in a fresh interpreter.
+- cli_lookup: `python pokedex.py 25` end to end, with a warm cache.
+- gui_render: `PokedexGUI.display_pokemon` (skipped without a display).
+- gui_scroll: one scroll step of the browse grid, top to bottom of the
+  whole dex (skipped without a display).
+
+PyDex's rate limit (see `pokedex_scheduler`) is switched off unless
+`--rate` is given, since the mock server doesn't need protecting and the
+limit would dominate every cold measurement.
+
+Results are printed as JSON (timings in milliseconds) so they can be saved
+and compared between releases; `--compare` exits with status 1 if any
+median got slower than the baseline by more than `--threshold`.
+
+Usage Examples:
+    python bench_pokedex.py
+    python bench_pokedex.py --latency 0.1 --jitter 0.05 --error-rate 0.02
+    python bench_pokedex.py --output baseline.json
+    python bench_pokedex.py --compare baseline.json
+    python bench_pokedex.py --only single_warm batch_warm --repeat 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_pokeapi import MockPokeAPI, load_fixtures, synthetic_dex
+
+BENCHMARKS = ("single_cold", "single_warm", "batch_cold", "batch_warm",
+              "cli_startup", "cli_lookup", "gui_render", "gui_scroll")
+
+# A median this much slower than the baseline counts as a regression.
+DEFAULT_THRESHOLD = 0.25
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def summarize(samples, **extra):
+    """
+    Reduces timing samples (in seconds) to a JSON-friendly summary.
+
+    Args:
+        samples (list of float): Durations in seconds.
+        **extra: Additional fields to include.
+
+    Returns:
+        dict: Run count and the median, minimum, 95th percentile and
+              maximum in milliseconds.
+    """
+    ordered = sorted(samples)
+    result = {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+class BenchEnvironment:
+    """
+    A mock PokeAPI plus scratch cache directories for the benchmarks.
+
+    PyDex keeps its cache, snapshot, name index and HTTP client in
+    process-wide singletons; `fresh_cache` resets all of them so a "cold"
+    measurement really starts from nothing.
+    """
+
+    def __init__(self, api, workers=8, rate=0):
+        import pokedex_client
+
+        self.api = api
+        self.workers = workers
+        self.rate = rate
+        self.ids = sorted(api.pokemon)
+        self._root = tempfile.mkdtemp(prefix="pydex-bench-")
+        pokedex_client.API_BASE_URL = api.base_url
+
+    def fresh_cache(self):
+        """Points PyDex at a new, empty cache directory and drops its shared state."""
+        import pokedex_cache
+        import pokedex_client
+        import pokedex_image
+        import pokedex_index
+        import pokedex_snapshot
+
+        if isinstance(pokedex_cache._default_cache, pokedex_cache.ResponseCache):
+            pokedex_cache._default_cache.close()
+        os.environ["PYDEX_CACHE_DIR"] = tempfile.mkdtemp(dir=self._root)
+        pokedex_cache._default_cache = None
+        pokedex_snapshot._default_snapshot = None
+        pokedex_image._default_image = None
+        pokedex_index._name_index = None
+        pokedex_index._name_index_retry_at = 0.0
+        pokedex_client.configure(rate=self.rate)  # new connection pool, too
+
+    def subprocess_env(self):
+        """Environment for running the CLI against the mock server."""
+        return dict(os.environ, PYDEX_API_URL=self.api.base_url, PYDEX_RATE=str(self.rate))
+
+    def run_cli(self, *args):
+        subprocess.run([sys.executable] + list(args), cwd=_HERE, env=self.subprocess_env(),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    def close(self):
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+def bench_single_cold(env, repeat):
+    from pokedex import load_pokemon_data
+
+    samples = []
+    for run in range(repeat):
+        env.fresh_cache()
+        samples.append(_timed(load_pokemon_data, str(env.ids[run % len(env.ids)])))
+    return summarize(samples)
+
+
+def bench_single_warm(env, repeat):
+    from pokedex import load_pokemon_data
+
+    env.fresh_cache()
+    identifier = str(env.ids[len(env.ids) // 2])
+    load_pokemon_data(identifier)
+    return summarize([_timed(load_pokemon_data, identifier) for _ in range(repeat * 10)])
+
+
+def _fetch_all(env):
+    from pokedex import fetch_many
+
+    for _, _, error in fetch_many([str(pokemon_id) for pokemon_id in env.ids], workers=env.workers):
+        if error:
+            raise RuntimeError(error)
+
+
+def bench_batch_cold(env, repeat):
+    samples = []
+    for _ in range(repeat):
+        env.fresh_cache()
+        samples.append(_timed(_fetch_all, env))
+    median = statistics.median(samples)
+    return summarize(samples, pokemon=len(env.ids), per_second=round(len(env.ids) / median, 1))
+
+
+def bench_batch_warm(env, repeat):
+    env.fresh_cache()
+    _fetch_all(env)
+    samples = [_timed(_fetch_all, env) for _ in range(repeat)]
+    median = statistics.median(samples)
+    return summarize(samples, pokemon=len(env.ids), per_second=round(len(env.ids) / median, 1))
+
+
+def bench_cli_startup(env, repeat):
+    return summarize([_timed(env.run_cli, "-c", "import pokedex") for _ in range(repeat)])
+
+
+def bench_cli_lookup(env, repeat):
+    env.fresh_cache()
+    env.run_cli("pokedex.py", "25")  # warm the cache
+    return summarize([_timed(env.run_cli, "pokedex.py", "25") for _ in range(repeat)])
+
+
+def bench_gui_render(env, repeat):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        return {"skipped": f"no display ({e.__class__.__name__})"}
+
+    from pokedex import load_pokemon_data
+    from pokedex_gui import PokedexGUI
+
+    try:
+        root.withdraw()
+        app = PokedexGUI(root)
+        env.fresh_cache()
+        records = [load_pokemon_data(str(pokemon_id)) for pokemon_id in env.ids[:10]]
+
+        def render(record):
+            app.display_pokemon(record)
+            root.update_idletasks()
+
+        first = _timed(render, records[0])
+        samples = [_timed(render, records[run % len(records)]) for run in range(repeat * 10)]
+        return summarize(samples, first_ms=round(first * 1000, 3))
+    finally:
+        app.executor.shutdown(wait=False)
+        app.prefetcher.shutdown(wait=False)
+        app.thumbnailer.shutdown(wait=False)
+        root.destroy()
+
+
+def bench_gui_scroll(env, repeat):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        return {"skipped": f"no display ({e.__class__.__name__})"}
+
+    from pokedex_gui import PokedexGUI
+    from pokedex_index import build_name_index
+
+    try:
+        # The grid only lays out the rows in view, so the window must be shown
+        app = PokedexGUI(root)
+        env.fresh_cache()
+        app.build_browse()
+        app.show_view(app.browse_frame)
+        app.on_browse_index_loaded(build_name_index())
+        root.update()
+
+        def scroll(step):
+            app.grid_canvas.yview_scroll(step, "units")
+            root.update_idletasks()
+
+        samples = []
+        for _ in range(repeat):
+            app.grid_canvas.yview_moveto(0)
+            while app.grid_canvas.yview()[1] < 1.0:
+                samples.append(_timed(scroll, 1))
+        return summarize(samples, cells=len(app.grid_cells), entries=len(app.grid_entries))
+    finally:
+        app.executor.shutdown(wait=False)
+        app.prefetcher.shutdown(wait=False)
+        app.thumbnailer.shutdown(wait=False)
+        root.destroy()
+
+
+def run_benchmarks(env, names=BENCHMARKS, repeat=5, progress=None):
+    """
+    Runs the named benchmarks.
+
+    Args:
+        env (BenchEnvironment): The mock server and scratch directories.
+        names (iterable of str, optional): Benchmarks to run, from
+                                           `BENCHMARKS`.
+        repeat (int, optional): Samples per benchmark (cheap benchmarks
+                                take ten times as many).
+        progress (callable, optional): Called with each benchmark's name
+                                       before it starts.
+
+    Returns:
+        dict: Summaries keyed by benchmark name.
+    """
+    results = {}
+    for name in names:
+        if progress:
+            progress(name)
+        results[name] = globals()[f"bench_{name}"](env, repeat)
+    return results
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Finds benchmarks whose median got slower than a baseline.
+
+    Args:
+        baseline (dict): A previous report (as produced by `main`).
+        current (dict): The new report.
+        threshold (float, optional): Allowed slowdown, e.g. 0.25 for 25%.
+
+    Returns:
+        list of tuple: `(name, baseline_ms, current_ms, ratio)` for each
+                       regression.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name, {}).get("median_ms")
+        after = result.get("median_ms")
+        if before and after and after > before * (1 + threshold):
+            regressions.append((name, before, after, round(after / before, 2)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PyDex against a local mock PokeAPI.")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, metavar="NAME",
+                        help=f"Benchmarks to run (default: all). Choices: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark (default: 5).")
+    parser.add_argument("--count", type=int, default=151,
+                        help="Size of the synthetic dex (default: 151).")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent requests in the batch benchmarks (default: 8).")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Mock server latency per request in seconds (default: 0.02).")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Extra random latency per request, up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests the mock answers with 503.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and errors.")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="PyDex's request rate limit in requests per second (default: 0, off).")
+    parser.add_argument("--fixtures", metavar="DIR",
+                        help="Serve recorded fixtures (see mock_pokeapi.py --record).")
+    parser.add_argument("--output", metavar="FILE", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Compare against a saved report; exit 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown for --compare (default: {DEFAULT_THRESHOLD}).")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        pokemon, resources = load_fixtures(args.fixtures)
+    else:
+        pokemon, resources = synthetic_dex(args.count), None
+    config = {
+        "pokemon": len(pokemon), "workers": args.workers, "repeat": args.repeat,
+        "latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+        "seed": args.seed, "fixtures": args.fixtures, "rate": args.rate,
+    }
+
+    with MockPokeAPI(pokemon, resources, latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, seed=args.seed) as api:
+        env = BenchEnvironment(api, workers=args.workers, rate=args.rate)
+        try:
+            results = run_benchmarks(env, args.only or BENCHMARKS, args.repeat,
+                                     progress=lambda name: print(f"running {name}...", file=sys.stderr))
+        finally:
+            env.close()
+
+    report = {
+        "schema": 1,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline, report, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before} ms -> {after} ms ({ratio}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
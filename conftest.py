@@ -0,0 +1,37 @@
+import pytest
+
+import pokedex_cache
+import pokedex_client
+import pokedex_evolution
+import pokedex_image
+import pokedex_index
+import pokedex_snapshot
+from mock_pokeapi import MockPokeAPI
+
+# test_pokedex.py is a standalone script (run it with `python test_pokedex.py`)
+# that talks to the live PokeAPI, so pytest should not try to collect it.
+collect_ignore = ["test_pokedex.py"]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Gives each test its own empty PyDex cache directory."""
+    monkeypatch.setenv("PYDEX_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pokedex_cache, "_default_cache", None)
+    monkeypatch.setattr(pokedex_snapshot, "_default_snapshot", None)
+    monkeypatch.setattr(pokedex_image, "_default_image", None)
+    monkeypatch.setattr(pokedex_index, "_name_index", None)
+    monkeypatch.setattr(pokedex_index, "_name_index_retry_at", 0.0)
+    monkeypatch.setattr(pokedex_evolution, "_evolution_graph", None)
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def mock_api(cache_dir, monkeypatch):
+    """Runs a local mock PokeAPI and points the shared client at it."""
+    with MockPokeAPI() as api:
+        monkeypatch.setattr(pokedex_client, "API_BASE_URL", api.base_url)
+        # The mock is local: no need to be polite to it.
+        pokedex_client.configure(backoff=0.001, rate=0)
+        yield api
+    pokedex_client.configure()
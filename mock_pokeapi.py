@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Mock PokeAPI: A local stand-in for the PokeAPI, for tests and offline work.
+
+Serves PokeAPI-shaped JSON from memory over plain HTTP, so PyDex can be
+exercised without touching the real API. Point PyDex at it with the
+PYDEX_API_URL environment variable.
+
+Latency, jitter and an error rate can be added to mimic a slow or flaky
+network, and recorded fixtures (real PokeAPI payloads saved as JSON files,
+see `record_fixtures`) can be served instead of the synthetic dex.
+
+Usage Examples:
+    python mock_pokeapi.py --port 8000
+    python mock_pokeapi.py --latency 0.05 --jitter 0.02 --error-rate 0.05
+    python mock_pokeapi.py --record fixtures/ --count 151   (needs network)
+    python mock_pokeapi.py --fixtures fixtures/
+    PYDEX_API_URL=http://127.0.0.1:8000/api/v2 python pokedex.py 25
+
+From Python:
+    with MockPokeAPI(latency=0.05) as api:
+        os.environ["PYDEX_API_URL"] = api.base_url
+        ...
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+# A few real names so the synthetic dex looks familiar; every other entry
+# gets a generated name.
+KNOWN_NAMES = {
+    1: "bulbasaur", 2: "ivysaur", 3: "venusaur", 4: "charmander",
+    5: "charmeleon", 6: "charizard", 7: "squirtle", 8: "wartortle",
+    9: "blastoise", 25: "pikachu", 26: "raichu", 122: "mr-mime",
+    133: "eevee", 150: "mewtwo", 151: "mew",
+}
+
+_TYPE_CYCLE = [
+    "grass", "fire", "water", "electric", "normal", "psychic", "bug",
+    "poison", "ground", "rock", "ghost", "dragon", "dark", "steel",
+    "fairy", "ice", "fighting", "flying",
+]
+
+# The real type chart: attacking type -> (super effective against,
+# not very effective against, no effect on).
+TYPE_CHART = {
+    "normal": ([], ["rock", "steel"], ["ghost"]),
+    "fighting": (["normal", "rock", "steel", "ice", "dark"],
+                 ["flying", "poison", "bug", "psychic", "fairy"], ["ghost"]),
+    "flying": (["fighting", "bug", "grass"], ["rock", "steel", "electric"], []),
+    "poison": (["grass", "fairy"], ["poison", "ground", "rock", "ghost"], ["steel"]),
+    "ground": (["poison", "rock", "steel", "fire", "electric"], ["bug", "grass"], ["flying"]),
+    "rock": (["flying", "bug", "fire", "ice"], ["fighting", "ground", "steel"], []),
+    "bug": (["grass", "psychic", "dark"],
+            ["fighting", "flying", "poison", "ghost", "steel", "fire", "fairy"], []),
+    "ghost": (["ghost", "psychic"], ["dark"], ["normal"]),
+    "steel": (["rock", "ice", "fairy"], ["steel", "fire", "water", "electric"], []),
+    "fire": (["bug", "steel", "grass", "ice"], ["rock", "fire", "water", "dragon"], []),
+    "water": (["ground", "rock", "fire"], ["water", "grass", "dragon"], []),
+    "grass": (["ground", "rock", "water"],
+              ["flying", "poison", "bug", "steel", "fire", "grass", "dragon"], []),
+    "electric": (["flying", "water"], ["grass", "electric", "dragon"], ["ground"]),
+    "psychic": (["fighting", "poison"], ["steel", "psychic"], ["dark"]),
+    "ice": (["flying", "ground", "grass", "dragon"], ["steel", "fire", "water", "ice"], []),
+    "dragon": (["dragon"], ["steel"], ["fairy"]),
+    "dark": (["ghost", "psychic"], ["fighting", "dark", "fairy"], []),
+    "fairy": (["fighting", "dragon", "dark"], ["poison", "steel", "fire"], []),
+}
+
+
+def type_resources(pokemon=None):
+    """
+    Builds PokeAPI-style /type payloads for the 18 types from `TYPE_CHART`.
+
+    Args:
+        pokemon (dict, optional): Pokémon payloads keyed by ID; each type
+                                  lists the ones that have it.
+
+    Returns:
+        dict: Payloads keyed by resource path (e.g. "type/fire"); each type
+              is listed under both its name and its ID.
+    """
+    def refs(names):
+        return [{"name": name, "url": f"/api/v2/type/{name}/"} for name in names]
+
+    members = {name: [] for name in TYPE_CHART}
+    for pokemon_id, data in sorted((pokemon or {}).items()):
+        for entry in data["types"]:
+            members.setdefault(entry["type"]["name"], []).append(
+                {"pokemon": {"name": data["name"], "url": f"/api/v2/pokemon/{pokemon_id}/"},
+                 "slot": entry["slot"]})
+
+    resources = {}
+    for type_id, (name, (double, half, none)) in enumerate(TYPE_CHART.items(), start=1):
+        relations = {
+            "double_damage_to": refs(double),
+            "half_damage_to": refs(half),
+            "no_damage_to": refs(none),
+            "double_damage_from": refs(t for t, chart in TYPE_CHART.items() if name in chart[0]),
+            "half_damage_from": refs(t for t, chart in TYPE_CHART.items() if name in chart[1]),
+            "no_damage_from": refs(t for t, chart in TYPE_CHART.items() if name in chart[2]),
+        }
+        payload = {"id": type_id, "name": name, "damage_relations": relations,
+                   "pokemon": members[name]}
+        resources[f"type/{name}"] = resources[f"type/{type_id}"] = payload
+    return resources
+
+
+def synthetic_pokemon(pokemon_id, name=None, moves=200):
+    """
+    Builds a deterministic PokeAPI-style /pokemon payload.
+
+    The payload includes bulky fields such as `moves` so response sizes
+    resemble the real API.
+
+    Args:
+        pokemon_id (int): The National Pokédex ID.
+        name (str, optional): The Pokémon's name. Defaults to a known name
+                              or "pokemon-<id>".
+        moves (int, optional): Number of filler moves to include.
+
+    Returns:
+        dict: The Pokémon payload.
+    """
+    name = name or KNOWN_NAMES.get(pokemon_id, f"pokemon-{pokemon_id}")
+    types = [_TYPE_CYCLE[pokemon_id % len(_TYPE_CYCLE)]]
+    if pokemon_id % 3 == 0:
+        types.append(_TYPE_CYCLE[(pokemon_id * 7) % len(_TYPE_CYCLE)])
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "height": 3 + pokemon_id % 20,
+        "weight": 40 + (pokemon_id * 37) % 900,
+        "base_experience": 64,
+        "types": [
+            {"slot": slot, "type": {"name": type_name, "url": f"/api/v2/type/{type_name}/"}}
+            for slot, type_name in enumerate(dict.fromkeys(types), start=1)
+        ],
+        "stats": [
+            {"base_stat": 20 + (pokemon_id * (index + 3) * 13) % 130, "effort": 0,
+             "stat": {"name": stat_name, "url": f"/api/v2/stat/{index + 1}/"}}
+            for index, stat_name in enumerate(STAT_NAMES)
+        ],
+        "abilities": [
+            {"ability": {"name": "overgrow", "url": "/api/v2/ability/65/"},
+             "is_hidden": False, "slot": 1},
+            {"ability": {"name": "chlorophyll", "url": "/api/v2/ability/34/"},
+             "is_hidden": True, "slot": 3},
+        ],
+        "sprites": {"front_default": None},
+        "species": {"name": name, "url": f"/api/v2/pokemon-species/{pokemon_id}/"},
+        "moves": [
+            {"move": {"name": f"move-{index}", "url": f"/api/v2/move/{index}/"},
+             "version_group_details": []}
+            for index in range(moves)
+        ],
+        "game_indices": [],
+    }
+
+
+def synthetic_dex(count=151, moves=200):
+    """Returns `count` synthetic Pokémon payloads, keyed by ID."""
+    return {pokemon_id: synthetic_pokemon(pokemon_id, moves=moves)
+            for pokemon_id in range(1, count + 1)}
+
+
+# The last National Pokédex ID of each generation.
+GENERATION_ENDS = (151, 251, 386, 493, 649, 721, 809, 905, 1025)
+
+_ROMAN = ("i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix")
+
+
+def generation_of(species_id):
+    """Returns the generation number (1-9) a species ID belongs to."""
+    for number, last in enumerate(GENERATION_ENDS, start=1):
+        if species_id <= last:
+            return number
+    return len(GENERATION_ENDS)
+
+
+def evolution_resources(pokemon):
+    """
+    Builds /pokemon-species, /evolution-chain and /generation payloads for
+    a dex.
+
+    Species are grouped into families of three consecutive IDs (1-3, 4-6,
+    ...), each evolving in a line at levels 16 and 36.
+
+    Args:
+        pokemon (dict): Pokémon payloads keyed by ID.
+
+    Returns:
+        dict: Payloads keyed by resource path (e.g. "pokemon-species/1",
+              "evolution-chain/1" or "generation/1"); species and
+              generations are also listed by name.
+    """
+    def ref(kind, key, name):
+        return {"name": name, "url": f"/api/v2/{kind}/{key}/"}
+
+    species = {}
+    for data in pokemon.values():
+        species_id = int(data["species"]["url"].rstrip("/").rsplit("/", 1)[-1])
+        species[species_id] = data["species"]["name"]
+
+    resources = {}
+    families = {}
+    for species_id in sorted(species):
+        families.setdefault((species_id - 1) // 3 + 1, []).append(species_id)
+    for chain_id, members in families.items():
+        link = None
+        for depth, species_id in reversed(list(enumerate(members))):
+            details = ([{"trigger": ref("evolution-trigger", 1, "level-up"),
+                         "min_level": 16 if depth == 1 else 36}] if depth else [])
+            link = {"species": ref("pokemon-species", species_id, species[species_id]),
+                    "evolution_details": details,
+                    "evolves_to": [link] if link else [],
+                    "is_baby": False}
+        resources[f"evolution-chain/{chain_id}"] = {"id": chain_id, "chain": link,
+                                                    "baby_trigger_item": None}
+        for depth, species_id in enumerate(members):
+            generation = generation_of(species_id)
+            payload = {
+                "id": species_id,
+                "name": species[species_id],
+                "evolution_chain": {"url": f"/api/v2/evolution-chain/{chain_id}/"},
+                "evolves_from_species": (ref("pokemon-species", members[depth - 1],
+                                             species[members[depth - 1]]) if depth else None),
+                "generation": ref("generation", generation, f"generation-{_ROMAN[generation - 1]}"),
+            }
+            resources[f"pokemon-species/{species_id}"] = payload
+            resources[f"pokemon-species/{species[species_id]}"] = payload
+
+    generations = {}
+    for species_id in sorted(species):
+        generations.setdefault(generation_of(species_id), []).append(
+            ref("pokemon-species", species_id, species[species_id]))
+    for number, members in generations.items():
+        name = f"generation-{_ROMAN[number - 1]}"
+        resources[f"generation/{number}"] = resources[f"generation/{name}"] = {
+            "id": number, "name": name, "pokemon_species": members,
+        }
+    return resources
+
+
+def load_fixtures(directory):
+    """
+    Loads payloads recorded with `record_fixtures`.
+
+    The directory mirrors the API: `pokemon/<id>.json` for Pokémon and any
+    other `<resource>/<key>.json` file for extra resources (e.g.
+    `type/fire.json`).
+
+    Args:
+        directory (str): The fixture directory.
+
+    Returns:
+        tuple: `(pokemon, resources)`, ready to pass to `MockPokeAPI`.
+    """
+    pokemon = {}
+    resources = {}
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, encoding="utf-8") as handle:
+                payload = json.load(handle)
+            key = os.path.relpath(path, directory)[:-len(".json")].replace(os.sep, "/")
+            if key.startswith("pokemon/") and key[len("pokemon/"):].isdigit():
+                pokemon[int(key[len("pokemon/"):])] = payload
+            else:
+                resources[key] = payload
+    return pokemon, resources
+
+
+def record_fixtures(directory, ids, base_url="https://pokeapi.co/api/v2", types=True):
+    """
+    Downloads real PokeAPI payloads into a fixture directory.
+
+    Args:
+        directory (str): Where to write the files.
+        ids (iterable of int): Pokémon IDs to record.
+        base_url (str, optional): The API to record from.
+        types (bool, optional): Also record the 18 /type resources.
+
+    Returns:
+        int: Number of payloads written.
+    """
+    import requests
+
+    paths = [f"pokemon/{pokemon_id}" for pokemon_id in ids]
+    if types:
+        paths += [f"type/{name}" for name in TYPE_CHART]
+    with requests.Session() as session:
+        for path in paths:
+            response = session.get(f"{base_url.rstrip('/')}/{path}", timeout=10)
+            response.raise_for_status()
+            target = os.path.join(directory, *path.split("/")) + ".json"
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w", encoding="utf-8") as handle:
+                handle.write(response.text)
+    return len(paths)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        api = self.server.api
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        api.record_request(path)
+        try:
+            delay = api.next_delay()
+            if delay:
+                time.sleep(delay)
+            if api.should_fail():
+                self._send(503, None)
+                return
+            status, payload = api.resolve(path, parse_qs(parts.query))
+            self._send(status, payload)
+        finally:
+            api.record_done()
+
+    def _send(self, status, payload):
+        if status != 200:
+            body = b"Not Found" if status == 404 else b"Service Unavailable"
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain")
+        else:
+            body = json.dumps(payload).encode("utf-8")
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # keep test output quiet
+
+
+class MockPokeAPI:
+    """
+    A threaded HTTP server that answers like the PokeAPI.
+
+    Attributes:
+        base_url (str): The URL to use as PYDEX_API_URL.
+        hits (collections.Counter): Number of requests per path.
+        max_in_flight (int): Highest number of requests served at once.
+    """
+
+    def __init__(self, pokemon=None, resources=None, latency=0.0,
+                 host="127.0.0.1", port=0, jitter=0.0, error_rate=0.0, seed=None):
+        """
+        Args:
+            pokemon (dict, optional): Pokémon payloads keyed by ID. Defaults
+                                      to `synthetic_dex()`.
+            resources (dict, optional): Extra payloads keyed by path below
+                                        /api/v2 (e.g. "type/fire"). The
+                                        18 /type resources, and species
+                                        and evolution chains built by
+                                        `evolution_resources`, are always
+                                        served unless overridden here.
+            latency (float, optional): Seconds to wait before each answer.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on; 0 picks a free one.
+            jitter (float, optional): Up to this many extra seconds, drawn
+                                      uniformly, are added to each delay.
+            error_rate (float, optional): Fraction of requests answered with
+                                          "503 Service Unavailable".
+            seed (int, optional): Seed for the jitter and error draws, for
+                                  repeatable runs.
+        """
+        self.pokemon = pokemon if pokemon is not None else synthetic_dex()
+        self.resources = type_resources(self.pokemon)
+        self.resources.update(evolution_resources(self.pokemon))
+        self.resources.update(resources or {})
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.hits = Counter()
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._by_name = {data["name"]: data for data in self.pokemon.values()}
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.api = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    def record_request(self, path):
+        with self._lock:
+            self.hits[path] += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+    def record_done(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def next_delay(self):
+        """Returns how long to wait before answering the next request."""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def should_fail(self):
+        """Decides whether the next request gets a 503."""
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def resolve(self, path, query):
+        """Maps a request path to a `(status, payload)` pair."""
+        if not path.startswith("/api/v2/"):
+            return 404, None
+        resource = path[len("/api/v2/"):]
+        if resource in self.resources:
+            return 200, self.resources[resource]
+        if resource == "pokemon":
+            return 200, self._listing(query)
+        if resource.startswith("pokemon/"):
+            key = resource[len("pokemon/"):]
+            data = self.pokemon.get(int(key)) if key.isdigit() else self._by_name.get(key)
+            return (200, data) if data is not None else (404, None)
+        return 404, None
+
+    def _listing(self, query):
+        limit = int(query.get("limit", ["20"])[0])
+        offset = int(query.get("offset", ["0"])[0])
+        ids = sorted(self.pokemon)
+        page = ids[offset:offset + limit]
+        base = self.base_url
+        return {
+            "count": len(ids),
+            "next": (f"{base}/pokemon?offset={offset + limit}&limit={limit}"
+                     if offset + limit < len(ids) else None),
+            "previous": None,
+            "results": [
+                {"name": self.pokemon[pokemon_id]["name"],
+                 "url": f"{base}/pokemon/{pokemon_id}/"}
+                for pokemon_id in page
+            ],
+        }
+
+    def start(self):
+        """Starts serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the server and releases its socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the PokeAPI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--count", type=int, default=151,
+                        help="Number of synthetic Pokémon to serve (default: 151).")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds to wait before answering each request.")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Up to this many extra seconds of random delay per request.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests to answer with 503 (default: 0).")
+    parser.add_argument("--fixtures", metavar="DIR",
+                        help="Serve payloads recorded with --record instead of synthetic ones.")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Download --count Pokémon (and the 18 types) from the real "
+                             "PokeAPI into DIR, then exit.")
+    args = parser.parse_args()
+
+    if args.record:
+        written = record_fixtures(args.record, range(1, args.count + 1))
+        print(f"Recorded {written} payloads into {args.record}")
+        return
+
+    pokemon, resources = (load_fixtures(args.fixtures) if args.fixtures
+                          else (synthetic_dex(args.count), None))
+    api = MockPokeAPI(pokemon, resources, latency=args.latency, host=args.host,
+                      port=args.port, jitter=args.jitter, error_rate=args.error_rate)
+    print(f"Serving a mock PokeAPI at {api.base_url} (Ctrl+C to stop)")
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,21 @@ PyDex: A Command-Line Pokedex
 This script provides a command-line interface (CLI) tool for looking up Pokémon
 information from the PokeAPI (https://pokeapi.co/). Users can search for Pokémon
 by name, Pokédex ID, or fetch a random Pokémon. It also supports displaying
-additional details like abilities, height, and weight.
+additional details like abilities, height, and weight. Several Pokémon (or
+whole ranges of IDs) can be looked up at once; they are fetched concurrently
+and printed in the order they were given.
+
+The lookup functions can also be imported from other programs, including
+asyncio code via `fetch_pokemon_data_async` and `fetch_many_async`, which
+never block the event loop.
+
+After `--sync` has downloaded an offline snapshot of the whole Pokédex (see
+`pokedex_snapshot`), lookups are served from it without any network calls.
+
+While `python pokedex.py --daemon` is running, calls are forwarded to that
+warm process over a Unix socket (see `pokedex_daemon`) and fall back to
+running in-process when it isn't. `--serve-http` runs a shared caching
+HTTP gateway for other programs instead (see `pokedex_gateway`).
 
 Dependencies:
 - requests: For making HTTP requests to the PokeAPI.
@@ -15,36 +29,136 @@ Usage Examples:
     python pokedex.py pikachu
     python pokedex.py 25
     python pokedex.py --random
+    python pokedex.py --random 6 --generation 4 --type fire --seed 7
     python pokedex.py charmander --abilities
     python pokedex.py 1 --size
     python pokedex.py --random --abilities --size
+    python pokedex.py pikachu --refresh
+    python pokedex.py pikachu --no-cache
+    python pokedex.py pikachu charizard 1-151 @team.txt
+    python pokedex.py 1-151 --format ndjson > kanto.ndjson
+    python pokedex.py --sync
+    python pokedex.py --where "speed>100 and type=electric" --sort -attack --top 20
+    python pokedex.py --similar garchomp -k 10 --normalize
+    python pokedex.py charizard --weaknesses
+    python pokedex.py bulbasaur --evolution
+    python pokedex.py --team pikachu,charizard,blastoise,venusaur,snorlax,gengar
+    python pokedex.py --daemon --idle-timeout 600 &
+    python pokedex.py --serve-http :8080
 """
 
-import random
 import sys
+
+if __name__ == "__main__" and "--no-daemon" not in sys.argv[1:]:
+    # Let a running daemon answer before the rest of PyDex is imported;
+    # avoiding that work on every call is what the daemon is for. Without
+    # one (or if it declines the call) this process does the work itself.
+    from pokedex_daemon import forward as _forward
+
+    _status = _forward(sys.argv[1:])
+    if _status is not None:
+        sys.exit(_status)
+
+import importlib
+import re
 import argparse
-import requests
-from colorama import Fore, Style, init
+import threading
+from collections import Counter
+
+from pokedex_cache import CachedResponse
+from pokedex_client import DEFAULT_POOL_SIZE, api_url, configure, get_client
+from pokedex_evolution import get_evolution_graph
+from pokedex_image import get_default_image
+from pokedex_index import get_name_index, suggest_names
+from pokedex_model import STAT_LABELS, Pokemon, project_pokemon_body
+from pokedex_output import FORMATS
+from pokedex_scheduler import BULK, INTERACTIVE
+from pokedex_snapshot import Snapshot, get_default_snapshot
+from pokedex_daemon import DEFAULT_IDLE_TIMEOUT
+import pokedex_trace
+from pokedex_trace import count, span, traced
 
-# Initialize colorama once at the beginning for colored output.
-# 'autoreset=True' ensures that styling is reset after each print statement,
-# preventing subsequent terminal output from retaining the last color.
-init(autoreset=True)
+# Default number of concurrent requests in batch mode. Kept modest so batch
+# runs stay within the PokeAPI's fair-use policy.
+DEFAULT_WORKERS = 8
 
-def parse_arguments():
+# Matches an inclusive ID range such as "1-151". Names containing hyphens
+# (e.g. "mr-mime", "ho-oh") are never all digits, so they don't match.
+_RANGE_PATTERN = re.compile(r"^(\d+)-(\d+)$")
+
+# How many batches of `--workers` lookups `fetch_many` runs ahead of the
+# results being consumed.
+_FETCH_AHEAD = 4
+
+# Worker threads used by the asyncio API. The blocking HTTP calls run here so
+# they never stall the caller's event loop; concurrency is bounded per call by
+# a semaphore in `fetch_many_async`.
+_ASYNC_WORKERS = 32
+_async_executor = None
+_async_executor_lock = threading.Lock()
+
+
+class _LazyModule:
     """
-    Parses command-line arguments provided by the user.
+    Stands in for a module that is only imported when first used.
+
+    A cached lookup never touches the network, so it shouldn't pay for
+    importing `requests` (or `asyncio`) either: `except requests.exceptions.X`
+    only evaluates `requests` once an exception is actually being handled.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+
+class _NoColor:
+    """Replaces colorama's `Fore` and `Style` when output isn't a terminal."""
+
+    def __getattr__(self, name):
+        return ""
+
+
+requests = _LazyModule("requests")
+asyncio = _LazyModule("asyncio")
+
+
+def use_colors(enabled):
+    """Switches colored output on or off for everything printed from here on."""
+    global Fore, Style
+    if enabled:
+        from colorama import Fore, Style
+    else:
+        Fore = Style = _NoColor()
+
 
-    This function sets up an ArgumentParser to define the various options
-    and positional arguments that the PyDex script accepts. It allows
-    users to specify a Pokémon by name or ID, request a random Pokémon,
-    and choose to display specific details like abilities or size.
+# Colors only make sense on a terminal; when the output is piped or
+# redirected, colorama isn't even imported and the escape codes are left out.
+if sys.stdout is not None and sys.stdout.isatty():
+    from colorama import init
+
+    # 'autoreset=True' ensures that styling is reset after each print statement,
+    # preventing subsequent terminal output from retaining the last color.
+    init(autoreset=True)
+    use_colors(True)
+else:
+    use_colors(False)
+
+
+def build_parser():
+    """
+    Builds the ArgumentParser for the PyDex command line.
+
+    The parser defines the various options and positional arguments that
+    the PyDex script accepts. It allows users to specify a Pokémon by name
+    or ID, request a random Pokémon, and choose to display specific details
+    like abilities or size.
 
     Returns:
-        argparse.Namespace: An object containing the parsed arguments
-                            as attributes. For example, `args.name` would
-                            hold the Pokémon name, `args.random` would be
-                            True if the --random flag was used, etc.
+        argparse.ArgumentParser: The parser, e.g. for `print_help()`.
     """
     parser = argparse.ArgumentParser(
         description=(f"{Fore.CYAN}PyDex: A simple CLI Pokémon lookup tool "
@@ -54,15 +168,38 @@ def parse_arguments():
 
     parser.add_argument(
         "name",
-        nargs="?", 
+        nargs="*",
         help=("Enter the name (e.g., 'pikachu') or National Pokédex ID "
               "(e.g., '25') of the Pokémon you want to look up. "
+              "Several may be given, as well as ID ranges (e.g., '1-151') "
+              "and '@file.txt' to read names/IDs from a file. "
               "This argument is not needed if --random is used.")
     )
     parser.add_argument(
         "-r", "--random",
-        action="store_true", # Stores True if the flag is present
-        help="Fetch and display information about a random Pokémon."
+        nargs="?",
+        const=1,
+        type=int,
+        metavar="N",
+        help="Fetch and display N different random Pokémon (default: 1), drawn from\n"
+             "every entry the PokeAPI lists, alternate forms included."
+    )
+    parser.add_argument(
+        "--generation",
+        metavar="GEN",
+        help="With --random: only draw species introduced in this generation (e.g. 4 or iv)."
+    )
+    parser.add_argument(
+        "--type",
+        action="append",
+        dest="types",
+        metavar="TYPE",
+        help="With --random: only draw Pokémon of this type. Repeat to require two types."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="With --random: seed the draw so it can be repeated."
     )
     parser.add_argument(
         "-a", "--abilities",
@@ -80,84 +217,669 @@ def parse_arguments():
         help="Enter the National Pokédex ID number of a Pokémon (e.g., 25 for Pikachu). "
              "Overrides the 'name' argument if both are provided."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read from or write to the local response cache."
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached data freshness and re-check it with the PokeAPI."
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of concurrent requests when looking up several Pokémon (default: {DEFAULT_WORKERS})."
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="Output format for lookups (default: text). json, ndjson and csv print\n"
+             "one machine-readable record per Pokémon, with every field, as each\n"
+             "lookup completes; errors go to stderr."
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Download every Pokémon into a local snapshot so later lookups work offline.\n"
+             "Interrupted syncs resume; re-syncs only download changed entries."
+    )
+    parser.add_argument(
+        "--where",
+        metavar="EXPR",
+        help="List every Pokémon matching a filter, e.g. \"speed>100 and type=electric\".\n"
+             "Fields: hp, attack, defense, special-attack (spa), special-defense (spd),\n"
+             "speed, bst, id, height, weight and type. Needs an offline snapshot (--sync)."
+    )
+    parser.add_argument(
+        "--sort",
+        metavar="KEYS",
+        help="Sort query results by comma-separated fields; prefix with '-' for\n"
+             "descending order, e.g. '-attack' or '-bst,name'."
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        metavar="N",
+        help="Show only the first N query results (by base stat total unless --sort is given)."
+    )
+    parser.add_argument(
+        "--weaknesses",
+        action="store_true",
+        help="Show the types the Pokémon is weak to, resists and is immune to."
+    )
+    parser.add_argument(
+        "--evolution",
+        action="store_true",
+        help="Show the Pokémon's evolution family as a tree, with what triggers each step."
+    )
+    parser.add_argument(
+        "--team",
+        metavar="A,B,...",
+        help="Analyse a team (comma-separated names or IDs): shared weaknesses\n"
+             "and the type coverage of its members' own types."
+    )
+    parser.add_argument(
+        "--similar",
+        metavar="NAME",
+        help="List the Pokémon whose base stats are closest to NAME's.\n"
+             "Needs an offline snapshot (--sync)."
+    )
+    parser.add_argument(
+        "-k",
+        type=int,
+        default=10,
+        help="Number of similar Pokémon to list with --similar (default: 10)."
+    )
+    parser.add_argument(
+        "--metric",
+        choices=["euclidean", "cosine"],
+        default="euclidean",
+        help="Distance used by --similar: 'euclidean' compares the stats themselves,\n"
+             "'cosine' compares their shape (e.g. fast attackers of any strength)."
+    )
+    parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help="With --similar, weigh every stat by how much it varies across the dex."
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Time each step (lookup, HTTP, JSON, rendering) and print a summary\n"
+             "with cache and network counters to stderr. Same as PYDEX_TRACE=1."
+    )
+    parser.add_argument(
+        "--trace-file",
+        metavar="FILE",
+        help="Also write the trace to FILE (implies --trace)."
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=["chrome", "json"],
+        default="chrome",
+        help="Format for --trace-file: 'chrome' trace events (chrome://tracing,\n"
+             "ui.perfetto.dev) or plain 'json' (default: chrome)."
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Seconds to wait for the PokeAPI before giving up (default: 10)."
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        metavar="REQ/S",
+        help="Requests per second sent to the PokeAPI across all threads; 0 means\n"
+             "no limit (default: PYDEX_RATE or 20). Cached answers don't count."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        metavar="N",
+        help="Maximum requests in flight across all threads (default: the\n"
+             "connection pool size). Two slots are kept free for interactive lookups."
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stay running with caches and connections warm and answer other PyDex\n"
+             "calls over a Unix socket (PYDEX_SOCKET, default: in the cache directory)."
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Stop the daemon after this long without requests (default: {DEFAULT_IDLE_TIMEOUT})."
+    )
+    parser.add_argument(
+        "--stop-daemon",
+        action="store_true",
+        help="Stop a running daemon."
+    )
+    parser.add_argument(
+        "--serve-http",
+        metavar="[HOST]:PORT",
+        help="Serve /pokemon/{id} (projected, or ?view=raw) and /metrics over HTTP,\n"
+             "with an in-memory cache and coalesced upstream fetches. The host\n"
+             "defaults to 127.0.0.1, e.g. ':8080' or '0.0.0.0:8080'."
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Do the lookup in this process even if a daemon is running."
+    )
+    return parser
+
+
+def parse_arguments(argv=None):
+    """
+    Parses command-line arguments provided by the user.
+
+    Args:
+        argv (list of str, optional): The arguments to parse. Defaults to
+                                      `sys.argv[1:]`.
+
+    Returns:
+        argparse.Namespace: An object containing the parsed arguments
+                            as attributes. For example, `args.name` would
+                            hold the Pokémon name, `args.random` would be
+                            the number of Pokémon to draw if --random was
+                            used (None otherwise), etc.
+    """
+    return build_parser().parse_args(_join_sort_keys(sys.argv[1:] if argv is None else argv))
+
+
+def _join_sort_keys(argv):
+    # argparse reads "--sort -attack" as two options; glue a descending sort
+    # key onto its flag so it parses like "--sort=-attack".
+    joined = []
+    for arg in argv:
+        if joined and joined[-1] == "--sort" and arg.startswith("-") and arg[1:2].isalpha():
+            joined[-1] = f"--sort={arg}"
+        else:
+            joined.append(arg)
+    return joined
 
 
 def get_random_pokemon_id():
     """
-    Generates a random valid National Pokédex ID.
+    Picks a random valid Pokémon ID.
+
+    The ID is drawn from the ID index (see `pokedex_index`), which lists
+    every entry the PokeAPI has, including alternate forms above 10000;
+    use `pokedex_sample.sample_ids` to draw several or to filter them.
+
+    Returns:
+        int: A randomly selected Pokémon ID.
+
+    Raises:
+        requests.exceptions.RequestException: If the index isn't cached
+                                              and can't be downloaded.
+    """
+    from pokedex_sample import sample_ids
+
+    return sample_ids(1)[0]
+
 
-    This function produces a random integer within the typical range of
-    Pokémon IDs available in the PokeAPI. As of current API data, this
-    range is generally considered to be from 1 to 1025 for "main" Pokémon
-    entries, excluding forms or specific regional variants that might have
-    higher or non-sequential IDs.
+def draw_random(args):
+    """
+    Draws the Pokémon for `--random N`, exiting with a message on errors.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
 
     Returns:
-        int: A randomly selected integer representing a Pokémon's National Pokédex ID.
+        list of str: The IDs drawn, at least one.
     """
-    # As of the last update, PokéAPI has ~1025 "main" Pokémon entries for general lookup.
-    # This range can be adjusted if the API expands significantly.
-    return random.randint(1, 1025)
+    from pokedex_sample import sample_ids
+
+    try:
+        ids = sample_ids(args.random, seed=args.seed, generation=args.generation,
+                         types=args.types or (), use_cache=not args.no_cache,
+                         refresh=args.refresh)
+    except ValueError as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error: Could not load the list of Pokémon from the PokéAPI ({e}).{Style.RESET_ALL}")
+        sys.exit(1)
+    if not ids:
+        print(f"{Fore.YELLOW}No Pokémon match those filters.{Style.RESET_ALL}")
+        sys.exit(1)
+    if len(ids) < args.random:
+        print(f"{Fore.YELLOW}Only {len(ids)} Pokémon match those filters.{Style.RESET_ALL}",
+              file=sys.stderr)
+    return [str(pokemon_id) for pokemon_id in ids]
 
 
-def fetch_pokemon_data(identifier):
+def expand_identifiers(tokens):
+    """
+    Expands the positional arguments into a flat list of Pokémon identifiers.
+
+    Each token may be:
+    - a name or ID (e.g., "pikachu", "25"),
+    - an inclusive ID range (e.g., "1-151"),
+    - "@path" to read more tokens from a file. Tokens in the file may be
+      separated by whitespace or commas, and "#" starts a comment.
+
+    Args:
+        tokens (list of str): The raw positional arguments.
+
+    Returns:
+        list of str: Lower-cased identifiers, in the order given.
+
+    Raises:
+        ValueError: If a range is reversed or a file can't be read.
+    """
+    identifiers = []
+    for token in tokens:
+        token = token.strip()
+        if not token:
+            continue
+        if token.startswith("@"):
+            path = token[1:]
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    lines = [line.split("#", 1)[0] for line in handle]
+            except OSError as e:
+                raise ValueError(f"Could not read '{path}': {e.strerror}")
+            identifiers.extend(expand_identifiers(" ".join(lines).replace(",", " ").split()))
+            continue
+        match = _RANGE_PATTERN.match(token)
+        if match:
+            start, end = int(match.group(1)), int(match.group(2))
+            if start > end:
+                raise ValueError(f"Invalid range '{token}': start is greater than end.")
+            identifiers.extend(str(number) for number in range(start, end + 1))
+            continue
+        identifiers.append(token.lower())
+    return identifiers
+
+
+@traced("lookup")
+def load_pokemon_data(identifier, use_cache=True, refresh=False, priority=INTERACTIVE):
+    """
+    Fetches Pokémon data from the PokeAPI without printing anything.
+
+    This is the building block behind `fetch_pokemon_data`, the batch mode
+    and the GUI; errors are raised to the caller instead of being reported.
+    The identifier is first resolved against the local name index (see
+    `pokedex_index`), so typos and alternate spellings are fixed and unknown
+    names are rejected without an HTTP request. If an offline snapshot
+    exists it is used next (read from its memory-mapped image, see
+    `pokedex_image`), and no network call is made at all.
+
+    Args:
+        identifier (str or int): The name or National Pokédex ID to fetch.
+        use_cache (bool, optional): If False, bypass the response cache, the
+                                    name index and the offline snapshot.
+        refresh (bool, optional): If True, revalidate cached data with the
+                                  PokeAPI instead of using the snapshot.
+        priority (int, optional): `pokedex_scheduler.INTERACTIVE` or `BULK`;
+                                  decides who goes first when requests
+                                  have to wait for the rate limit.
+
+    Returns:
+        pokedex_model.Pokemon: The Pokémon's record.
+
+    Raises:
+        requests.exceptions.HTTPError: If the Pokémon doesn't exist. When the
+                                       name index rejects it, the error's
+                                       `suggestions` attribute lists the
+                                       closest names.
+        requests.exceptions.RequestException: On network problems.
+    """
+    index = get_name_index() if use_cache and not refresh else None
+    if index is not None:
+        with span("index.resolve"):
+            pokemon_id, suggestions = index.resolve(identifier)
+        if pokemon_id is None:
+            # The index lists every Pokémon, so this one doesn't exist.
+            url = api_url("pokemon", identifier)
+            try:
+                CachedResponse(url, 404, b"", from_cache=True).raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                e.suggestions = suggestions
+                raise
+        identifier = pokemon_id
+
+    url = api_url("pokemon", identifier)
+    image = get_default_image() if use_cache and not refresh else None
+    if image is not None:
+        pokemon = image.get_pokemon(identifier)
+        if pokemon is None:
+            # The image lists every Pokémon, so this one doesn't exist.
+            CachedResponse(url, 404, b"", from_cache=True).raise_for_status()
+        count("image.hit")
+        return pokemon
+
+    snapshot = get_default_snapshot() if use_cache and not refresh else None
+    if snapshot is not None:
+        pokemon = snapshot.get_pokemon(identifier)
+        if pokemon is None:
+            # The snapshot lists every Pokémon, so this one doesn't exist.
+            CachedResponse(url, 404, b"", from_cache=True).raise_for_status()
+        count("snapshot.hit")
+        return pokemon
+
+    # Only the projected record is cached, never the full API payload.
+    response = get_client().fetch(url, use_cache=use_cache, refresh=refresh,
+                                  transform=project_pokemon_body, priority=priority)
+    response.raise_for_status()
+    return Pokemon.from_json(response.content)
+
+
+def fetch_pokemon(identifier, use_cache=True, refresh=False):
+    """
+    Fetches a Pokémon's record, printing an error message if it fails.
+
+    Like `fetch_pokemon_data`, but returns the compact `pokedex_model.Pokemon`
+    record the CLI displays instead of a dictionary.
+
+    Args:
+        identifier (str or int): The name or National Pokédex ID to fetch.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+
+    Returns:
+        Pokemon or None: The Pokémon's record, or None if it could not be
+                         fetched.
+    """
+    try:
+        return load_pokemon_data(identifier, use_cache=use_cache, refresh=refresh)
+    except requests.exceptions.HTTPError:
+        
+        print(f"{Fore.RED}Error: Pokémon '{identifier}' not found.")
+        suggestions = suggest_names(identifier) if use_cache else []
+        if suggestions:
+            print(f"{Fore.YELLOW}Did you mean: {', '.join(suggestions)}?{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}Please check the spelling or ID and try again.{Style.RESET_ALL}")
+        return None
+    except requests.exceptions.RequestException as e:
+     
+        print(f"{Fore.RED}Error: Could not connect to the PokéAPI. {e}{Style.RESET_ALL}")
+        return None
+
+
+def fetch_pokemon_data(identifier, use_cache=True, refresh=False):
     """
     Fetches Pokémon data from the PokeAPI.
 
     Constructs a request URL using the provided identifier (Pokémon name or ID)
-    and attempts to retrieve the corresponding Pokémon data. It handles network
-    errors and HTTP errors (e.g., 404 Not Found) gracefully, printing informative
-    messages to the user.
+    and attempts to retrieve the corresponding Pokémon data. Responses are kept
+    in the shared on-disk cache (see `pokedex_cache`), so repeated lookups are
+    answered locally. It handles network errors and HTTP errors (e.g., 404 Not
+    Found) gracefully, printing informative messages to the user.
 
     Args:
         identifier (str or int): The name (e.g., "pikachu") or National Pokédex
                                  ID (e.g., 25) of the Pokémon to fetch.
+        use_cache (bool, optional): If False, always go to the network and
+                                    don't store the response. Defaults to True.
+        refresh (bool, optional): If True, cached data is re-checked with the
+                                  PokeAPI even if it is still fresh.
+                                  Defaults to False.
+
+    Returns:
+        dict or None: A PokeAPI-shaped dictionary of the fields PyDex keeps
+                      (see `pokedex_model.Pokemon.to_dict`) if the request is
+                      successful (HTTP status 200). Returns None if there's an
+                      HTTP error (e.g., Pokémon not found) or a network
+                      connectivity issue. Use `fetch_pokemon` for the compact
+                      record instead.
+    """
+    pokemon = fetch_pokemon(identifier, use_cache=use_cache, refresh=refresh)
+    return pokemon.to_dict() if pokemon is not None else None
+
+
+def load_evolution(data, use_cache=True, refresh=False, priority=INTERACTIVE):
+    """
+    Loads the evolution chain of a Pokémon through the shared graph (see
+    `pokedex_evolution`), so members of one family share a single fetch.
+
+    Args:
+        data (Pokemon): The Pokémon's record.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+        priority (int, optional): Scheduler priority of any request.
 
     Returns:
-        dict or None: A dictionary containing the parsed JSON data of the Pokémon
-                      if the request is successful (HTTP status 200). Returns
-                      None if there's an HTTP error (e.g., Pokémon not found)
-                      or a network connectivity issue.
+        pokedex_evolution.EvolutionChain or None: None if the chain can't be
+                                                  loaded.
     """
-    api_url = f"https://pokeapi.co/api/v2/pokemon/{identifier}"
+    if data.species_id is None:
+        return None
     try:
-        response = requests.get(api_url)
+        return get_evolution_graph().chain_for(data.species_id, use_cache=use_cache,
+                                               refresh=refresh, priority=priority)
+    except requests.exceptions.RequestException:
+        return None
+
+
+def _get_async_executor():
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _async_executor = ThreadPoolExecutor(max_workers=_ASYNC_WORKERS,
+                                                 thread_name_prefix="pydex-async")
+        return _async_executor
+
+
+async def load_pokemon_data_async(identifier, timeout=None, use_cache=True, refresh=False,
+                                  priority=INTERACTIVE):
+    """
+    Asyncio counterpart of `load_pokemon_data`.
+
+    The request runs on a worker thread, so awaiting it never blocks the
+    event loop. Cancelling the awaiting task abandons the request; the
+    worker finishes in the background within the client's own timeout.
+
+    Args:
+        identifier (str or int): The name or National Pokédex ID to fetch.
+        timeout (float, optional): Seconds to wait for this lookup in total.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+        priority (int, optional): Scheduler priority (INTERACTIVE or BULK).
+
+    Returns:
+        pokedex_model.Pokemon: The Pokémon's record.
+
+    Raises:
+        asyncio.TimeoutError: If `timeout` elapses first.
+        requests.exceptions.HTTPError: If the Pokémon doesn't exist.
+        requests.exceptions.RequestException: On network problems.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        _get_async_executor(),
+        lambda: load_pokemon_data(identifier, use_cache=use_cache, refresh=refresh,
+                                  priority=priority)
+    )
+    return await asyncio.wait_for(future, timeout)
+
+
+async def fetch_pokemon_data_async(identifier, timeout=None, use_cache=True, refresh=False):
+    """
+    Asyncio counterpart of `fetch_pokemon_data`.
 
-        response.raise_for_status()
-        return response.json()
+    Returns the same dictionary (or None) and reports errors the same way,
+    without blocking the event loop.
+
+    Args:
+        identifier (str or int): The name or National Pokédex ID to fetch.
+        timeout (float, optional): Seconds to wait for the lookup in total.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+
+    Returns:
+        dict or None: The Pokémon's data, or None if it could not be fetched.
+    """
+    try:
+        pokemon = await load_pokemon_data_async(identifier, timeout=timeout,
+                                                use_cache=use_cache, refresh=refresh)
+        return pokemon.to_dict()
+    except asyncio.TimeoutError:
+        print(f"{Fore.RED}Error: Timed out looking up '{identifier}'.{Style.RESET_ALL}")
+        return None
     except requests.exceptions.HTTPError:
-        
         print(f"{Fore.RED}Error: Pokémon '{identifier}' not found.")
         print(f"{Fore.RED}Please check the spelling or ID and try again.{Style.RESET_ALL}")
         return None
     except requests.exceptions.RequestException as e:
-     
         print(f"{Fore.RED}Error: Could not connect to the PokéAPI. {e}{Style.RESET_ALL}")
         return None
 
 
-def display_pokemon_info(data, show_abilities=False, show_size=False):
+async def fetch_many_async(identifiers, concurrency=DEFAULT_WORKERS, timeout=None,
+                           return_exceptions=False, use_cache=True, refresh=False,
+                           priority=BULK):
+    """
+    Fetches several Pokémon concurrently from asyncio code.
+
+    At most `concurrency` lookups are in flight at any time. Like
+    `asyncio.gather`, the first failure is raised (and the remaining
+    lookups are cancelled) unless `return_exceptions` is True, in which
+    case exceptions are returned in place of the failed results.
+
+    Args:
+        identifiers (iterable): Names or IDs to fetch.
+        concurrency (int, optional): Maximum number of lookups in flight.
+        timeout (float, optional): Per-lookup timeout in seconds.
+        return_exceptions (bool, optional): Return errors instead of raising.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+        priority (int, optional): Scheduler priority; BULK by default, so
+                                  interactive lookups go first.
+
+    Returns:
+        list: Pokémon dictionaries, shaped like `fetch_pokemon_data`'s (or
+              exceptions), in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(identifier):
+        async with semaphore:
+            return await load_pokemon_data_async(identifier, timeout=timeout,
+                                                 use_cache=use_cache, refresh=refresh,
+                                                 priority=priority)
+
+    tasks = [asyncio.ensure_future(bounded(identifier)) for identifier in identifiers]
+    try:
+        results = await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        return [result.to_dict() if isinstance(result, Pokemon) else result
+                for result in results]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def fetch_many(identifiers, workers=DEFAULT_WORKERS, use_cache=True, refresh=False,
+               priority=BULK, idle=None, prefetch=None):
+    """
+    Fetches several Pokémon concurrently on a bounded thread pool.
+
+    Results are yielded in input order as soon as each one (and every one
+    before it) is ready, so output can start before the whole batch is done.
+    Repeated identifiers are only fetched once. Fetches run at most a few
+    times `workers` ahead of the consumer, and results are dropped once
+    yielded, so memory use doesn't grow with the size of the batch.
+
+    Args:
+        identifiers (list of str): Names or IDs to fetch.
+        workers (int, optional): Maximum number of requests in flight.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+        priority (int, optional): Scheduler priority; BULK by default, so
+                                  interactive lookups go first.
+        idle (callable, optional): Called before waiting for a result that
+                                   isn't ready yet, e.g. to flush output.
+        prefetch (callable, optional): Called with each fetched record on
+                                       the worker thread, to load related
+                                       data concurrently as well.
+
+    Yields:
+        tuple: `(identifier, data, error)` where exactly one of `data`
+               (a `Pokemon` record) and `error` (a short message) is None.
+    """
+    def load(identifier):
+        try:
+            data = load_pokemon_data(identifier, use_cache=use_cache, refresh=refresh,
+                                     priority=priority)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                suggestions = suggest_names(identifier) if use_cache else []
+                if suggestions:
+                    return None, f"not found (did you mean {', '.join(suggestions)}?)"
+                return None, "not found"
+            return None, str(e)
+        except requests.exceptions.RequestException as e:
+            return None, f"could not connect to the PokéAPI ({e})"
+        if prefetch is not None:
+            prefetch(data)
+        return data, None
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    identifiers = list(identifiers)
+    workers = max(1, workers)
+    remaining = Counter(identifiers)  # occurrences not yet yielded
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        submitted = 0
+        for position, identifier in enumerate(identifiers):
+            while submitted < len(identifiers) and submitted < position + workers * _FETCH_AHEAD:
+                ahead = identifiers[submitted]
+                if ahead not in futures:
+                    futures[ahead] = executor.submit(load, ahead)
+                submitted += 1
+            future = futures[identifier]
+            if idle is not None and not future.done():
+                idle()
+            data, error = future.result()
+            remaining[identifier] -= 1
+            if not remaining[identifier]:
+                del futures[identifier]
+            yield identifier, data, error
+
+
+@traced("render.cli")
+def display_pokemon_info(data, show_abilities=False, show_size=False, type_chart=None,
+                         show_evolution=False, evolution=None):
     """
     Prints formatted Pokémon information to the console.
 
-    This function takes a dictionary of Pokémon data (as returned by PokeAPI)
+    This function takes a Pokémon record (as returned by `fetch_pokemon`)
     and optional flags to control which details are displayed. It formats
     the output with colors for better readability and organizes the information
     into sections like basic info, types, base stats, abilities, and size.
 
     Args:
-        data (dict): A dictionary containing the Pokémon's data, typically
-                     obtained from `fetch_pokemon_data`.
+        data (Pokemon): The Pokémon's record, typically obtained from
+                        `fetch_pokemon`.
         show_abilities (bool, optional): If True, the Pokémon's abilities
                                          (including hidden ones) will be printed.
                                          Defaults to False.
         show_size (bool, optional): If True, the Pokémon's height (in meters)
                                     and weight (in kilograms) will be printed.
                                     Defaults to False.
+        type_chart (pokedex_types.TypeChart, optional): If given, the types
+                                    the Pokémon is weak to, resists and is
+                                    immune to will be printed.
+        show_evolution (bool, optional): If True, the Pokémon's evolution
+                                         family will be printed as a tree.
+        evolution (pokedex_evolution.EvolutionChain, optional): The family
+                                    to print; see `load_evolution`.
     """
-    print(f"\n{Fore.GREEN}--- {data['name'].title()} ---{Style.RESET_ALL}")
-    print(f"  {Fore.CYAN}National Pokédex Number: {data['id']}{Style.RESET_ALL}")
+    print(f"\n{Fore.GREEN}--- {data.name.title()} ---{Style.RESET_ALL}")
+    print(f"  {Fore.CYAN}National Pokédex Number: {data.id}{Style.RESET_ALL}")
 
     type_colors = {
         "normal": Fore.WHITE, "fire": Fore.RED, "water": Fore.BLUE,
@@ -172,28 +894,22 @@ def display_pokemon_info(data, show_abilities=False, show_size=False):
 
  
     types = []
-    for type_info in data['types']:
-        type_name = type_info['type']['name']
-     
+    for type_name in data.types:
         color = type_colors.get(type_name.lower(), Fore.WHITE)
         types.append(f"{color}{type_name.title()}{Style.RESET_ALL}")
     print(f"  Type(s): {', '.join(types)}")
 
     print(f"\n{Fore.YELLOW}  Base Stats:{Style.RESET_ALL}")
-    for stat in data['stats']:
-        stat_name = stat['stat']['name'].replace('-', ' ').title()
-   
-        if stat_name.lower() == 'hp':
-            stat_name = 'HP'
-        print(f"    {stat_name}: {stat['base_stat']}")
+    for stat_name, value in zip(STAT_LABELS, data.stats):
+        print(f"    {stat_name}: {value}")
 
     
     if show_abilities:
         print(f"\n{Fore.MAGENTA}  Abilities:{Style.RESET_ALL}")
         ability_counter = 1
-        for ability in data['abilities']:
-            ability_name = ability['ability']['name'].replace('-', ' ').title()
-            if ability['is_hidden']:
+        for ability, is_hidden in data.abilities:
+            ability_name = ability.replace('-', ' ').title()
+            if is_hidden:
                 print(f"    {Fore.LIGHTBLACK_EX}Hidden Ability: {ability_name}{Style.RESET_ALL}")
             else:
                 print(f"    Ability {ability_counter}: {ability_name}")
@@ -202,58 +918,628 @@ def display_pokemon_info(data, show_abilities=False, show_size=False):
    
     if show_size:
        
-        height_m = data['height'] / 10  # decimeters to meters
-        weight_kg = data['weight'] / 10  # hectograms to kilograms
+        height_m = data.height / 10  # decimeters to meters
+        weight_kg = data.weight / 10  # hectograms to kilograms
         print(f"\n{Fore.BLUE}  Size:{Style.RESET_ALL}")
         print(f"    Height: {height_m} m")
         print(f"    Weight: {weight_kg} kg")
+
+    if type_chart is not None:
+        groups = type_chart.matchups(data.types)
+        print(f"\n{Fore.RED}  Type Matchups:{Style.RESET_ALL}")
+        sections = (("Weak to", lambda value: value > 1),
+                    ("Resists", lambda value: 0 < value < 1),
+                    ("Immune to", lambda value: value == 0))
+        for label, selected in sections:
+            parts = []
+            for value, type_names in groups.items():
+                if selected(value):
+                    names = ", ".join(type_name.title() for type_name in type_names)
+                    parts.append(names if value == 0 else f"{format_multiplier(value)} {names}")
+            print(f"    {label}: {'; '.join(parts) if parts else 'None'}")
+
+    if show_evolution:
+        print(f"\n{Fore.LIGHTGREEN_EX}  Evolution:{Style.RESET_ALL}")
+        if evolution is None:
+            print("    Unknown")
+        else:
+            for text, species_id in evolution.tree_lines():
+                if species_id == data.species_id:
+                    print(f"    {Fore.GREEN}{text} ◀{Style.RESET_ALL}")
+                else:
+                    print(f"    {text}")
+    print(f"\n{Fore.GREEN}------------------{Style.RESET_ALL}")
+
+
+def format_multiplier(value):
+    """Formats a damage multiplier such as 2.0 or 0.25 as "2×" or "¼×"."""
+    labels = {4.0: "4×", 2.0: "2×", 1.0: "1×", 0.5: "½×", 0.25: "¼×", 0.0: "0×"}
+    return labels.get(float(value), f"{value:g}×")
+
+
+def run_sync(args):
+    """
+    Downloads (or refreshes) the offline snapshot and reports progress.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    def progress(done, total):
+        if sys.stdout.isatty():
+            print(f"\r  Syncing... {done}/{total}", end="", flush=True)
+
+    snapshot = Snapshot()
+    print(f"{Fore.CYAN}Syncing the Pokédex into {snapshot.path}{Style.RESET_ALL}")
+    try:
+        result = snapshot.sync(workers=args.workers, progress=progress)
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error: Could not fetch the Pokémon list. {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    if sys.stdout.isatty():
+        print()
+
+    print(f"  {result.total} Pokémon listed: {result.downloaded} downloaded, "
+          f"{result.unchanged} unchanged, {result.skipped} already synced"
+          + (f", {result.removed} removed" if result.removed else ""))
+    if result.failed:
+        print(f"{Fore.RED}{len(result.failed)} entries failed; run --sync again to resume:{Style.RESET_ALL}")
+        for name, error in result.failed[:10]:
+            print(f"{Fore.RED}  {name}: {error}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    # A running daemon still holds the old snapshot (or none at all).
+    from pokedex_daemon import DaemonError, send_request
+    try:
+        send_request({"command": "reload"})
+    except DaemonError as e:
+        print(f"{Fore.YELLOW}Warning: {e} Restart it to use the new snapshot.{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}Sync complete. Lookups now work offline.{Style.RESET_ALL}")
+
+
+def _exit_without_numpy():
+    print(f"{Fore.RED}Error: This feature needs NumPy. Install it with 'pip install numpy'.{Style.RESET_ALL}")
+    sys.exit(1)
+
+
+def load_stat_matrix():
+    """
+    Returns the stat matrix used by the query modes, exiting with a message
+    if NumPy or the offline snapshot is missing.
+    """
+    try:
+        from pokedex_stats import get_stat_matrix
+    except ImportError:
+        _exit_without_numpy()
+
+    matrix = get_stat_matrix()
+    if matrix is None:
+        print(f"{Fore.YELLOW}Error: Queries run against the offline snapshot. "
+              f"Run 'python pokedex.py --sync' first.{Style.RESET_ALL}")
+        sys.exit(1)
+    return matrix
+
+
+def run_query(args):
+    """
+    Answers --where/--sort/--top from the stat matrix and prints a table.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    matrix = load_stat_matrix()
+    try:
+        rows = matrix.query(where=args.where, sort=args.sort, top=args.top)
+    except ValueError as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    display_stat_table(matrix, rows)
+
+
+def run_similar(args):
+    """
+    Prints the Pokémon whose base stats are closest to --similar's.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    matrix = load_stat_matrix()
+    index = get_name_index()
+    pokemon_id, suggestions = index.resolve(args.similar) if index else (args.similar, [])
+    row = matrix.row_of(pokemon_id) if pokemon_id is not None else None
+    if row is None:
+        print(f"{Fore.RED}Error: Pokémon '{args.similar}' not found.{Style.RESET_ALL}")
+        if suggestions:
+            print(f"{Fore.YELLOW}Did you mean: {', '.join(suggestions)}?{Style.RESET_ALL}")
+        sys.exit(1)
+
+    rows, distances = matrix.nearest(row, k=args.k, metric=args.metric, normalize=args.normalize)
+    display_stat_table(matrix, [row], footer=False)
+    print()
+    print(f"{Fore.CYAN}Closest by base stats ({args.metric}"
+          f"{', normalized' if args.normalize else ''}):{Style.RESET_ALL}")
+    display_stat_table(matrix, rows, scores=distances, score_label="Dist")
+
+
+def display_stat_table(matrix, rows, scores=None, score_label="", footer=True):
+    """
+    Prints rows of a `pokedex_stats.StatMatrix` as a table of base stats.
+
+    Args:
+        matrix (pokedex_stats.StatMatrix): The matrix.
+        rows (sequence of int): Row indices to print, in order.
+        scores (sequence of float, optional): An extra column to show, one
+                                              value per row.
+        score_label (str, optional): Heading of the extra column.
+        footer (bool, optional): If True, print the number of rows after
+                                 the table.
+    """
+    extra = f"{score_label:>8}" if scores is not None else ""
+    print(f"{Style.BRIGHT}{'#':>5}  {'Name':<22} {'Type(s)':<18}"
+          f"{'HP':>5}{'Atk':>5}{'Def':>5}{'SpA':>5}{'SpD':>5}{'Spe':>5}{'BST':>6}{extra}{Style.RESET_ALL}")
+    for position, row in enumerate(rows):
+        types = "/".join(type_name.title() for type_name in matrix.types_of(row))
+        stats = "".join(f"{value:>5}" for value in matrix.stats[row])
+        extra = f"{scores[position]:>8.3f}" if scores is not None else ""
+        print(f"{matrix.ids[row]:>5}  {matrix.names[row].title():<22} {types:<18}"
+              f"{stats}{matrix.bst[row]:>6}{extra}")
+    if footer:
+        print(f"{Fore.CYAN}{len(rows)} Pokémon{Style.RESET_ALL}")
+
+
+def load_type_chart(use_cache=True, refresh=False):
+    """
+    Returns the type effectiveness chart, exiting with a message if NumPy is
+    missing or the chart can't be fetched.
+
+    Args:
+        use_cache (bool, optional): If False, bypass the response cache and
+                                    the chart already loaded in this process.
+        refresh (bool, optional): If True, revalidate the cached type data.
+    """
+    try:
+        from pokedex_types import TypeChart, fetch_type_relations, get_type_chart
+    except ImportError:
+        _exit_without_numpy()
+    try:
+        if use_cache and not refresh:
+            return get_type_chart()
+        return TypeChart.from_relations(fetch_type_relations(use_cache=use_cache, refresh=refresh))
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error: Could not load the type chart from the PokéAPI. {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+
+def run_team(args):
+    """
+    Looks up the members of --team and prints their type analysis.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    try:
+        identifiers = expand_identifiers(args.team.replace(",", " ").split())
+    except ValueError as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    if not identifiers:
+        print(f"{Fore.YELLOW}Error: No team members given.{Style.RESET_ALL}")
+        sys.exit(1)
+
+    chart = load_type_chart(use_cache=not args.no_cache, refresh=args.refresh)
+    team = []
+    for identifier, data, error in fetch_many(
+            identifiers, workers=args.workers,
+            use_cache=not args.no_cache, refresh=args.refresh, priority=INTERACTIVE):
+        if error:
+            print(f"{Fore.RED}Error: {identifier}: {error}{Style.RESET_ALL}")
+            sys.exit(1)
+        team.append(data)
+    display_team_report(team, chart)
+
+
+def display_team_report(team, chart):
+    """
+    Prints a team's shared weaknesses and the coverage of its own types.
+
+    Args:
+        team (list of Pokemon): The team members.
+        chart (pokedex_types.TypeChart): The type effectiveness chart.
+    """
+    from pokedex_model import TYPE_NAMES
+
+    print(f"\n{Fore.GREEN}--- Team ---{Style.RESET_ALL}")
+    for member in team:
+        types = "/".join(type_name.title() for type_name in member.types)
+        print(f"  {member.name.title()} ({types})")
+
+    # Defense: members x attacking types, all at once
+    defense = chart.team_defense([member.types for member in team])
+    weak = (defense > 1).sum(axis=0)
+    resist = (defense < 1).sum(axis=0)
+
+    print(f"\n{Fore.YELLOW}  Defensive Matchups:{Style.RESET_ALL}")
+    header = "".join(f"{member.name[:8].title():>9}" for member in team)
+    print(f"    {'Attack':<10}{header}{'Weak':>6}{'Resist':>8}")
+    for index, type_name in enumerate(TYPE_NAMES):
+        cells = "".join(f"{format_multiplier(value) if value != 1 else '·':>9}"
+                        for value in defense[:, index])
+        line = f"    {type_name.title():<10}{cells}{weak[index]:>6}{resist[index]:>8}"
+        if weak[index] >= 2 and weak[index] > resist[index]:
+            line = f"{Fore.RED}{line}{Style.RESET_ALL}"
+        print(line)
+
+    shared = [TYPE_NAMES[index] for index in range(len(TYPE_NAMES))
+              if weak[index] >= 2 and weak[index] > resist[index]]
+    print(f"    Shared weaknesses: "
+          f"{', '.join(type_name.title() for type_name in shared) if shared else 'None'}")
+
+    # Offense: best multiplier of the team's own types against every
+    # defender type combination
+    attack_types = {type_name for member in team for type_name in member.types}
+    best = chart.coverage(attack_types)
+    singles = chart.combos[:, 1] == len(TYPE_NAMES)
+    not_hit = [chart.combo_names(combo)[0] for combo in chart.combos[singles & (best <= 1)]]
+    walls = ["/".join(type_name.title() for type_name in chart.combo_names(combo))
+             for combo in chart.combos[best < 1]]
+
+    print(f"\n{Fore.YELLOW}  Offensive Coverage (same-type attacks):{Style.RESET_ALL}")
+    print(f"    Super effective against {int((best > 1).sum())} of {len(best)} type combinations")
+    print(f"    No super-effective hit on: "
+          f"{', '.join(type_name.title() for type_name in not_hit) if not_hit else 'None'}")
+    print(f"    Resists every team type: {', '.join(walls) if walls else 'None'}")
     print(f"\n{Fore.GREEN}------------------{Style.RESET_ALL}")
 
 
-def main():
+def run_batch(identifiers, args):
+    """
+    Looks up several Pokémon and prints them followed by an error summary.
+
+    With `--format json|ndjson|csv`, prints one record per Pokémon instead
+    (see `pokedex_output`) and reports failures on stderr as they happen.
+    Either way, output is written in blocks as the lookups complete.
+
+    Args:
+        identifiers (list of str): Names or IDs to look up.
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    from contextlib import redirect_stdout
+    from pokedex_output import BlockWriter, RecordWriter
+
+    use_cache = not args.no_cache
+    type_chart = load_type_chart(use_cache=use_cache, refresh=args.refresh) if args.weaknesses else None
+    out = BlockWriter()
+    records = (RecordWriter(args.format, out, type_chart, evolution=args.evolution)
+               if args.format != "text" else None)
+    priority = BULK if len(identifiers) > 1 else INTERACTIVE
+    prefetch = None
+    if args.evolution:
+        # Chains load on the worker threads along with the Pokémon; a
+        # family shared by several of them is only fetched once.
+        def prefetch(data):
+            load_evolution(data, use_cache=use_cache, refresh=args.refresh, priority=priority)
+
+    graph = get_evolution_graph()
+    failures = []
+    try:
+        with redirect_stdout(out):
+            for identifier, data, error in fetch_many(
+                    identifiers, workers=args.workers, use_cache=use_cache,
+                    refresh=args.refresh, priority=priority, idle=out.flush,
+                    prefetch=prefetch):
+                if error:
+                    failures.append((identifier, error))
+                    if records is not None:
+                        out.flush()
+                        print(f"{identifier}: {error}", file=sys.stderr)
+                    continue
+                evolution = graph.known(data.species_id) if args.evolution else None
+                if records is not None:
+                    records.write(data, evolution)
+                else:
+                    display_pokemon_info(data, show_abilities=args.abilities,
+                                         show_size=args.size, type_chart=type_chart,
+                                         show_evolution=args.evolution, evolution=evolution)
+            if records is not None:
+                records.close()
+    finally:
+        out.flush()
+
+    if failures and records is None:
+        print(f"\n{Fore.RED}{len(failures)} of {len(identifiers)} lookups failed:{Style.RESET_ALL}")
+        for identifier, error in failures:
+            print(f"{Fore.RED}  {identifier}: {error}{Style.RESET_ALL}")
+
+
+def _should_forward(argv):
+    # Asked by the daemon before it runs a forwarded call. Calls that
+    # change process-wide settings, or that must run in the caller's
+    # process (syncing, tracing it), are declined and run by the client.
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    try:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            args = parse_arguments(argv)
+    except SystemExit:
+        return True  # --help or a usage error, which the daemon prints
+    return not (args.daemon or args.stop_daemon or args.no_daemon or args.sync
+                or args.serve_http or args.trace or args.trace_file or args.timeout is not None
+                or args.rate is not None or args.concurrency is not None
+                or pokedex_trace.is_enabled())
+
+
+def run_redirected(argv, stdout, stderr, color=False):
+    """
+    Runs one CLI call in this process with its output sent elsewhere.
+
+    This is how the daemon answers forwarded calls: the streams send what
+    is written to them on to the client as the call goes.
+
+    Args:
+        argv (list of str): The command-line arguments.
+        stdout (file): Where standard output goes.
+        stderr (file): Where error output goes.
+        color (bool, optional): If True, include terminal colors.
+
+    Returns:
+        int: The exit status.
+    """
+    global Fore, Style
+    import traceback
+    from contextlib import redirect_stderr, redirect_stdout
+
+    saved_colors = Fore, Style
+    use_colors(color)
+    status = 0
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                main(argv, use_daemon=False)
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+                    status = 1
+                else:
+                    status = e.code or 0
+            except Exception:
+                traceback.print_exc()
+                status = 1
+    finally:
+        Fore, Style = saved_colors
+    return status
+
+
+def _reload_shared_state():
+    # Called by the daemon after a sync: drop everything derived from the
+    # old snapshot so the next call picks up the new one.
+    import pokedex_image
+    import pokedex_index
+    import pokedex_snapshot
+
+    with pokedex_snapshot._default_snapshot_lock:
+        if pokedex_snapshot._default_snapshot is not None:
+            pokedex_snapshot._default_snapshot.close()
+        pokedex_snapshot._default_snapshot = None
+    with pokedex_image._default_image_lock:
+        if pokedex_image._default_image:
+            pokedex_image._default_image.close()
+        pokedex_image._default_image = None
+    pokedex_index._name_index = None
+    pokedex_index._name_index_retry_at = 0.0
+    if "pokedex_stats" in sys.modules:
+        sys.modules["pokedex_stats"]._stat_matrix = None
+
+
+def run_daemon(args):
+    """
+    Runs the daemon (see `pokedex_daemon`) until it is stopped or idle.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    import signal
+    from pokedex_daemon import Daemon, DaemonError
+
+    daemon = Daemon(run_redirected, reload=_reload_shared_state, accept=_should_forward,
+                    idle_timeout=args.idle_timeout)
+    try:
+        daemon.bind()
+    except (DaemonError, OSError) as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    # Load what every lookup needs up front, so even the first call is warm.
+    get_name_index()
+    get_default_image()
+    get_client().session
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"{Fore.CYAN}PyDex daemon listening on {daemon.path} "
+          f"(stops after {args.idle_timeout:g} s without requests){Style.RESET_ALL}", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{Fore.CYAN}PyDex daemon stopped after {daemon.requests} requests.{Style.RESET_ALL}")
+
+
+def run_gateway(args):
+    """
+    Runs the caching HTTP gateway (see `pokedex_gateway`) until interrupted.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    from pokedex_gateway import Gateway, GatewayServer, parse_address
+
+    try:
+        host, port = parse_address(args.serve_http)
+        server = GatewayServer(Gateway(load_pokemon_data), host, port)
+    except (ValueError, OSError) as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    get_name_index()
+    get_client().session
+    print(f"{Fore.CYAN}PyDex gateway listening on {server.url} "
+          f"(GET /pokemon/{{id}}, /metrics){Style.RESET_ALL}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    metrics = server.gateway.snapshot_metrics()
+    print(f"\n{Fore.CYAN}Served {metrics['requests']} requests, hit rate "
+          f"{metrics['hit_rate']:.1%} ({metrics['loads']} loads).{Style.RESET_ALL}")
+
+
+def stop_daemon():
+    """Asks a running daemon to exit."""
+    from pokedex_daemon import DaemonError, send_request
+
+    try:
+        reply = send_request({"command": "stop"})
+    except DaemonError as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    if reply is None:
+        print(f"{Fore.YELLOW}No PyDex daemon is running.{Style.RESET_ALL}")
+        sys.exit(1)
+    print(f"{Fore.GREEN}PyDex daemon stopped.{Style.RESET_ALL}")
+
+
+def main(argv=None, use_daemon=True):
     """
     The main entry point of the PyDex script.
 
     This function orchestrates the entire program flow:
-    1. Parses command-line arguments using `parse_arguments`.
+    1. If a daemon is running (and `use_daemon` is True), hands the call to
+       it. Otherwise parses command-line arguments using `parse_arguments`.
     2. Determines the Pokémon identifier based on user input (random, ID, or name).
-    3. Fetches the Pokémon data from PokeAPI using `fetch_pokemon_data`.
+       If several names, ranges or files are given, hands over to `run_batch`.
+    3. Fetches the Pokémon's record from PokeAPI using `fetch_pokemon`.
     4. Displays the retrieved information using `display_pokemon_info`,
        respecting the user's choices for displaying abilities and size.
     5. Provides clear usage instructions and exits if no valid Pokémon
        identifier or lookup method is provided.
+
+    Args:
+        argv (list of str, optional): The arguments. Defaults to
+                                      `sys.argv[1:]`.
+        use_daemon (bool, optional): If False, never forward to a daemon.
     """
-    args = parse_arguments()
+    if use_daemon:
+        from pokedex_daemon import forward
+
+        status = forward(sys.argv[1:] if argv is None else argv)
+        if status is not None:
+            sys.exit(status)
+    args = parse_arguments(argv)
+
+    if args.daemon:
+        run_daemon(args)
+        return
+
+    if args.stop_daemon:
+        stop_daemon()
+        return
+
+    if args.serve_http:
+        run_gateway(args)
+        return
+
+    if args.trace or args.trace_file:
+        pokedex_trace.enable()
+        pokedex_trace.report_at_exit(args.trace_file, args.trace_format)
+
+    client_options = {}
+    if args.timeout is not None:
+        client_options["timeout"] = args.timeout
+    if args.workers > DEFAULT_POOL_SIZE:
+        client_options["pool_size"] = args.workers
+    if args.rate is not None:
+        client_options["rate"] = args.rate
+    if args.concurrency is not None:
+        client_options["concurrency"] = args.concurrency
+    if client_options:
+        configure(**client_options)
+
+    if args.sync:
+        run_sync(args)
+        return
+
+    if args.similar:
+        run_similar(args)
+        return
+
+    if args.team:
+        run_team(args)
+        return
+
+    if args.where or args.sort or args.top is not None:
+        run_query(args)
+        return
+
+    if (args.generation or args.types or args.seed is not None) and args.random is None:
+        print(f"{Fore.RED}Error: --generation, --type and --seed only apply to --random.{Style.RESET_ALL}")
+        sys.exit(1)
 
     identifier = None
-    if args.random:
-   
-        identifier = get_random_pokemon_id()
+    if args.random is not None:
+        identifiers = draw_random(args)
+        if len(identifiers) > 1:
+            run_batch(identifiers, args)
+            return
+        identifier = identifiers[0]
     elif args.number:
        
         identifier = args.number
     elif args.name:
-      
-        identifier = args.name.lower()
+        try:
+            identifiers = expand_identifiers(args.name)
+        except ValueError as e:
+            print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+        if len(identifiers) > 1 or args.format != "text":
+            run_batch(identifiers, args)
+            return
+        if not identifiers:
+            print(f"{Fore.YELLOW}Error: No Pokémon specified.{Style.RESET_ALL}")
+            sys.exit(1)
+        identifier = identifiers[0]
     else:
         
         print(f"{Fore.YELLOW}Error: No Pokémon specified. Please provide a name/ID or use --random.{Style.RESET_ALL}")
         
-        parse_arguments().print_help()
+        build_parser().print_help()
         sys.exit(1)
 
+    if args.format != "text":
+        run_batch([str(identifier)], args)
+        return
+
     # Fetch Pokémon data using the determined identifier.
-    pokemon_data = fetch_pokemon_data(identifier)
+    pokemon_data = fetch_pokemon(
+        identifier,
+        use_cache=not args.no_cache,
+        refresh=args.refresh
+    )
 
     # If data was successfully fetched (i.e., not None), display it.
     if pokemon_data:
         display_pokemon_info(
             pokemon_data,
             show_abilities=args.abilities,
-            show_size=args.size
+            show_size=args.size,
+            type_chart=(load_type_chart(use_cache=not args.no_cache, refresh=args.refresh)
+                        if args.weaknesses else None),
+            show_evolution=args.evolution,
+            evolution=(load_evolution(pokemon_data, use_cache=not args.no_cache,
+                                      refresh=args.refresh) if args.evolution else None)
         )
 
 
 if __name__ == "__main__":
- 
-    main()
\ No newline at end of file
+    # A running daemon was already tried at the top of this file.
+    main(use_daemon=False)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+PyDex Cache: A persistent on-disk cache for PokéAPI responses.
+
+Every lookup used to go straight to the PokeAPI, so asking for the same
+Pokémon twice paid the full network round-trip twice. This module keeps
+responses in a small SQLite database under the user cache directory so
+that repeated lookups are answered locally.
+
+Features:
+- Per-entry time-to-live (TTL); fresh entries never touch the network.
+- Stale entries are revalidated with ETag / Last-Modified headers, so an
+  unchanged resource only costs a tiny "304 Not Modified" response.
+- Negative caching: "404 Not Found" answers are remembered for a shorter
+  time so repeated typos don't hammer the API.
+- Size-bounded least-recently-used (LRU) eviction.
+
+The cache location can be overridden with the PYDEX_CACHE_DIR environment
+variable.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from pokedex_paths import default_cache_dir  # re-exported: part of this module's API
+from pokedex_trace import count
+
+# PokéAPI data is essentially static, so successful responses can be kept
+# for a long time. "Not found" answers expire sooner in case new Pokémon
+# are added to the API.
+DEFAULT_TTL = 7 * 24 * 60 * 60
+NOT_FOUND_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    status        INTEGER NOT NULL,
+    body          BLOB NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    expires_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    size          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class CacheEntry(namedtuple("CacheEntry", "url status body etag last_modified expires_at")):
+    """A single cached HTTP response."""
+
+    __slots__ = ()
+
+    def is_fresh(self, now=None):
+        """Returns True while the entry's TTL has not yet run out."""
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of HTTP responses keyed by URL.
+
+    The same instance can safely be shared between threads; all access to
+    the underlying connection is serialized with a lock.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Opens (and creates, if necessary) the cache database.
+
+        Args:
+            path (str, optional): Location of the SQLite file. Defaults to
+                                  "responses.sqlite3" in `default_cache_dir()`.
+            max_bytes (int, optional): Upper bound for the total size of the
+                                       cached bodies. The least recently used
+                                       entries are evicted beyond it.
+        """
+        if path is None:
+            path = os.path.join(default_cache_dir(), "responses.sqlite3")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Autocommit mode: every statement is its own short transaction,
+        # which keeps concurrent PyDex processes from blocking each other.
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, url):
+        """
+        Looks up a cached response and marks it as recently used.
+
+        Args:
+            url (str): The request URL.
+
+        Returns:
+            CacheEntry or None: The stored entry (fresh or stale), or None
+                                if the URL has never been cached.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, body, etag, last_modified, expires_at "
+                "FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return CacheEntry(*row)
+
+    def put(self, url, status, body, etag=None, last_modified=None, ttl=DEFAULT_TTL):
+        """
+        Stores (or replaces) a response and evicts old entries if needed.
+
+        Args:
+            url (str): The request URL.
+            status (int): HTTP status code of the response.
+            body (bytes): Raw response body.
+            etag (str, optional): The response's ETag header.
+            last_modified (str, optional): The response's Last-Modified header.
+            ttl (float, optional): Seconds the entry stays fresh.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, status, body, etag, last_modified, expires_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, sqlite3.Binary(body), etag, last_modified,
+                 now + ttl, now, len(body))
+            )
+            self._evict()
+
+    def revalidated(self, url, ttl=DEFAULT_TTL, etag=None, last_modified=None):
+        """
+        Extends the lifetime of an entry after a "304 Not Modified" answer.
+
+        Args:
+            url (str): The request URL.
+            ttl (float, optional): Seconds the entry stays fresh from now on.
+            etag (str, optional): Updated ETag, if the server sent one.
+            last_modified (str, optional): Updated Last-Modified value.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE url = ?",
+                (now + ttl, now, etag, last_modified, url)
+            )
+
+    def delete(self, url):
+        """Removes a single URL from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self):
+        """Removes every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def total_size(self):
+        """Returns the combined size in bytes of all cached bodies."""
+        with self._lock:
+            return self._total_size()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _total_size(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        # Caller must hold self._lock.
+        excess = self._total_size() - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for url, size in self._conn.execute(
+                "SELECT url, size FROM responses ORDER BY accessed_at"):
+            victims.append((url,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+        count("cache.evict", len(victims))
+
+
+class CachedResponse:
+    """
+    A small stand-in for `requests.Response` that may come from the cache.
+
+    It offers the handful of attributes PyDex uses (`status_code`, `content`,
+    `json()` and `raise_for_status()`), so callers don't need to care
+    whether the data came from the network or from disk.
+    """
+
+    __slots__ = ("url", "status_code", "content", "from_cache")
+
+    def __init__(self, url, status_code, content, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        """Raises `requests.exceptions.HTTPError` for 4xx/5xx responses."""
+        if not self.ok:
+            import requests
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Returns the process-wide shared `ResponseCache`.
+
+    The cache is opened lazily on first use. If the cache directory can't
+    be created (for example on a read-only file system) caching is simply
+    disabled and None is returned.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache()
+            except (OSError, sqlite3.Error):
+                _default_cache = False
+        # Compare explicitly: an empty cache is falsy because of __len__.
+        return _default_cache if _default_cache is not False else None
+
+
+def cached_get(url, cache=None, refresh=False, ttl=DEFAULT_TTL, get=None, transform=None):
+    """
+    Performs an HTTP GET, answering from the cache whenever possible.
+
+    Fresh entries are returned without any network traffic. Stale entries
+    (or every entry, when `refresh` is True) are revalidated with a
+    conditional request; a "304 Not Modified" reply reuses the stored body.
+    Successful responses and 404s are written back to the cache.
+
+    Args:
+        url (str): The URL to fetch.
+        cache (ResponseCache, optional): Cache to use. Pass None to bypass
+                                         caching entirely.
+        refresh (bool, optional): If True, ignore entry freshness and always
+                                  check with the server.
+        ttl (float, optional): Freshness lifetime for newly stored responses.
+        get (callable, optional): Function used for the actual request,
+                                  called as `get(url, headers=...)`.
+                                  Defaults to `requests.get`.
+        transform (callable, optional): Applied to successful response
+                                        bodies before they are stored and
+                                        returned, e.g. to drop unused fields.
+
+    Returns:
+        CachedResponse: The (possibly cached) response.
+
+    Raises:
+        requests.exceptions.RequestException: If the network request fails.
+    """
+    if get is None:
+        import requests
+        get = requests.get
+
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and not refresh and entry.is_fresh():
+        count("cache.hit")
+        return CachedResponse(url, entry.status, entry.body, from_cache=True)
+
+    headers = {}
+    if entry is not None and entry.status == 200:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    response = get(url, headers=headers)
+
+    if response.status_code == 304 and entry is not None:
+        count("cache.revalidated")
+        cache.revalidated(url, ttl, response.headers.get("ETag"),
+                          response.headers.get("Last-Modified"))
+        return CachedResponse(url, entry.status, entry.body, from_cache=True)
+
+    if cache is not None:
+        count("cache.miss")
+    body = response.content
+    if response.status_code == 200 and transform is not None:
+        body = transform(body)
+
+    if cache is not None:
+        if response.status_code == 200:
+            cache.put(url, 200, body, response.headers.get("ETag"),
+                      response.headers.get("Last-Modified"), ttl)
+        elif response.status_code == 404:
+            cache.put(url, 404, b"", ttl=min(ttl, NOT_FOUND_TTL))
+
+    return CachedResponse(url, response.status_code, body)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+PyDex Client: The shared HTTP client used by the CLI and the GUI.
+
+Instead of calling the bare `requests.get` (which opens a brand new TCP and
+TLS connection for every request and waits forever on a hung socket), all
+of PyDex talks to the PokeAPI through a single `PokeClient`. It holds one
+pooled `requests.Session`, so the Pokémon JSON and its sprite reuse the same
+keep-alive connections, and it adds:
+
+- Connect/read timeouts on every request (configurable through the
+  PYDEX_TIMEOUT environment variable or the CLI's --timeout flag).
+- Automatic retries with jittered exponential backoff on connection errors,
+  "429 Too Many Requests" and 5xx responses, honouring Retry-After.
+- A rate limit, a global concurrency limit and interactive/bulk priorities
+  (see `pokedex_scheduler`); a 429 or Retry-After pauses every request.
+- gzip-compressed transfers.
+- Integration with the on-disk response cache (see `pokedex_cache`).
+
+The PokeAPI base URL can be pointed elsewhere (e.g. a local mirror) with
+the PYDEX_API_URL environment variable.
+"""
+
+import os
+import random
+import threading
+import time
+
+from pokedex_cache import cached_get, get_default_cache
+from pokedex_scheduler import DEFAULT_BURST, INTERACTIVE, Scheduler
+from pokedex_trace import count, span
+
+API_BASE_URL = os.environ.get("PYDEX_API_URL", "https://pokeapi.co/api/v2").rstrip("/")
+
+# (connect, read) timeouts in seconds. The connect timeout is slightly
+# larger than a multiple of 3, the default TCP retransmission window.
+DEFAULT_TIMEOUT = (3.05, 10.0)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 10.0
+DEFAULT_POOL_SIZE = 10
+
+# Statuses that are worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def api_url(*parts):
+    """
+    Builds a PokeAPI URL from path segments.
+
+    Example:
+        api_url("pokemon", 25) -> "https://pokeapi.co/api/v2/pokemon/25"
+    """
+    return "/".join([API_BASE_URL] + [str(part).strip("/") for part in parts])
+
+
+def parse_retry_after(value):
+    """
+    Converts a Retry-After header into seconds.
+
+    Args:
+        value (str or None): Either a number of seconds or an HTTP date.
+
+    Returns:
+        float or None: Seconds to wait (never negative), or None if the
+                       header is missing or unreadable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _timeout_from_env():
+    value = os.environ.get("PYDEX_TIMEOUT")
+    if not value:
+        return DEFAULT_TIMEOUT
+    try:
+        return float(value)
+    except ValueError:
+        return DEFAULT_TIMEOUT
+
+
+class PokeClient:
+    """
+    A pooled, retrying HTTP client for the PokeAPI.
+
+    One instance is meant to be shared across the whole process (see
+    `get_client`); the underlying session is thread-safe for GET requests.
+    """
+
+    def __init__(self, timeout=None, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, pool_size=DEFAULT_POOL_SIZE,
+                 rate=None, burst=DEFAULT_BURST, concurrency=None):
+        """
+        Args:
+            timeout (float or tuple, optional): Seconds to wait for the server,
+                either a single value or a (connect, read) pair. Defaults to
+                PYDEX_TIMEOUT or `DEFAULT_TIMEOUT`.
+            retries (int, optional): How many times a failed request is retried.
+            backoff (float, optional): Base delay in seconds for the exponential
+                                       backoff between retries.
+            pool_size (int, optional): Maximum number of keep-alive connections
+                                       held open to each host.
+            rate (float, optional): Requests per second across all threads;
+                                    0 for no limit. Defaults to PYDEX_RATE
+                                    or `pokedex_scheduler.DEFAULT_RATE`.
+            burst (int, optional): Requests that may be sent back to back.
+            concurrency (int, optional): Maximum requests in flight across
+                                         all threads. Defaults to
+                                         `pool_size`.
+        """
+        self.timeout = timeout if timeout is not None else _timeout_from_env()
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.scheduler = Scheduler(rate=rate, burst=burst,
+                                   concurrency=concurrency or pool_size)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled `requests.Session`, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        # Retries are handled by `get` so that we control the backoff.
+        adapter = HTTPAdapter(pool_connections=self.pool_size,
+                              pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "PyDex (+https://github.com/SthembisoMfusi/PyDex)",
+        })
+        return session
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Computes how long to sleep before the given retry attempt.
+
+        Uses "full jitter": a random delay between 0 and an exponentially
+        growing cap, which spreads retries from many clients apart. A
+        Retry-After header from the server always wins if it is longer.
+
+        Args:
+            attempt (int): Zero-based index of the retry.
+            retry_after (str, optional): Value of the Retry-After header.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        delay = random.uniform(0, min(MAX_BACKOFF, self.backoff * (2 ** attempt)))
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            delay = max(delay, min(seconds, MAX_BACKOFF * 6))
+        return delay
+
+    def get(self, url, headers=None, priority=INTERACTIVE):
+        """
+        Sends a GET request, retrying transient failures.
+
+        Every attempt waits for a slot from the client's scheduler first.
+
+        Args:
+            url (str): The URL to fetch.
+            headers (dict, optional): Extra request headers.
+            priority (int, optional): `pokedex_scheduler.INTERACTIVE` for
+                                      something a user is waiting on, or
+                                      `BULK` for background work.
+
+        Returns:
+            requests.Response: The final response. Non-retryable error
+                               statuses (e.g. 404) are returned as-is.
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails
+                after all retries (connection error, timeout, ...).
+        """
+        import requests
+
+        with span("http.get", url=url) as trace:
+            attempt = 0
+            while True:
+                with span("http.queue", priority=priority):
+                    self.scheduler.acquire(priority)
+                count("http.requests")
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    count("http.errors")
+                    if attempt >= self.retries:
+                        raise
+                    delay, pause_everyone = self.backoff_delay(attempt), False
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                        count("http.bytes", len(response.content))
+                        trace.set(status=response.status_code, attempts=attempt + 1,
+                                  bytes=len(response.content),
+                                  ttfb_ms=round(response.elapsed.total_seconds() * 1000, 3))
+                        return response
+                    retry_after = response.headers.get("Retry-After")
+                    response.close()
+                    delay = self.backoff_delay(attempt, retry_after)
+                    # Being told to slow down applies to every request, not just this one.
+                    pause_everyone = response.status_code == 429 or retry_after is not None
+                finally:
+                    self.scheduler.release()
+                if pause_everyone:
+                    self.scheduler.pause(delay)  # the retry waits in `acquire`
+                else:
+                    time.sleep(delay)
+                count("http.retries")
+                attempt += 1
+
+    def fetch(self, url, use_cache=True, refresh=False, transform=None, priority=INTERACTIVE):
+        """
+        Fetches a URL through the shared response cache.
+
+        Args:
+            url (str): The URL to fetch.
+            use_cache (bool, optional): If False, bypass the cache entirely.
+            refresh (bool, optional): If True, revalidate even fresh entries.
+            transform (callable, optional): Applied to successful bodies
+                                            before they are cached.
+            priority (int, optional): Scheduler priority of any network
+                                      request (see `get`).
+
+        Returns:
+            pokedex_cache.CachedResponse: The (possibly cached) response.
+        """
+        cache = get_default_cache() if use_cache else None
+        return cached_get(url, cache=cache, refresh=refresh,
+                          get=lambda url, headers=None: self.get(url, headers, priority),
+                          transform=transform)
+
+    def close(self):
+        """Closes all pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the process-wide shared `PokeClient`, creating it if needed."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = PokeClient()
+    return _default_client
+
+
+def configure(**options):
+    """
+    Replaces the shared client with one built from the given options.
+
+    Accepts the same keyword arguments as `PokeClient`. Options left out
+    keep their defaults.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = PokeClient(**options)
+    return _default_client
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+PyDex Daemon: A warm PyDex process that answers CLI calls over a Unix socket.
+
+Every `python pokedex.py ...` run normally starts from nothing: it loads the
+name index, opens the cache and snapshot databases and sets up a new HTTP
+connection pool. Scripts that call PyDex thousands of times pay that cost on
+every call.
+
+`python pokedex.py --daemon` keeps one process running with all of that
+loaded and listens on a Unix domain socket in the cache directory (or at
+PYDEX_SOCKET). While it runs, the normal CLI forwards its arguments to the
+daemon and prints the answer, so nothing about scripts has to change. The
+client side only needs this module, `json` and `socket`: `pokedex.py`
+tries the daemon before importing the rest of PyDex. When
+no daemon is running (or it can't be reached) the CLI simply does the work
+itself. Once a call has been handed to the daemon it is never run a second
+time here: if the daemon fails while answering, the client reports an
+error instead. The daemon exits after a period without requests.
+
+Protocol: the client sends one JSON object on a single line. For a CLI
+call the daemon answers with a JSON line per chunk of output, sent as the
+call produces it, and a last line with the exit status; a command gets a
+single line. Then the daemon closes the connection.
+
+    request:  {"argv": [...], "cwd": "...", "color": false, "settings": {...}}
+              {"command": "reload"} or {"command": "stop"}
+    response: {"stdout": "..."} or {"stderr": "..."}, any number of times,
+              then {"exit": 0}
+              {"error": "..."} if the daemon declines the call
+
+A call depends on more than its arguments: the PokeAPI URL, the cache
+directory, the timeout, rate limit and tracing settings all come from the
+environment (see `call_settings`). The client sends its own values and the
+daemon declines the call unless they match the ones it runs with, so a
+forwarded call never behaves differently from the same call in-process.
+
+Output is sent in chunks of up to `CHUNK_SIZE` characters, so a long batch
+run streams through the daemon with bounded memory on both sides, just
+as it does in-process. Requests are handled one at a time, in the order
+they arrive.
+"""
+
+import errno
+import io
+import json
+import os
+import socket
+import sys
+import time
+
+from pokedex_paths import default_cache_dir
+
+# Seconds without a request after which the daemon exits.
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+
+# How long a client tries to connect before doing the work itself. Once
+# connected it waits for the answer as long as the call takes.
+CONNECT_TIMEOUT = 5.0
+
+# How long the daemon waits on a client that stops sending or reading.
+CLIENT_TIMEOUT = 120.0
+
+# Largest request the daemon accepts, in bytes.
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# Characters of output the daemon collects before sending them on.
+CHUNK_SIZE = 64 * 1024
+
+# Environment variables that change what a call does (the cache directory
+# is compared once resolved, see `call_settings`).
+SETTINGS_ENV = ("PYDEX_API_URL", "PYDEX_TIMEOUT", "PYDEX_RATE",
+                "PYDEX_TRACE", "PYDEX_TRACE_FILE", "PYDEX_TRACE_FORMAT")
+
+
+class DaemonError(Exception):
+    """Raised when the daemon can't start (e.g. one is already running) or fails to answer."""
+
+
+def is_supported():
+    """True if this platform has Unix domain sockets."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path():
+    """Returns where the daemon listens: PYDEX_SOCKET, or the cache directory."""
+    override = os.environ.get("PYDEX_SOCKET")
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    return os.path.join(default_cache_dir(), "pydex.sock")
+
+
+def call_settings():
+    """
+    Returns the settings a CLI call depends on besides its arguments: the
+    variables in `SETTINGS_ENV` (None if unset) and the cache directory.
+    """
+    settings = {name: os.environ.get(name) for name in SETTINGS_ENV}
+    settings["cache_dir"] = default_cache_dir()
+    return settings
+
+
+def _connect(path, timeout):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _read_all(sock, limit=None):
+    chunks = []
+    size = 0
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise ValueError("message too large")
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+def _replies(sock):
+    # The daemon's answer, one decoded JSON line at a time.
+    for line in sock.makefile("rb"):
+        reply = json.loads(line.decode("utf-8"))
+        if not isinstance(reply, dict):
+            raise ValueError("malformed answer")
+        yield reply
+
+
+def _open(message, path):
+    # Connects and sends a request; None if no daemon is listening.
+    if not is_supported():
+        return None
+    path = path or default_socket_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        sock = _connect(path, CONNECT_TIMEOUT)
+    except OSError:
+        return None
+    try:
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    except OSError as e:
+        sock.close()
+        raise DaemonError(f"The PyDex daemon did not answer: {e}") from e
+    sock.settimeout(None)  # the call may take as long as it takes
+    return sock
+
+
+def send_request(message, path=None):
+    """
+    Sends one request to a running daemon and waits for its answer.
+
+    Args:
+        message (dict): The request (see the module docstring).
+        path (str, optional): The daemon's socket. Defaults to
+                              `default_socket_path()`.
+
+    Returns:
+        dict or None: The daemon's answer, or None if no daemon is running
+                      (nothing was sent).
+
+    Raises:
+        DaemonError: If the request was sent but the daemon failed to
+                     answer it, e.g. because it crashed.
+    """
+    sock = _open(message, path)
+    if sock is None:
+        return None
+    try:
+        with sock:
+            reply = next(_replies(sock), None)
+    except (OSError, ValueError) as e:
+        raise DaemonError(f"The PyDex daemon did not answer: {e}") from e
+    if reply is None:
+        raise DaemonError("The PyDex daemon closed the connection without answering.")
+    return reply
+
+
+def forward(argv, path=None):
+    """
+    Runs a CLI call on the daemon, if one is running, and prints its output
+    as it arrives.
+
+    Args:
+        argv (list of str): The command-line arguments.
+        path (str, optional): The daemon's socket.
+
+    Returns:
+        int or None: The exit status of the call (1 if the daemon failed
+                     while answering it), or None if no daemon took the
+                     call and it has to be run in this process instead.
+    """
+    message = {
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "color": sys.stdout is not None and sys.stdout.isatty(),
+        "settings": call_settings(),
+    }
+    try:
+        sock = _open(message, path)
+        if sock is None:
+            return None
+        with sock:
+            started = False
+            for reply in _replies(sock):
+                if "exit" in reply:
+                    return reply["exit"]
+                for name, stream in (("stdout", sys.stdout), ("stderr", sys.stderr)):
+                    if name in reply:
+                        stream.write(reply[name])
+                        stream.flush()
+                        started = True
+                if not started and "error" in reply:
+                    return None  # declined before running anything
+        raise DaemonError("The PyDex daemon closed the connection before the call finished.")
+    except (OSError, ValueError) as e:
+        error = DaemonError(f"The PyDex daemon did not answer: {e}")
+    except DaemonError as e:
+        error = e
+    # The daemon may have run some or all of the call already, so running
+    # it again here could repeat its work and its output.
+    sys.stdout.flush()
+    print(f"Error: {error}", file=sys.stderr)
+    return 1
+
+
+class _ReplyStream(io.TextIOBase):
+    """One of a call's output streams, sent to the client in chunks."""
+
+    def __init__(self, reply, name):
+        self._reply = reply
+        self._name = name
+        self._chunks = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        # Send what the other stream has first, so the two stay in order.
+        other = self._reply.stderr if self._name == "stdout" else self._reply.stdout
+        other.flush()
+        self._chunks.append(text)
+        self._size += len(text)
+        # Like a terminal, errors go out line by line.
+        if self._size >= CHUNK_SIZE or (self._name == "stderr" and text.endswith("\n")):
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._chunks:
+            text = "".join(self._chunks)
+            self._chunks = []
+            self._size = 0
+            self._reply.send({self._name: text})
+
+
+class Reply:
+    """
+    The daemon's answer to one connection.
+
+    Attributes:
+        stdout (file): Where a call's standard output goes.
+        stderr (file): Where its error output goes.
+        closed (bool): True once the client has gone away; anything sent
+                       after that is dropped.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.closed = False
+        self.stdout = _ReplyStream(self, "stdout")
+        self.stderr = _ReplyStream(self, "stderr")
+
+    def send(self, message):
+        """Sends one JSON line to the client."""
+        if self.closed:
+            return
+        try:
+            self._conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        except OSError:
+            self.closed = True  # the client gave up waiting
+
+    def finish(self, status):
+        """Sends any remaining output, then the exit status."""
+        self.stdout.flush()
+        self.stderr.flush()
+        self.send({"exit": status})
+
+
+class Daemon:
+    """
+    The listening side: accepts requests and hands them to a runner.
+
+    The runner does the actual work, so this module knows nothing about
+    the CLI itself (see `pokedex.run_daemon`).
+    """
+
+    def __init__(self, run, reload=None, accept=None, path=None,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            run (callable): Called as `run(argv, stdout, stderr, color)`
+                            with file-like output streams; returns the
+                            exit status.
+            reload (callable, optional): Called for a "reload" request, e.g.
+                                         after a sync replaced the snapshot.
+            accept (callable, optional): Called as `accept(argv)` before a
+                                         call runs; if it returns False the
+                                         call is declined and the client
+                                         runs it itself.
+            path (str, optional): Socket path. Defaults to
+                                  `default_socket_path()`.
+            idle_timeout (float, optional): Seconds without a request before
+                                            `serve_forever` returns.
+        """
+        self.run = run
+        self.reload = reload
+        self.accept = accept
+        self.path = path or default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.settings = None
+        self.requests = 0
+        self._sock = None
+        self._stopping = False
+
+    def bind(self):
+        """
+        Creates the listening socket.
+
+        Raises:
+            DaemonError: If Unix sockets aren't supported or another daemon
+                         is already listening on the path.
+        """
+        if not is_supported():
+            raise DaemonError("Unix domain sockets are not supported on this platform.")
+        if os.path.exists(self.path):
+            try:
+                _connect(self.path, 1.0).close()
+            except OSError:
+                os.unlink(self.path)  # left behind by a daemon that died
+            else:
+                raise DaemonError(f"A PyDex daemon is already running on {self.path}.")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.environ.get("PYDEX_CACHE_DIR"):
+            # Requests run in the client's working directory; keep a
+            # relative cache directory pointing where it did at startup.
+            os.environ["PYDEX_CACHE_DIR"] = default_cache_dir()
+        self.settings = call_settings()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        os.chmod(self.path, 0o600)  # only this user may send requests
+        sock.listen(64)
+        self._sock = sock
+
+    def serve_forever(self):
+        """Answers requests until stopped or idle for `idle_timeout` seconds."""
+        if self._sock is None:
+            self.bind()
+        try:
+            last_request = time.monotonic()
+            while not self._stopping:
+                remaining = self.idle_timeout - (time.monotonic() - last_request)
+                if remaining <= 0:
+                    break
+                self._sock.settimeout(remaining)
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    break
+                except OSError as e:
+                    if e.errno == errno.EINTR:
+                        continue
+                    raise
+                with conn:
+                    self._handle(conn)
+                last_request = time.monotonic()
+        finally:
+            self.close()
+
+    def _handle(self, conn):
+        conn.settimeout(CLIENT_TIMEOUT)
+        reply = Reply(conn)
+        try:
+            message = json.loads(_read_all(conn, MAX_REQUEST_SIZE).decode("utf-8"))
+        except (OSError, ValueError) as e:
+            reply.send({"error": str(e)})
+            return
+        self.respond(message, reply)
+
+    def respond(self, message, reply):
+        """
+        Answers one decoded request.
+
+        Args:
+            message (dict): The request.
+            reply (Reply): Where the answer goes. A call the client should
+                           run itself gets a single "error" line.
+        """
+        command = message.get("command")
+        if command == "stop":
+            self._stopping = True
+            reply.send({"stopped": True})
+            return
+        if command == "reload":
+            if self.reload:
+                self.reload()
+            reply.send({"reloaded": True})
+            return
+        settings = message.get("settings")
+        if settings != self.settings:
+            different = sorted(name for name in self.settings
+                               if not isinstance(settings, dict)
+                               or settings.get(name) != self.settings[name])
+            reply.send({"error": f"this daemon runs with different {', '.join(different)}"})
+            return
+        argv = message.get("argv")
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            reply.send({"error": "malformed request"})
+            return
+        if self.accept is not None and not self.accept(argv):
+            reply.send({"error": "this call runs in the client"})
+            return
+
+        self.requests += 1
+        cwd = os.getcwd()
+        try:
+            # "@team.txt" is relative to where the client was started.
+            if message.get("cwd"):
+                os.chdir(message["cwd"])
+            status = self.run(argv, reply.stdout, reply.stderr, bool(message.get("color")))
+        finally:
+            os.chdir(cwd)
+        reply.finish(status)
+
+    def close(self):
+        """Stops listening and removes the socket file."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+PyDex Evolution: Evolution chains as a shared, deduplicated graph.
+
+The PokeAPI keeps evolution data on two resources: a Pokémon's species
+(/pokemon-species/{id}) names its evolution chain, and the chain
+(/evolution-chain/{id}) is a tree of every species in the family, with
+the condition for each step.
+
+`EvolutionGraph` remembers every chain it has loaded together with all of
+its member species. Once any member of a family has been looked up, the
+others find the chain by species ID without any request at all, and
+concurrent lookups of one family (bulbasaur, ivysaur and venusaur in one
+batch run) wait for a single fetch of the chain instead of making their
+own. Both resources also go through the response cache, in a compact form.
+"""
+
+import json
+import threading
+
+from pokedex_client import api_url, get_client
+from pokedex_scheduler import INTERACTIVE
+
+
+def _resource_id(url):
+    """Returns the trailing ID of a PokeAPI resource URL as an int (or None)."""
+    if not url:
+        return None
+    key = url.rstrip("/").rsplit("/", 1)[-1]
+    return int(key) if key.isdigit() else None
+
+
+def describe_condition(details):
+    """
+    Turns a step's `evolution_details` into a short description.
+
+    Args:
+        details (list of dict): The PokeAPI evolution details of one step.
+
+    Returns:
+        str: E.g. "level 16", "use thunder-stone" or "trade holding
+             metal-coat"; "" if there are no details.
+    """
+    if not details:
+        return ""
+    detail = details[0]
+    trigger = (detail.get("trigger") or {}).get("name", "")
+    item = (detail.get("item") or {}).get("name")
+    held_item = (detail.get("held_item") or {}).get("name")
+    if trigger == "level-up" and detail.get("min_level"):
+        text = f"level {detail['min_level']}"
+    elif trigger == "level-up" and detail.get("min_happiness"):
+        text = "high friendship"
+    elif trigger == "level-up" and detail.get("known_move"):
+        text = f"level up knowing {detail['known_move']['name']}"
+    elif trigger == "use-item" and item:
+        text = f"use {item}"
+    elif trigger:
+        text = trigger.replace("-", " ")
+    else:
+        text = ""
+    if held_item:
+        text = f"{text} holding {held_item}".strip()
+    if detail.get("time_of_day"):
+        text = f"{text} ({detail['time_of_day']})"
+    return text
+
+
+def _compact_species(body):
+    # The cache only needs to know which chain a species belongs to.
+    data = json.loads(body)
+    compact = {
+        "id": data["id"],
+        "name": data["name"],
+        "chain_id": _resource_id((data.get("evolution_chain") or {}).get("url")),
+    }
+    return json.dumps(compact, separators=(",", ":")).encode("utf-8")
+
+
+def _compact_chain(body):
+    # Flatten the nested tree into [species_id, name, parent_id, condition]
+    # rows in depth-first order.
+    data = json.loads(body)
+    nodes = []
+    pending = [(data["chain"], None)]
+    while pending:
+        link, parent_id = pending.pop()
+        species_id = _resource_id(link["species"]["url"])
+        nodes.append([species_id, link["species"]["name"], parent_id,
+                      describe_condition(link.get("evolution_details"))])
+        pending.extend((child, species_id) for child in reversed(link.get("evolves_to", [])))
+    compact = {"id": data["id"], "nodes": nodes}
+    return json.dumps(compact, separators=(",", ":")).encode("utf-8")
+
+
+class EvolutionChain:
+    """
+    One evolution family.
+
+    Attributes:
+        id (int): The chain's PokeAPI ID.
+        nodes (tuple): `(species_id, name, parent_id, condition)` tuples in
+                       depth-first order, starting with the base species
+                       (whose `parent_id` is None).
+    """
+
+    __slots__ = ("id", "nodes")
+
+    def __init__(self, id, nodes):
+        self.id = id
+        self.nodes = tuple(tuple(node) for node in nodes)
+
+    @classmethod
+    def from_json(cls, body):
+        """Builds a chain from the compact form stored in the cache."""
+        data = json.loads(body)
+        return cls(data["id"], data["nodes"])
+
+    @property
+    def species_ids(self):
+        """IDs of every species in the family."""
+        return [node[0] for node in self.nodes]
+
+    def children(self, species_id):
+        """The nodes a species evolves into."""
+        return [node for node in self.nodes if node[2] == species_id]
+
+    def parent(self, species_id):
+        """The node a species evolves from, or None for the base species."""
+        for node in self.nodes:
+            if node[0] == species_id:
+                return next((other for other in self.nodes if other[0] == node[2]), None)
+        return None
+
+    def tree_lines(self):
+        """
+        Lays the family out as an indented tree.
+
+        Returns:
+            list of tuple: `(text, species_id)` per line, e.g.
+                           ("└─ Ivysaur (level 16)", 2).
+        """
+        lines = []
+
+        def walk(node, prefix, last, root):
+            name = node[1].replace("-", " ").title()
+            label = f"{name} ({node[3]})" if node[3] else name
+            lines.append((label if root else f"{prefix}{'└─' if last else '├─'} {label}", node[0]))
+            children = self.children(node[0])
+            child_prefix = "" if root else prefix + ("   " if last else "│  ")
+            for index, child in enumerate(children):
+                walk(child, child_prefix, index == len(children) - 1, False)
+
+        if self.nodes:
+            walk(self.nodes[0], "", True, True)
+        return lines
+
+    def to_list(self):
+        """Returns the nodes as JSON-ready dictionaries."""
+        return [{"species_id": species_id, "name": name, "evolves_from": parent_id,
+                 "condition": condition}
+                for species_id, name, parent_id, condition in self.nodes]
+
+
+class EvolutionGraph:
+    """
+    Evolution chains loaded so far, indexed by every member species.
+
+    Thread-safe: lookups from several worker threads share fetches.
+    """
+
+    def __init__(self):
+        self._chains = {}          # chain ID -> EvolutionChain
+        self._species_chain = {}   # species ID -> chain ID
+        self._loading = {}         # chain ID -> lock held while it's fetched
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._chains)
+
+    def known(self, species_id):
+        """Returns the chain of a species if it's already loaded, else None."""
+        with self._lock:
+            chain_id = self._species_chain.get(species_id)
+            return self._chains.get(chain_id) if chain_id is not None else None
+
+    def chain_for(self, species_id, use_cache=True, refresh=False, priority=INTERACTIVE):
+        """
+        Returns the evolution chain of a species, loading it if needed.
+
+        Args:
+            species_id (int): The species ID (see `Pokemon.species_id`).
+            use_cache (bool, optional): If False, bypass the response cache.
+            refresh (bool, optional): If True, revalidate cached data.
+            priority (int, optional): Scheduler priority of any request.
+
+        Returns:
+            EvolutionChain or None: None if the species has no chain.
+
+        Raises:
+            requests.exceptions.RequestException: If a resource can't be
+                                                  fetched.
+        """
+        if not refresh:
+            chain = self.known(species_id)
+            if chain is not None:
+                return chain
+
+        client = get_client()
+        response = client.fetch(api_url("pokemon-species", species_id), use_cache=use_cache,
+                                refresh=refresh, transform=_compact_species, priority=priority)
+        response.raise_for_status()
+        chain_id = response.json()["chain_id"]
+        if chain_id is None:
+            return None
+
+        with self._lock:
+            chain = self._chains.get(chain_id)
+            if chain is not None and not refresh:
+                self._species_chain[species_id] = chain_id
+                return chain
+            loading = self._loading.setdefault(chain_id, threading.Lock())
+        with loading:
+            # Whoever held the lock before us may have just loaded it.
+            with self._lock:
+                chain = self._chains.get(chain_id)
+            if chain is None or refresh:
+                response = client.fetch(api_url("evolution-chain", chain_id), use_cache=use_cache,
+                                        refresh=refresh, transform=_compact_chain,
+                                        priority=priority)
+                response.raise_for_status()
+                chain = EvolutionChain.from_json(response.content)
+                self.add(chain)
+        return chain
+
+    def add(self, chain):
+        """Registers a chain under all of its member species."""
+        with self._lock:
+            self._chains[chain.id] = chain
+            for species_id in chain.species_ids:
+                self._species_chain[species_id] = chain.id
+            self._loading.pop(chain.id, None)
+
+
+_evolution_graph = None
+_evolution_graph_lock = threading.Lock()
+
+
+def get_evolution_graph():
+    """Returns the shared, process-wide `EvolutionGraph`."""
+    global _evolution_graph
+    with _evolution_graph_lock:
+        if _evolution_graph is None:
+            _evolution_graph = EvolutionGraph()
+        return _evolution_graph
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+PyDex Gateway: A local caching HTTP front for the PokeAPI.
+
+Services that each call the PokeAPI directly end up fetching the same
+popular entries over and over. `python pokedex.py --serve-http :8080` runs
+one shared gateway instead:
+
+    GET /pokemon/{id or name}            the projected record (PokeAPI-shaped
+                                         JSON with the fields PyDex uses)
+    GET /pokemon/{id or name}?view=raw   the full upstream payload
+    GET /metrics                         hit rates and counters as JSON
+
+Names are resolved with the local name index first, so "pikachu", "25" and
+"Pikachu" share one entry, and unknown names are answered with suggestions
+without any upstream request. Answers are kept in memory (LRU, with a
+time-to-live) on top of PyDex's own on-disk cache and offline snapshot.
+Concurrent requests for an entry that isn't in memory yet are coalesced:
+one of them does the fetch and the others wait for its result.
+
+Every response carries an `X-PyDex-Source` header saying how it was
+answered: "memory", "coalesced" (waited for another request's fetch) or
+"load" (fetched through the disk cache, the snapshot or the PokeAPI).
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from pokedex_client import api_url, get_client
+from pokedex_index import get_name_index
+
+# Answers kept in memory, and for how long (seconds).
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL = 10 * 60
+
+VIEWS = ("projected", "raw")
+
+
+class Coalescer:
+    """
+    Runs at most one call per key at a time; concurrent callers share it.
+
+    Also known as "single flight": if a call for a key is already running,
+    later callers wait for it and receive its result (or its exception)
+    instead of starting their own.
+    """
+
+    class _Call:
+        __slots__ = ("done", "result", "error")
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, function):
+        """
+        Calls `function()` unless a call for `key` is already in flight.
+
+        Args:
+            key: Identifies the work, e.g. `("raw", 25)`.
+            function (callable): Does the work; called without arguments.
+
+        Returns:
+            tuple: `(result, shared)`, where `shared` is True if the result
+                   came from another caller's call.
+
+        Raises:
+            Exception: Whatever `function` raised, in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def __len__(self):
+        return len(self._calls)
+
+
+def _json_body(data):
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class Gateway:
+    """
+    The caching and coalescing logic behind the HTTP server.
+
+    Attributes:
+        metrics (dict): Request counters (see `snapshot_metrics`).
+    """
+
+    def __init__(self, load, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        """
+        Args:
+            load (callable): Returns a `pokedex_model.Pokemon` for an ID,
+                             raising like `pokedex.load_pokemon_data`.
+            max_entries (int, optional): Answers kept in memory.
+            ttl (float, optional): Seconds an answer stays in memory.
+        """
+        self.load = load
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.coalescer = Coalescer()
+        self.metrics = {
+            "requests": 0, "memory_hits": 0, "coalesced": 0, "loads": 0,
+            "not_found": 0, "errors": 0, "evictions": 0, "load_seconds": 0.0,
+        }
+        self.started_at = time.time()
+        self._memory = OrderedDict()  # (view, id) -> (expires_at, status, body)
+        self._lock = threading.Lock()
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.metrics[name] += value
+
+    def get(self, identifier, view="projected"):
+        """
+        Answers a /pokemon request.
+
+        Args:
+            identifier (str): The name or ID from the URL.
+            view (str, optional): "projected" or "raw".
+
+        Returns:
+            tuple: `(status, body, source)`, with `body` as JSON bytes.
+        """
+        index = get_name_index()
+        if index is not None:
+            pokemon_id, suggestions = index.resolve(identifier)
+            if pokemon_id is None:
+                self._count(requests=1, not_found=1)
+                return 404, _json_body({"error": "not found", "suggestions": suggestions}), "index"
+        else:
+            pokemon_id = str(identifier).strip().lower()
+
+        key = (view, pokemon_id)
+        now = time.monotonic()
+        with self._lock:
+            self.metrics["requests"] += 1
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.metrics["memory_hits"] += 1
+                if entry[1] == 404:
+                    self.metrics["not_found"] += 1
+                return entry[1], entry[2], "memory"
+
+        try:
+            (status, body), shared = self.coalescer.run(key, lambda: self._load(view, pokemon_id))
+        except Exception as e:
+            self._count(errors=1)
+            return 502, _json_body({"error": f"upstream request failed: {e}"}), "error"
+        if shared:
+            self._count(coalesced=1)
+        if status == 404:
+            self._count(not_found=1)
+        return status, body, "coalesced" if shared else "load"
+
+    def _load(self, view, pokemon_id):
+        import requests
+
+        start = time.perf_counter()
+        try:
+            if view == "raw":
+                response = get_client().get(api_url("pokemon", pokemon_id))
+                response.raise_for_status()
+                status, body = 200, response.content
+            else:
+                status, body = 200, _json_body(self.load(pokemon_id).to_dict())
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            status, body = 404, _json_body({"error": "not found", "suggestions": []})
+        finally:
+            self._count(loads=1, load_seconds=time.perf_counter() - start)
+        self._remember((view, pokemon_id), status, body)
+        return status, body
+
+    def _remember(self, key, status, body):
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl, status, body)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def snapshot_metrics(self):
+        """
+        Returns the counters plus derived rates.
+
+        Returns:
+            dict: `requests`, `memory_hits`, `coalesced`, `loads`,
+                  `not_found`, `errors`, `evictions`, `hit_rate` (share of
+                  requests answered without a load of their own),
+                  `mean_load_ms`, `memory_entries`, `in_flight` and
+                  `uptime_s`.
+        """
+        with self._lock:
+            data = dict(self.metrics)
+            data["memory_entries"] = len(self._memory)
+        load_seconds = data.pop("load_seconds")
+        answered = data["requests"] - data["errors"]
+        data["hit_rate"] = round((answered - data["loads"]) / answered, 4) if answered else 0.0
+        data["mean_load_ms"] = round(load_seconds * 1000 / data["loads"], 3) if data["loads"] else 0.0
+        data["in_flight"] = len(self.coalescer)
+        data["uptime_s"] = round(time.time() - self.started_at, 1)
+        return data
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; don't let Nagle's algorithm
+    # hold the body back on keep-alive connections.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        gateway = self.server.gateway
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        source = None
+        if path.startswith("/pokemon/") and path.count("/") == 2:
+            view = parse_qs(parts.query).get("view", ["projected"])[0]
+            if view not in VIEWS:
+                status, body = 400, _json_body({"error": f"view must be one of: {', '.join(VIEWS)}"})
+            else:
+                status, body, source = gateway.get(unquote(path[len("/pokemon/"):]), view)
+        elif path == "/metrics":
+            status, body = 200, _json_body(gateway.snapshot_metrics())
+        else:
+            status, body = 404, _json_body({"error": "unknown path"})
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if source:
+            self.send_header("X-PyDex-Source", source)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # an access log would cost more than answering from memory
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    """
+    Parses "HOST:PORT", ":PORT" or "PORT" into a `(host, port)` pair.
+
+    Raises:
+        ValueError: If the port isn't a number.
+    """
+    host, _, port = str(text).rpartition(":")
+    host = host.strip("[]") or default_host
+    if not port.isdigit():
+        raise ValueError(f"Invalid address '{text}': expected HOST:PORT or :PORT.")
+    return host, int(port)
+
+
+class GatewayServer:
+    """A threaded HTTP server around a `Gateway`."""
+
+    def __init__(self, gateway, host="127.0.0.1", port=0):
+        """
+        Args:
+            gateway (Gateway): Answers the requests.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on; 0 picks a free one.
+        """
+        self.gateway = gateway
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.gateway = gateway
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        """Serves requests until `stop` is called (or KeyboardInterrupt)."""
+        self._server.serve_forever()
+
+    def start(self):
+        """Starts serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the server and releases its socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
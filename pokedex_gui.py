@@ -4,11 +4,35 @@ PyDex GUI: A Graphical Pokedex
 A modern, beautiful tkinter-based GUI for looking up Pokémon information from the PokéAPI.
 """
 
+import queue
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import messagebox
 import requests
 from PIL import Image, ImageTk
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from pokedex import load_evolution, load_pokemon_data
+from pokedex_index import build_name_index, get_name_index, suggest_names
+from pokedex_client import get_client
+from pokedex_scheduler import BULK, INTERACTIVE
+from pokedex_trace import count, span, traced
+
+SPRITE_SIZE = (250, 250)
+
+# Resized sprites kept in memory, and the neighbouring IDs whose data and
+# sprites are fetched ahead of time so flipping through the dex is instant
+SPRITE_CACHE_SIZE = 64
+PREFETCH_OFFSETS = (1, -1, 2, -2)
+
+# Browse grid: cell size (width, height), thumbnail size, how many decoded
+# thumbnails are kept, and how long scrolling must pause before the
+# thumbnails of the rows in view are loaded
+GRID_CELL = (124, 116)
+THUMBNAIL_SIZE = (72, 72)
+THUMBNAIL_CACHE_SIZE = 256
+THUMBNAIL_DELAY_MS = 60
 
 class PokedexGUI:
     def __init__(self, root):
@@ -46,7 +70,33 @@ class PokedexGUI:
             'dark': '#705848', 'steel': '#B8B8D0', 'fairy': '#EE99AC'
         }
         
+        # Network and image work runs on these threads so the window never
+        # freezes; results come back to the Tk thread through a queue that
+        # is drained with root.after (Tk itself is not thread-safe)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pydex-gui")
+        self._results = queue.Queue()
+        self._search_generation = 0
+        self._search_future = None
+        
+        # Prefetching gets its own small pool so it never delays a search
+        self.prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pydex-prefetch")
+        self._prefetch_futures = []
+        self._prefetching = set()
+        
+        # Pokémon ID -> resized PhotoImage (None if it has no sprite), LRU order.
+        # Sprite bytes themselves live in the on-disk response cache.
+        self._sprites = OrderedDict()
+        
+        # The browse grid decodes thumbnails on its own pool, and only for
+        # the rows in view; the cache of decoded thumbnails is bounded too
+        self.thumbnailer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pydex-thumbnails")
+        self._thumbnails = OrderedDict()
+        self._thumbnail_futures = {}
+        self._thumbnail_request = None
+        
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(16, self._drain_results)
         
     def setup_ui(self):
         # Gradient header - narrower
@@ -86,7 +136,12 @@ class PokedexGUI:
                                      relief=tk.FLAT, bg="#f1f5f9",
                                      fg=self.text_primary, borderwidth=0)
         self.search_entry.pack(side=tk.LEFT, ipady=10, padx=(0, 15))
-        self.search_entry.bind("<Return>", lambda e: self.search_pokemon())
+        self.search_entry.bind("<Return>", self.on_search_return)
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+        self.search_entry.bind("<Down>", lambda e: self.move_suggestion(1))
+        self.search_entry.bind("<Up>", lambda e: self.move_suggestion(-1))
+        self.search_entry.bind("<Escape>", lambda e: self.hide_suggestions())
+        self.search_entry.bind("<FocusOut>", lambda e: self.root.after(150, self.hide_suggestions))
         
         # Search button with modern style
         search_btn = tk.Button(search_frame, text="Search", command=self.search_pokemon,
@@ -96,6 +151,19 @@ class PokedexGUI:
                               borderwidth=0)
         search_btn.pack(side=tk.LEFT)
         
+        # Browse button: the whole dex as a grid of thumbnails
+        browse_btn = tk.Button(search_frame, text="Browse", command=self.show_browse,
+                              bg=self.card_bg, fg=self.accent, font=("Helvetica", 12, "bold"),
+                              relief=tk.FLAT, padx=20, pady=10, cursor="hand2",
+                              activebackground="#f1f5f9", activeforeground=self.accent_hover,
+                              borderwidth=0)
+        browse_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Loading / status line
+        self.status_label = tk.Label(main, text="", font=("Helvetica", 11),
+                                     bg=self.bg_main, fg=self.text_secondary)
+        self.status_label.pack(pady=(0, 6))
+        
         # Content area
         content = tk.Frame(main, bg=self.bg_main)
         content.pack(fill=tk.BOTH, expand=True, padx=30, pady=(0, 20))
@@ -104,16 +172,134 @@ class PokedexGUI:
         self.pokemon_card = tk.Frame(content, bg=self.card_bg, relief=tk.FLAT)
         self.pokemon_card.pack(fill=tk.BOTH, expand=True)
         
-        # Initial welcome state
+        # Autocomplete dropdown, floated over the content just below the entry
+        self.suggestion_list = tk.Listbox(self.root, font=("Helvetica", 12), height=8,
+                                          relief=tk.FLAT, bg=self.card_bg, fg=self.text_primary,
+                                          selectbackground=self.accent, selectforeground="white",
+                                          activestyle="none", borderwidth=0,
+                                          highlightthickness=1, highlightbackground="#e2e8f0")
+        self.suggestion_list.bind("<ButtonRelease-1>", self.on_suggestion_click)
+        self.suggestions = []
+        self.name_index = None
+        self._index_requested = False
+        
+        # The welcome screen, the result card and the browse grid are each
+        # built once and swapped in and out; searches only update the card's widgets
+        self.result_frame = None
+        self.browse_frame = None
+        self.build_welcome()
         self.show_welcome()
     
-    def show_welcome(self):
-        # Clear card
-        for widget in self.pokemon_card.winfo_children():
-            widget.destroy()
+    def run_in_background(self, work, on_done, on_error=None, executor=None):
+        """Run work() on the executor and pass its result to on_done on the Tk thread"""
+        future = (executor or self.executor).submit(work)
+        future.add_done_callback(lambda f: self._results.put((f, on_done, on_error)))
+        return future
+    
+    def _drain_results(self):
+        """Deliver finished background work to its callbacks (runs ~60 times a second)"""
+        try:
+            while True:
+                future, on_done, on_error = self._results.get_nowait()
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                if error is None:
+                    on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(16, self._drain_results)
+    
+    def on_close(self):
+        self.executor.shutdown(wait=False)
+        self.prefetcher.shutdown(wait=False)
+        self.thumbnailer.shutdown(wait=False)
+        self.root.destroy()
+    
+    def load_name_index(self):
+        """Load the name index in the background the first time it is needed"""
+        if self._index_requested:
+            return
+        self._index_requested = True
+        self.run_in_background(get_name_index, self.on_name_index_loaded)
+    
+    def on_name_index_loaded(self, index):
+        self.name_index = index
+        if index is not None:
+            self.update_suggestions()
+    
+    def on_search_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "KP_Enter", "Escape", "Tab"):
+            return
+        self.update_suggestions()
+    
+    def update_suggestions(self):
+        text = self.search_var.get()
+        if not text.strip():
+            self.hide_suggestions()
+            return
+        if self.name_index is None:
+            self.load_name_index()
+            return
+        
+        self.suggestions = self.name_index.complete(text, limit=8)
+        if not self.suggestions:
+            self.hide_suggestions()
+            return
+        
+        self.suggestion_list.delete(0, tk.END)
+        for pokemon_id, name in self.suggestions:
+            self.suggestion_list.insert(tk.END, f"  #{pokemon_id:03d}   {name.replace('-', ' ').title()}")
+        self.suggestion_list.configure(height=len(self.suggestions))
+        
+        # Position the dropdown right under the entry field
+        x = self.search_entry.winfo_rootx() - self.root.winfo_rootx()
+        y = self.search_entry.winfo_rooty() - self.root.winfo_rooty() + self.search_entry.winfo_height()
+        self.suggestion_list.place(x=x, y=y, width=self.search_entry.winfo_width())
+        self.suggestion_list.lift()
+    
+    def hide_suggestions(self):
+        self.suggestion_list.place_forget()
+        self.suggestions = []
+    
+    def move_suggestion(self, step):
+        if not self.suggestions:
+            return "break"
+        selection = self.suggestion_list.curselection()
+        index = (selection[0] + step) if selection else (0 if step > 0 else len(self.suggestions) - 1)
+        index = max(0, min(index, len(self.suggestions) - 1))
+        self.suggestion_list.selection_clear(0, tk.END)
+        self.suggestion_list.selection_set(index)
+        self.suggestion_list.see(index)
+        return "break"
+    
+    def choose_suggestion(self, index):
+        pokemon_id, name = self.suggestions[index]
+        self.search_var.set(name)
+        self.search_entry.icursor(tk.END)
+        self.search_pokemon()
+    
+    def on_search_return(self, event=None):
+        selection = self.suggestion_list.curselection()
+        if self.suggestions and selection:
+            self.choose_suggestion(selection[0])
+        else:
+            self.search_pokemon()
+    
+    def on_suggestion_click(self, event):
+        index = self.suggestion_list.nearest(event.y)
+        if 0 <= index < len(self.suggestions):
+            self.choose_suggestion(index)
+    
+    def build_welcome(self):
+        """Build the welcome screen (once)"""
+        self.welcome_frame = tk.Frame(self.pokemon_card, bg=self.card_bg)
         
         # Content frame centered in canvas
-        content_frame = tk.Frame(self.pokemon_card, bg=self.card_bg)
+        content_frame = tk.Frame(self.welcome_frame, bg=self.card_bg)
         content_frame.pack(expand=True, pady=180)
         
         # Load and display pokeball image
@@ -134,77 +320,181 @@ class PokedexGUI:
         tk.Label(content_frame, text="Enter a name or ID number in the search bar above", font=("Helvetica", 14),
                 bg=self.card_bg, fg=self.text_secondary).pack(pady=(10, 0))
     
+    def show_view(self, frame):
+        """Swap the welcome screen, result card or browse grid into the card"""
+        if frame.winfo_ismapped():
+            return
+        for view in (self.welcome_frame, self.result_frame, self.browse_frame):
+            if view is not None and view is not frame:
+                view.pack_forget()
+        frame.pack(fill=tk.BOTH, expand=True)
+    
+    def show_welcome(self):
+        self.show_view(self.welcome_frame)
+    
     def search_pokemon(self):
+        self.hide_suggestions()
         query = self.search_var.get().strip().lower()
         if not query:
             messagebox.showwarning("Empty Search", "Please enter a Pokémon name or ID")
             return
         
+        # Each search gets a new generation number; results from older
+        # searches that finish late are ignored
+        self._search_generation += 1
+        generation = self._search_generation
+        if self._search_future is not None:
+            self._search_future.cancel()  # only succeeds if it hasn't started yet
+        
+        self.show_loading(f"Searching for '{query}'...")
+        self._search_future = self.run_in_background(
+            lambda: self.load_search_result(query),
+            lambda result: self.on_search_done(generation, result),
+            lambda error: self.on_search_failed(generation, query, error))
+    
+    def load_search_result(self, query, priority=INTERACTIVE):
+        """Runs on a worker thread: fetch the Pokémon, its evolution family and its sprite"""
         try:
-            response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{query}")
-            if response.status_code == 200:
-                data = response.json()
-                self.display_pokemon(data)
-            else:
-                messagebox.showerror("Not Found", f"Pokémon '{query}' not found!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to fetch data:\n{str(e)}")
+            data = load_pokemon_data(query, priority=priority)
+        except requests.exceptions.HTTPError as error:
+            # Find "did you mean" names here, off the Tk thread, if the
+            # index didn't already attach them
+            if not hasattr(error, "suggestions"):
+                error.suggestions = suggest_names(query)
+            raise
+        # Neighbours are usually in the same family, so prefetching them
+        # mostly finds the chain in memory already
+        evolution = load_evolution(data, priority=priority)
+        if data.id in self._sprites:
+            count("gui.sprite.hit")
+            return data, None, evolution  # already resized and in memory
+        count("gui.sprite.miss")
+        return data, self.load_sprite_image(data.sprite_url, priority), evolution
+    
+    def load_sprite_image(self, sprite_url, priority=INTERACTIVE):
+        """Runs on a worker thread: download (or read from disk), decode and resize a sprite"""
+        if not sprite_url:
+            return None
+        try:
+            with span("gui.sprite.load"):
+                response = get_client().fetch(sprite_url, priority=priority)
+                response.raise_for_status()
+            with span("gui.sprite.decode", bytes=len(response.content)):
+                image = Image.open(BytesIO(response.content))
+                return image.resize(SPRITE_SIZE, Image.Resampling.LANCZOS)
+        except Exception:
+            return None
+    
+    def on_search_done(self, generation, result):
+        if generation != self._search_generation:
+            return  # a newer search has started since
+        self.hide_loading()
+        data, sprite_image, evolution = result
+        self.display_pokemon(data, self.sprite_photo(data, sprite_image), evolution)
+        self.prefetch_neighbours(data.id)
+    
+    def sprite_photo(self, data, sprite_image=None):
+        """Return the PhotoImage for a Pokémon, caching newly decoded sprites"""
+        if sprite_image is not None:
+            self.remember_sprite(data.id, ImageTk.PhotoImage(sprite_image))
+        elif not data.sprite_url:
+            self.remember_sprite(data.id, None)
+        if data.id not in self._sprites:
+            return None  # the download failed; try again next time
+        self._sprites.move_to_end(data.id)
+        return self._sprites[data.id]
     
-    def display_pokemon(self, data):
-        # Clear card
-        for widget in self.pokemon_card.winfo_children():
-            widget.destroy()
+    def remember_sprite(self, pokemon_id, photo):
+        self._sprites[pokemon_id] = photo
+        self._sprites.move_to_end(pokemon_id)
+        while len(self._sprites) > SPRITE_CACHE_SIZE:
+            self._sprites.popitem(last=False)
+    
+    def prefetch_neighbours(self, pokemon_id):
+        """Fetch the data and sprites of nearby IDs in the background"""
+        # Drop prefetches for the previous Pokémon that haven't started yet
+        for neighbour, future in self._prefetch_futures:
+            if future.cancel():
+                self._prefetching.discard(neighbour)
+        self._prefetch_futures = []
+        
+        for offset in PREFETCH_OFFSETS:
+            neighbour = pokemon_id + offset
+            if neighbour < 1 or neighbour in self._sprites or neighbour in self._prefetching:
+                continue
+            if self.name_index is not None and neighbour not in self.name_index.names:
+                continue
+            self._prefetching.add(neighbour)
+            future = self.run_in_background(
+                lambda neighbour=neighbour: self.load_search_result(str(neighbour), BULK),
+                lambda result, neighbour=neighbour: self.on_prefetch_done(neighbour, result),
+                lambda error, neighbour=neighbour: self._prefetching.discard(neighbour),
+                executor=self.prefetcher)
+            self._prefetch_futures.append((neighbour, future))
+    
+    def on_prefetch_done(self, pokemon_id, result):
+        self._prefetching.discard(pokemon_id)
+        data, sprite_image, _ = result
+        if sprite_image is not None or not data.sprite_url:
+            self.sprite_photo(data, sprite_image)
+    
+    def on_search_failed(self, generation, query, error):
+        if generation != self._search_generation:
+            return
+        self.hide_loading()
+        if isinstance(error, requests.exceptions.HTTPError):
+            message = f"Pokémon '{query}' not found!"
+            suggestions = getattr(error, "suggestions", None)
+            if suggestions:
+                message += f"\n\nDid you mean: {', '.join(suggestions)}?"
+            messagebox.showerror("Not Found", message)
+        else:
+            messagebox.showerror("Error", f"Failed to fetch data:\n{str(error)}")
+    
+    def show_loading(self, text):
+        self.status_label.config(text=text)
+        self.root.config(cursor="watch")
+    
+    def hide_loading(self):
+        self.status_label.config(text="")
+        self.root.config(cursor="")
+    
+    def build_result_card(self):
+        """Build the result card (once); display_pokemon fills it in"""
+        self.result_frame = tk.Frame(self.pokemon_card, bg=self.card_bg)
         
         # Main layout: left (sprite) | right (info)
-        left_panel = tk.Frame(self.pokemon_card, bg=self.card_bg, width=320)
+        left_panel = tk.Frame(self.result_frame, bg=self.card_bg, width=320)
         left_panel.pack(side=tk.LEFT, fill=tk.BOTH, padx=25, pady=20)
         left_panel.pack_propagate(False)
         
-        right_panel = tk.Frame(self.pokemon_card, bg=self.card_bg)
+        right_panel = tk.Frame(self.result_frame, bg=self.card_bg)
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(0, 25), pady=20)
         
         # LEFT PANEL - Sprite
         sprite_container = tk.Frame(left_panel, bg="#f8fafc")
         sprite_container.pack(expand=True, fill=tk.BOTH)
         
-        sprite_url = data['sprites']['front_default']
-        if sprite_url:
-            try:
-                img_response = requests.get(sprite_url)
-                img_data = Image.open(BytesIO(img_response.content))
-                img_data = img_data.resize((250, 250), Image.Resampling.LANCZOS)
-                sprite = ImageTk.PhotoImage(img_data)
-                sprite_label = tk.Label(sprite_container, image=sprite, bg="#f8fafc")
-                sprite_label.image = sprite
-                sprite_label.pack(expand=True)
-            except:
-                tk.Label(sprite_container, text="🖼️", font=("Helvetica", 60),
-                        bg="#f8fafc", fg=self.text_light).pack(expand=True)
+        self.sprite_label = tk.Label(sprite_container, font=("Helvetica", 60),
+                                     bg="#f8fafc", fg=self.text_light)
+        self.sprite_label.pack(expand=True)
         
         # Pokédex number badge
-        number_badge = tk.Label(left_panel, text=f"#{data['id']:03d}",
-                               font=("Helvetica", 14, "bold"), bg=self.accent,
-                               fg="white", padx=16, pady=6)
-        number_badge.pack(pady=(10, 0))
+        self.number_badge = tk.Label(left_panel, font=("Helvetica", 14, "bold"), bg=self.accent,
+                                     fg="white", padx=16, pady=6)
+        self.number_badge.pack(pady=(10, 0))
         
         # RIGHT PANEL - Info
         
         # Name
-        name = data['name'].title()
-        tk.Label(right_panel, text=name, font=("Helvetica", 28, "bold"),
-                bg=self.card_bg, fg=self.text_primary).pack(anchor=tk.W, pady=(0, 10))
+        self.name_label = tk.Label(right_panel, font=("Helvetica", 28, "bold"),
+                                   bg=self.card_bg, fg=self.text_primary)
+        self.name_label.pack(anchor=tk.W, pady=(0, 10))
         
-        # Types
-        type_frame = tk.Frame(right_panel, bg=self.card_bg)
-        type_frame.pack(anchor=tk.W, pady=(0, 12))
-        
-        for type_info in data['types']:
-            type_name = type_info['type']['name'].title()
-            type_color = self.type_colors.get(type_info['type']['name'], '#999')
-            
-            type_badge = tk.Label(type_frame, text=type_name, font=("Helvetica", 12, "bold"),
-                                 bg=type_color, fg="white", padx=16, pady=6)
-            type_badge.pack(side=tk.LEFT, padx=(0, 8))
+        # Types (badges are pooled and reused across searches)
+        self.type_frame = tk.Frame(right_panel, bg=self.card_bg)
+        self.type_frame.pack(anchor=tk.W, pady=(0, 12))
+        self.type_badges = []
         
         # Stats section
         tk.Label(right_panel, text="Base Stats", font=("Helvetica", 15, "bold"),
@@ -214,9 +504,10 @@ class PokedexGUI:
         stats_container.pack(fill=tk.BOTH, expand=True)
         
         stat_names = ['HP', 'Attack', 'Defense', 'Sp. Atk', 'Sp. Def', 'Speed']
+        self.stat_rows = []
+        self.stat_values = [0] * len(stat_names)
         
-        for i, (name, stat_data) in enumerate(zip(stat_names, data['stats'])):
-            value = stat_data['base_stat']
+        for name in stat_names:
             
             # Stat row
             row = tk.Frame(stats_container, bg=self.card_bg)
@@ -227,19 +518,17 @@ class PokedexGUI:
                     bg=self.card_bg, fg=self.text_secondary, width=10, anchor=tk.W).pack(side=tk.LEFT)
             
             # Value
-            tk.Label(row, text=str(value), font=("Helvetica", 11, "bold"),
-                    bg=self.card_bg, fg=self.text_primary, width=4, anchor=tk.E).pack(side=tk.LEFT, padx=(0, 10))
+            value_label = tk.Label(row, font=("Helvetica", 11, "bold"),
+                                   bg=self.card_bg, fg=self.text_primary, width=4, anchor=tk.E)
+            value_label.pack(side=tk.LEFT, padx=(0, 10))
             
-            # Bar background
-            bar_bg = tk.Frame(row, bg="#e2e8f0", height=18)
-            bar_bg.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            # Bar: one canvas per stat with a fill rectangle that gets resized
+            bar = tk.Canvas(row, bg="#e2e8f0", height=18, highlightthickness=0, borderwidth=0)
+            bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            bar_fill = bar.create_rectangle(0, 0, 0, 18, width=0)
+            bar.bind("<Configure>", lambda e: self.draw_stat_bars())
             
-            # Bar fill
-            percentage = min(value / 255, 1.0)
-            bar_color = self.get_stat_color(value)
-            
-            bar_fill = tk.Frame(bar_bg, bg=bar_color, height=18)
-            bar_fill.place(relwidth=percentage, relheight=1)
+            self.stat_rows.append((value_label, bar, bar_fill))
         
         # Physical info section
         tk.Label(right_panel, text="Physical Info", font=("Helvetica", 15, "bold"),
@@ -248,32 +537,91 @@ class PokedexGUI:
         info_grid = tk.Frame(right_panel, bg=self.card_bg)
         info_grid.pack(fill=tk.X)
         
+        self.height_value = info_item(info_grid, "Height", "", 0, 0)
+        self.weight_value = info_item(info_grid, "Weight", "", 1, 0)
+        self.abilities_value = info_item(info_grid, "Abilities", "", 0, 1)
+        self.hidden_value = info_item(info_grid, "Hidden Ability", "", 1, 1)
+        
+        # Evolution section: the family as a text tree
+        tk.Label(right_panel, text="Evolution", font=("Helvetica", 15, "bold"),
+                bg=self.card_bg, fg=self.text_primary).pack(anchor=tk.W, pady=(12, 8))
+        
+        self.evolution_value = tk.Label(right_panel, font=("Courier", 11), bg="#f8fafc",
+                                        fg=self.text_primary, justify=tk.LEFT, anchor=tk.W,
+                                        padx=10, pady=8)
+        self.evolution_value.pack(fill=tk.X)
+    
+    @traced("gui.render")
+    def display_pokemon(self, data, sprite=None, evolution=None):
+        """Show a Pokémon with its resized sprite PhotoImage and EvolutionChain, when they could be loaded"""
+        if self.result_frame is None:
+            self.build_result_card()
+        
+        # Sprite
+        if sprite is not None:
+            self.sprite_label.config(image=sprite, text="")
+        elif data.sprite_url:
+            self.sprite_label.config(image="", text="🖼️")
+        else:
+            self.sprite_label.config(image="", text="")
+        self.sprite_label.image = sprite  # Keep a reference
+        
+        self.number_badge.config(text=f"#{data.id:03d}")
+        self.name_label.config(text=data.name.title())
+        
+        # Types
+        while len(self.type_badges) < len(data.types):
+            self.type_badges.append(tk.Label(self.type_frame, font=("Helvetica", 12, "bold"),
+                                             fg="white", padx=16, pady=6))
+        for i, badge in enumerate(self.type_badges):
+            if i < len(data.types):
+                type_key = data.types[i]
+                badge.config(text=type_key.title(), bg=self.type_colors.get(type_key, '#999'))
+                badge.pack(side=tk.LEFT, padx=(0, 8))
+            else:
+                badge.pack_forget()
+        
+        # Stats
+        self.stat_values = list(data.stats)
+        for (value_label, bar, bar_fill), value in zip(self.stat_rows, self.stat_values):
+            value_label.config(text=str(value))
+        self.draw_stat_bars()
+        
         # Height
-        height_m = data['height'] / 10
+        height_m = data.height / 10
         feet = int(height_m * 3.28084)
         inches = int((height_m * 3.28084 - feet) * 12)
+        self.height_value.config(text=f"{height_m:.1f}m ({feet}'{inches:02d}\")")
         
-        info_item(info_grid, "Height", f"{height_m:.1f}m ({feet}'{inches:02d}\")", 0, 0)
-        
-        # Weight  
-        weight_kg = data['weight'] / 10
+        # Weight
+        weight_kg = data.weight / 10
         lbs = weight_kg * 2.20462
-        
-        info_item(info_grid, "Weight", f"{weight_kg:.1f}kg ({lbs:.1f} lbs)", 1, 0)
+        self.weight_value.config(text=f"{weight_kg:.1f}kg ({lbs:.1f} lbs)")
         
         # Abilities
-        abilities = [a['ability']['name'].replace('-', ' ').title() 
-                    for a in data['abilities'] if not a['is_hidden']]
-        ability_text = ", ".join(abilities) if abilities else "None"
-        
-        info_item(info_grid, "Abilities", ability_text, 0, 1)
+        abilities = [a.replace('-', ' ').title() for a in data.regular_abilities]
+        self.abilities_value.config(text=", ".join(abilities) if abilities else "None")
         
         # Hidden Ability
-        hidden_abilities = [a['ability']['name'].replace('-', ' ').title() 
-                           for a in data['abilities'] if a['is_hidden']]
-        hidden_text = ", ".join(hidden_abilities) if hidden_abilities else "None"
+        hidden_abilities = [a.replace('-', ' ').title() for a in data.hidden_abilities]
+        self.hidden_value.config(text=", ".join(hidden_abilities) if hidden_abilities else "None")
+        
+        # Evolution (the current Pokémon is marked)
+        if evolution is not None:
+            lines = [f"{text}  ◀" if species_id == data.species_id else text
+                     for text, species_id in evolution.tree_lines()]
+            self.evolution_value.config(text="\n".join(lines))
+        else:
+            self.evolution_value.config(text="Unknown")
         
-        info_item(info_grid, "Hidden Ability", hidden_text, 1, 1)
+        self.show_view(self.result_frame)
+    
+    def draw_stat_bars(self):
+        """Resize the stat bar rectangles to match the current values"""
+        for (value_label, bar, bar_fill), value in zip(self.stat_rows, self.stat_values):
+            percentage = min(value / 255, 1.0)
+            bar.coords(bar_fill, 0, 0, bar.winfo_width() * percentage, 18)
+            bar.itemconfig(bar_fill, fill=self.get_stat_color(value))
     
     def get_stat_color(self, value):
         """Return color gradient based on stat value"""
@@ -290,16 +638,229 @@ class PokedexGUI:
         else:
             return "#ef4444"  # Red
 
+    def show_browse(self):
+        """Show the browse grid, loading the list of Pokémon the first time"""
+        self.hide_suggestions()
+        if self.browse_frame is None:
+            self.build_browse()
+        self.show_view(self.browse_frame)
+        if not self.grid_entries and not self._browse_requested:
+            self._browse_requested = True
+            self.show_loading("Loading the Pokédex...")
+            self.run_in_background(lambda: get_name_index() or build_name_index(),
+                                   self.on_browse_index_loaded, self.on_browse_failed)
+    
+    def on_browse_index_loaded(self, index):
+        self.hide_loading()
+        self._browse_requested = False
+        if self.name_index is None:
+            self.name_index = index
+            self._index_requested = True
+        self.grid_entries = sorted(index.names.items())
+        self.layout_grid()
+    
+    def on_browse_failed(self, error):
+        self.hide_loading()
+        self._browse_requested = False
+        messagebox.showerror("Error", f"Failed to load the Pokédex:\n{str(error)}")
+    
+    def build_browse(self):
+        """Build the browse grid (once); its cells are created as needed and recycled"""
+        self.browse_frame = tk.Frame(self.pokemon_card, bg=self.card_bg)
+        self.grid_entries = []  # (id, name) of every Pokémon, by ID
+        self.grid_cells = []
+        self.grid_columns = 1
+        self.grid_margin = 0
+        self._browse_requested = False
+        
+        self.grid_scrollbar = tk.Scrollbar(self.browse_frame, orient=tk.VERTICAL)
+        self.grid_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # One canvas for the whole dex: the scroll region is as tall as every
+        # row together, but only the rows in view have cells on it
+        self.grid_canvas = tk.Canvas(self.browse_frame, bg=self.card_bg, highlightthickness=0,
+                                     borderwidth=0, cursor="hand2",
+                                     yscrollincrement=GRID_CELL[1] // 2,
+                                     yscrollcommand=self.on_grid_scroll)
+        self.grid_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.grid_scrollbar.config(command=self.grid_canvas.yview)
+        
+        self.grid_canvas.bind("<Configure>", lambda e: self.layout_grid())
+        self.grid_canvas.bind("<MouseWheel>", self.on_grid_wheel)
+        self.grid_canvas.bind("<Button-4>", self.on_grid_wheel)
+        self.grid_canvas.bind("<Button-5>", self.on_grid_wheel)
+        self.grid_canvas.bind("<ButtonRelease-1>", self.on_grid_click)
+    
+    def create_grid_cell(self):
+        """Add a cell to the pool, hidden until place_grid_cells gives it an entry"""
+        canvas = self.grid_canvas
+        cell_width, cell_height = GRID_CELL
+        tag = f"cell{len(self.grid_cells)}"
+        tags = ("cell", tag)
+        canvas.create_rectangle(5, 5, cell_width - 5, cell_height - 5, fill="#f8fafc",
+                                width=0, tags=tags)
+        image = canvas.create_image(cell_width // 2, 10 + THUMBNAIL_SIZE[1] // 2, tags=tags)
+        number = canvas.create_text(cell_width // 2, cell_height - 30, font=("Helvetica", 9),
+                                    fill=self.text_secondary, tags=tags)
+        name = canvas.create_text(cell_width // 2, cell_height - 16, font=("Helvetica", 10, "bold"),
+                                  fill=self.text_primary, tags=tags)
+        canvas.itemconfig(tag, state=tk.HIDDEN)
+        return GridCell(tag, image, number, name)
+    
+    def layout_grid(self):
+        """Fit the columns to the canvas width and size the scroll region for the whole dex"""
+        canvas = self.grid_canvas
+        cell_width, cell_height = GRID_CELL
+        width = max(canvas.winfo_width(), cell_width)
+        self.grid_columns = width // cell_width
+        self.grid_margin = (width - self.grid_columns * cell_width) // 2
+        rows = -(-len(self.grid_entries) // self.grid_columns)
+        
+        # Every cell moves when the column count changes
+        canvas.itemconfig("cell", state=tk.HIDDEN)
+        for cell in self.grid_cells:
+            cell.index = None
+        canvas.config(scrollregion=(0, 0, width, rows * cell_height))
+        self.place_grid_cells()
+    
+    def on_grid_scroll(self, first, last):
+        self.grid_scrollbar.set(first, last)
+        self.place_grid_cells()
+    
+    def on_grid_wheel(self, event):
+        step = -1 if event.num == 4 or event.delta > 0 else 1
+        self.grid_canvas.yview_scroll(step, "units")
+        return "break"
+    
+    def on_grid_click(self, event):
+        cell_width, cell_height = GRID_CELL
+        column = (int(self.grid_canvas.canvasx(event.x)) - self.grid_margin) // cell_width
+        row = int(self.grid_canvas.canvasy(event.y)) // cell_height
+        index = row * self.grid_columns + column
+        if 0 <= column < self.grid_columns and 0 <= index < len(self.grid_entries):
+            self.search_var.set(self.grid_entries[index][1])
+            self.search_pokemon()
+    
+    def place_grid_cells(self):
+        """Point the pooled cells at the rows in view (the only work a scroll does)"""
+        if not self.grid_entries:
+            return
+        canvas = self.grid_canvas
+        cell_width, cell_height = GRID_CELL
+        first_row = max(int(canvas.canvasy(0)) // cell_height, 0)
+        # Rows in view, plus the partly visible ones at the top and bottom
+        needed = (canvas.winfo_height() // cell_height + 2) * self.grid_columns
+        while len(self.grid_cells) < needed:
+            self.grid_cells.append(self.create_grid_cell())
+        
+        first = first_row * self.grid_columns
+        changed = False
+        for slot, cell in enumerate(self.grid_cells):
+            index = first + slot
+            if slot >= needed or index >= len(self.grid_entries):
+                if cell.index is not None:
+                    canvas.itemconfig(cell.tag, state=tk.HIDDEN)
+                    cell.index = cell.pokemon_id = cell.photo = None
+                continue
+            if cell.index == index:
+                continue  # a scroll within the same rows moves nothing
+            
+            row, column = divmod(index, self.grid_columns)
+            x, y = self.grid_margin + column * cell_width, row * cell_height
+            canvas.move(cell.tag, x - cell.x, y - cell.y)
+            cell.x, cell.y, cell.index = x, y, index
+            
+            pokemon_id, name = self.grid_entries[index]
+            name = name.replace('-', ' ').title()
+            canvas.itemconfig(cell.number, text=f"#{pokemon_id:03d}")
+            canvas.itemconfig(cell.name, text=name if len(name) <= 15 else name[:14] + "…")
+            cell.pokemon_id = pokemon_id
+            self.show_thumbnail(cell)
+            canvas.itemconfig(cell.tag, state=tk.NORMAL)
+            changed = True
+        
+        if changed:
+            self.schedule_thumbnails()
+    
+    def show_thumbnail(self, cell):
+        """Put a cell's thumbnail on it if it has been decoded, else leave it blank"""
+        photo = self._thumbnails.get(cell.pokemon_id)
+        if photo is not None:
+            self._thumbnails.move_to_end(cell.pokemon_id)
+        cell.photo = photo  # Keep a reference
+        self.grid_canvas.itemconfig(cell.image, image=photo or "")
+    
+    def schedule_thumbnails(self):
+        """Load the thumbnails in view once scrolling pauses, not for every row flicked past"""
+        if self._thumbnail_request is not None:
+            self.root.after_cancel(self._thumbnail_request)
+        self._thumbnail_request = self.root.after(THUMBNAIL_DELAY_MS, self.load_visible_thumbnails)
+    
+    def load_visible_thumbnails(self):
+        """Queue the missing thumbnails of the cells in view and drop requests for cells scrolled away"""
+        self._thumbnail_request = None
+        wanted = [cell.pokemon_id for cell in self.grid_cells
+                  if cell.pokemon_id is not None and cell.pokemon_id not in self._thumbnails]
+        for pokemon_id, future in list(self._thumbnail_futures.items()):
+            if pokemon_id not in wanted and future.cancel():
+                del self._thumbnail_futures[pokemon_id]
+        
+        for pokemon_id in wanted:  # top to bottom
+            if pokemon_id in self._thumbnail_futures:
+                continue
+            self._thumbnail_futures[pokemon_id] = self.run_in_background(
+                lambda pokemon_id=pokemon_id: self.load_thumbnail(pokemon_id),
+                lambda image, pokemon_id=pokemon_id: self.on_thumbnail_loaded(pokemon_id, image),
+                lambda error, pokemon_id=pokemon_id: self._thumbnail_futures.pop(pokemon_id, None),
+                executor=self.thumbnailer)
+    
+    def load_thumbnail(self, pokemon_id):
+        """Runs on a worker thread: read (or download) a sprite and shrink it to a thumbnail"""
+        data = load_pokemon_data(str(pokemon_id), priority=BULK)
+        if not data.sprite_url:
+            return None
+        with span("gui.thumbnail.load"):
+            response = get_client().fetch(data.sprite_url, priority=BULK)
+            response.raise_for_status()
+        with span("gui.thumbnail.decode", bytes=len(response.content)):
+            image = Image.open(BytesIO(response.content))
+            image.thumbnail(THUMBNAIL_SIZE)
+            return image
+    
+    def on_thumbnail_loaded(self, pokemon_id, image):
+        self._thumbnail_futures.pop(pokemon_id, None)
+        self._thumbnails[pokemon_id] = ImageTk.PhotoImage(image) if image is not None else None
+        self._thumbnails.move_to_end(pokemon_id)
+        while len(self._thumbnails) > THUMBNAIL_CACHE_SIZE:
+            self._thumbnails.popitem(last=False)
+        for cell in self.grid_cells:
+            if cell.pokemon_id == pokemon_id:
+                self.show_thumbnail(cell)
+
+class GridCell:
+    """One pooled cell of the browse grid: its canvas items and the entry it shows"""
+    __slots__ = ("tag", "image", "number", "name", "x", "y", "index", "pokemon_id", "photo")
+    
+    def __init__(self, tag, image, number, name):
+        self.tag = tag
+        self.image = image
+        self.number = number
+        self.name = name
+        self.x = self.y = 0
+        self.index = self.pokemon_id = self.photo = None
+
 def info_item(parent, label, value, col, row):
-    """Helper to create info grid items"""
+    """Helper to create info grid items; returns the value label"""
     frame = tk.Frame(parent, bg="#f8fafc", padx=10, pady=8)
     frame.grid(row=row, column=col, sticky="ew", padx=(0, 6 if col == 0 else 0), pady=(0, 6 if row == 0 else 0))
     parent.grid_columnconfigure(col, weight=1)
     
     tk.Label(frame, text=label, font=("Helvetica", 9),
             bg="#f8fafc", fg="#64748b").pack(anchor=tk.W)
-    tk.Label(frame, text=value, font=("Helvetica", 11, "bold"),
-            bg="#f8fafc", fg="#1e293b").pack(anchor=tk.W, pady=(2, 0))
+    value_label = tk.Label(frame, text=value, font=("Helvetica", 11, "bold"),
+                           bg="#f8fafc", fg="#1e293b")
+    value_label.pack(anchor=tk.W, pady=(2, 0))
+    return value_label
 
 def main():
     root = tk.Tk()
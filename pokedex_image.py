@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+PyDex Image: The offline Pokédex as one memory-mapped binary file.
+
+Answering a lookup from the SQLite snapshot means opening the database,
+running a query and parsing a JSON record, and loading the stat matrix
+means reading every row. `--sync` therefore also writes a dex image next
+to the snapshot, a flat little-endian file that is opened with `mmap` and
+read in place:
+
+    header    magic, format version, record size and count, sync time,
+              and the offset of each section below
+    records   one fixed-width record per Pokémon, ordered by ID: ID,
+              species ID, height, weight, the six base stats, two type
+              numbers, and (offset, length) references into the strings
+    strings   UTF-8 names, ability lists and sprite URLs, each stored once
+    by name   record numbers ordered by name, for binary search
+
+A lookup binary-searches the records (by ID) or the name index and
+decodes just the one record it finds; nothing else is read or parsed, so
+it costs the same whatever the size of the dex. `DexImage.array` exposes
+the record table as a NumPy structured array that is a view of the mapped
+file, which `pokedex_stats` uses as its stat matrix without copying.
+
+A new image is written atomically at the end of every sync; readers that
+find an image from another format version ignore it.
+"""
+
+import mmap
+import os
+import struct
+import threading
+
+from pokedex_cache import default_cache_dir
+from pokedex_model import STAT_NAMES, TYPE_NAMES, Pokemon
+
+MAGIC = b"PYDEXIMG"
+VERSION = 1
+
+# magic, version, record size, record count, flags, synced_at, records
+# offset, strings offset, strings size, name index offset, padding.
+_HEADER = struct.Struct("<8sHHIId4Q4x")
+
+# id, species_id (0 if unknown), height, weight, six stats, two type
+# numbers (-1 if none), two padding bytes, then offsets and lengths of
+# the name, ability list and sprite URL in the string table.
+_RECORD = struct.Struct("<4i6h2b2x3I3H2x")
+
+_INDEX_ENTRY = struct.Struct("<I")
+
+_TYPE_INDEX = {name: index for index, name in enumerate(TYPE_NAMES)}
+
+
+class ImageError(Exception):
+    """Raised when a file isn't a dex image this version can read."""
+
+
+def default_image_path():
+    """Returns the location of the dex image in the cache directory."""
+    return os.path.join(default_cache_dir(), "dex.img")
+
+
+def record_dtype():
+    """
+    Returns the NumPy dtype of one record, matching the on-disk layout.
+
+    The fields use the dtypes of `pokedex_stats.StatMatrix`, so its
+    columns can be views of the mapped file.
+    """
+    import numpy as np
+
+    return np.dtype({
+        "names": ["id", "species_id", "height", "weight", "stats", "type_slots",
+                  "name_offset", "abilities_offset", "sprite_offset",
+                  "name_length", "abilities_length", "sprite_length"],
+        "formats": ["<i4", "<i4", "<i4", "<i4", ("<i2", (len(STAT_NAMES),)), ("i1", (2,)),
+                    "<u4", "<u4", "<u4", "<u2", "<u2", "<u2"],
+        "offsets": [0, 4, 8, 12, 16, 28, 32, 36, 40, 44, 46, 48],
+        "itemsize": _RECORD.size,
+    })
+
+
+def _encode_abilities(abilities):
+    # "overgrow,*chlorophyll": hidden abilities are marked with "*".
+    return ",".join(f"*{name}" if hidden else name for name, hidden in abilities)
+
+
+def _decode_abilities(text):
+    return [(name.lstrip("*"), name.startswith("*")) for name in text.split(",") if name]
+
+
+def write_image(records, path=None, synced_at=0.0):
+    """
+    Writes a dex image.
+
+    Args:
+        records (iterable): `pokedex_model.Pokemon` records; sorted by ID.
+        path (str, optional): Where to write it; replaced atomically.
+                              Defaults to `default_image_path()`.
+        synced_at (float, optional): When the source snapshot was synced.
+
+    Returns:
+        int: Number of records written.
+    """
+    path = path or default_image_path()
+    records = sorted(records, key=lambda record: record.id)
+    strings = bytearray()
+    string_offsets = {}
+
+    def intern(text):
+        if not text:
+            return 0, 0
+        data = text.encode("utf-8")
+        offset = string_offsets.get(data)
+        if offset is None:
+            offset = string_offsets[data] = len(strings)
+            strings.extend(data)
+        return offset, len(data)
+
+    table = bytearray(_RECORD.size * len(records))
+    for row, record in enumerate(records):
+        types = [_TYPE_INDEX.get(type_name, -1) for type_name in record.types[:2]]
+        types += [-1] * (2 - len(types))
+        name = intern(record.name)
+        abilities = intern(_encode_abilities(record.abilities))
+        sprite = intern(record.sprite_url)
+        _RECORD.pack_into(table, row * _RECORD.size, record.id, record.species_id or 0,
+                          record.height, record.weight, *record.stats, *types,
+                          name[0], abilities[0], sprite[0], name[1], abilities[1], sprite[1])
+
+    by_name = sorted(range(len(records)), key=lambda row: records[row].name.encode("utf-8"))
+    index = b"".join(_INDEX_ENTRY.pack(row) for row in by_name)
+
+    records_offset = _HEADER.size
+    strings_offset = records_offset + len(table)
+    index_offset = strings_offset + len(strings)
+    header = _HEADER.pack(MAGIC, VERSION, _RECORD.size, len(records), 0, float(synced_at),
+                          records_offset, strings_offset, len(strings), index_offset)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(header)
+        handle.write(table)
+        handle.write(strings)
+        handle.write(index)
+    os.replace(temp_path, path)
+    return len(records)
+
+
+class DexImage:
+    """
+    A read-only, memory-mapped dex image.
+
+    Safe to share between threads: it is never written to.
+
+    Attributes:
+        path (str): The image file.
+        synced_at (float): When the snapshot it was built from was synced.
+    """
+
+    def __init__(self, path=None):
+        """
+        Maps an image into memory.
+
+        Args:
+            path (str, optional): The image file. Defaults to
+                                  `default_image_path()`.
+
+        Raises:
+            OSError: If the file can't be opened.
+            ImageError: If it isn't a valid image of this format version.
+        """
+        self.path = path or default_image_path()
+        with open(self.path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < _HEADER.size:
+                raise ImageError(f"{self.path} is too small to be a dex image.")
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, record_size, self._count, _, self.synced_at, self._records,
+         self._strings, strings_size, self._index) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != _RECORD.size:
+            self._map.close()
+            raise ImageError(f"{self.path} is not a version {VERSION} dex image.")
+        if (self._records + self._count * _RECORD.size > self._strings
+                or self._strings + strings_size > self._index
+                or self._index + self._count * _INDEX_ENTRY.size > size):
+            self._map.close()
+            raise ImageError(f"{self.path} is truncated.")
+
+    def __len__(self):
+        return self._count
+
+    # -- Reading records -------------------------------------------------
+
+    def _record(self, row):
+        return _RECORD.unpack_from(self._map, self._records + row * _RECORD.size)
+
+    def _string(self, offset, length):
+        start = self._strings + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _id_at(self, row):
+        return struct.unpack_from("<i", self._map, self._records + row * _RECORD.size)[0]
+
+    def _name_at(self, row):
+        # The name's offset and length sit at fixed positions in the record.
+        base = self._records + row * _RECORD.size
+        offset, = struct.unpack_from("<I", self._map, base + 32)
+        length, = struct.unpack_from("<H", self._map, base + 44)
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def _pokemon(self, row):
+        values = self._record(row)
+        pokemon_id, species_id, height, weight = values[:4]
+        stats = values[4:10]
+        types = [TYPE_NAMES[slot] for slot in values[10:12] if slot >= 0]
+        name_offset, abilities_offset, sprite_offset, name_length, abilities_length, \
+            sprite_length = values[12:]
+        return Pokemon(pokemon_id, self._string(name_offset, name_length), types, stats,
+                       _decode_abilities(self._string(abilities_offset, abilities_length)),
+                       height, weight,
+                       self._string(sprite_offset, sprite_length) if sprite_length else None,
+                       species_id or None)
+
+    def find(self, identifier):
+        """
+        Finds the record number of a Pokémon by ID or exact name.
+
+        Returns:
+            int or None: The record number, or None if it isn't in the image.
+        """
+        key = str(identifier).strip().lower()
+        low, high = 0, self._count
+        if key.isdigit():
+            target = int(key)
+            while low < high:
+                middle = (low + high) // 2
+                if self._id_at(middle) < target:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low if low < self._count and self._id_at(low) == target else None
+
+        target = key.encode("utf-8")
+
+        def row_at(position):
+            return _INDEX_ENTRY.unpack_from(self._map, self._index + position * _INDEX_ENTRY.size)[0]
+
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_at(row_at(middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._name_at(row_at(low)) == target:
+            return row_at(low)
+        return None
+
+    def get_pokemon(self, identifier):
+        """Returns the `Pokemon` record for a name or ID, or None."""
+        row = self.find(identifier)
+        return self._pokemon(row) if row is not None else None
+
+    def _rows(self, view):
+        # Unpack the whole record table in one pass, straight from the map.
+        end = self._records + self._count * _RECORD.size
+        with view[self._records:end] as table:
+            return list(_RECORD.iter_unpack(table))
+
+    def ids(self):
+        """Returns the sorted IDs of every Pokémon in the image."""
+        with memoryview(self._map) as view:
+            return [values[0] for values in self._rows(view)]
+
+    def names(self):
+        """Returns `(id, name)` pairs for every Pokémon, by ID."""
+        with memoryview(self._map) as view, view[self._strings:self._index] as strings:
+            return [(values[0], str(strings[values[12]:values[12] + values[15]], "utf-8"))
+                    for values in self._rows(view)]
+
+    def records(self):
+        """Returns every Pokémon as `Pokemon` records, by ID."""
+        return [self._pokemon(row) for row in range(self._count)]
+
+    def array(self):
+        """
+        Returns the record table as a read-only NumPy structured array (see
+        `record_dtype`) that shares memory with the mapped file.
+        """
+        import numpy as np
+
+        return np.frombuffer(self._map, dtype=record_dtype(), count=self._count,
+                             offset=self._records)
+
+    def close(self):
+        """Unmaps the file, unless NumPy views of it are still alive."""
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # unmapped when the last view is garbage collected
+
+
+_default_image = None
+_default_image_lock = threading.Lock()
+
+
+def get_default_image():
+    """
+    Returns the shared image of the offline snapshot, or None.
+
+    If a snapshot exists but has no image yet (it was synced by an older
+    PyDex), the image is written from it first.
+    """
+    global _default_image
+    with _default_image_lock:
+        if _default_image is None:
+            path = default_image_path()
+            if not os.path.exists(path):
+                from pokedex_snapshot import get_default_snapshot
+
+                snapshot = get_default_snapshot()
+                if snapshot is None:
+                    return None
+                try:
+                    write_image(snapshot.records(), path, snapshot.synced_at or 0.0)
+                except OSError:
+                    return None
+            try:
+                _default_image = DexImage(path)
+            except (OSError, ValueError, ImageError):
+                _default_image = False
+        return _default_image if _default_image is not False else None
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+PyDex Index: Local name/ID resolution with typo-tolerant suggestions.
+
+Misspelling a name used to cost a full round-trip to the PokeAPI just to be
+told "not found". This module keeps an index of every Pokémon name and ID
+(built once from the /pokemon listing and kept in the response cache, or
+taken from the offline snapshot) and resolves identifiers before any HTTP
+request is made:
+
+- Numeric IDs and exact names are looked up directly.
+- Alternate spellings are normalized ("Mr. Mime" -> "mr-mime",
+  "Farfetch'd" -> "farfetchd", "Flabébé" -> "flabebe").
+- Species names map to their default form ("deoxys" -> "deoxys-normal").
+- Typos are matched with a trigram index; a single clear winner is used
+  automatically, otherwise "did you mean" suggestions are offered.
+
+It also provides `PrefixTrie`, which powers as-you-type completion in the GUI.
+"""
+
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from pokedex_client import api_url, get_client
+from pokedex_image import get_default_image
+from pokedex_snapshot import LISTING_PAGE_SIZE, get_default_snapshot
+from pokedex_trace import span
+
+# Alternate forms (megas, regional variants, ...) use IDs from 10001 upwards.
+FORM_ID_OFFSET = 10000
+
+# Minimum similarity for a fuzzy match to be used without asking, and how
+# far ahead of the runner-up it has to be.
+AUTO_CORRECT_SCORE = 0.7
+AUTO_CORRECT_MARGIN = 0.15
+
+# Seconds to wait before trying to build the shared index again after it
+# couldn't be built (e.g. the PokeAPI was briefly unreachable).
+INDEX_RETRY_DELAY = 30.0
+
+_SEPARATORS = re.compile(r"[\s_.:]+")
+_DROPPED = re.compile(r"['’]")
+_GENDER_SIGNS = {"♀": "-f", "♂": "-m"}
+
+
+def normalize_name(text):
+    """
+    Converts user input into the PokeAPI's naming style.
+
+    Args:
+        text (str): A name as typed by the user.
+
+    Returns:
+        str: Lower-case, hyphen-separated ASCII name.
+    """
+    text = str(text).strip().lower()
+    for sign, suffix in _GENDER_SIGNS.items():
+        text = text.replace(sign, suffix)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _DROPPED.sub("", text)
+    text = _SEPARATORS.sub("-", text)
+    return re.sub(r"-{2,}", "-", text).strip("-")
+
+
+def _trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PrefixTrie:
+    """
+    A prefix tree that returns the first few completions of a prefix.
+
+    Every node keeps the first `limit` values inserted below it, so a lookup
+    only walks the characters of the prefix and never the subtree. Insert
+    values in the order they should be suggested.
+    """
+
+    __slots__ = ("limit", "_root")
+
+    class _Node:
+        __slots__ = ("children", "top")
+
+        def __init__(self):
+            self.children = {}
+            self.top = []
+
+    def __init__(self, limit=10):
+        """
+        Args:
+            limit (int, optional): Maximum completions kept per prefix.
+        """
+        self.limit = limit
+        self._root = self._Node()
+
+    def insert(self, key, value):
+        """Adds `value` as a completion for every prefix of `key`."""
+        node = self._root
+        if len(node.top) < self.limit:
+            node.top.append(value)
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = self._Node()
+            node = child
+            if len(node.top) < self.limit:
+                node.top.append(value)
+
+    def complete(self, prefix, limit=None):
+        """
+        Returns up to `limit` values whose keys start with `prefix`.
+
+        Args:
+            prefix (str): The text typed so far.
+            limit (int, optional): Maximum results; defaults to the trie's limit.
+
+        Returns:
+            list: Matching values in insertion order.
+        """
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.top[:limit or self.limit]
+
+
+class NameIndex:
+    """
+    An in-memory index of Pokémon names and IDs.
+
+    Attributes:
+        ids (dict): Maps each name to its ID.
+        names (dict): Maps each ID to its name.
+    """
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries (iterable): `(id, name)` pairs, as in the /pokemon listing.
+        """
+        self.ids = {}
+        self.names = {}
+        for pokemon_id, name in entries:
+            self.ids[name] = pokemon_id
+            self.names[pokemon_id] = name
+        self._default_forms = self._build_default_forms()
+        self._entries = None
+        self._trigram_index = None
+        self._trie = None
+
+    def _build_default_forms(self):
+        # "deoxys" isn't a /pokemon name, but "deoxys-normal" (ID 386) is the
+        # species' default form. Map each such species prefix to the
+        # lowest-numbered main-series entry that starts with it.
+        forms = {}
+        for name, pokemon_id in self.ids.items():
+            if pokemon_id > FORM_ID_OFFSET or "-" not in name:
+                continue
+            prefix = name
+            while "-" in prefix:
+                prefix = prefix.rsplit("-", 1)[0]
+                if prefix in self.ids:
+                    break
+                if prefix not in forms or pokemon_id < self.ids[forms[prefix]]:
+                    forms[prefix] = name
+        return forms
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, identifier):
+        return self.lookup(identifier) is not None
+
+    def lookup(self, identifier):
+        """
+        Finds the exact Pokémon for an ID, name or alternate spelling.
+
+        Args:
+            identifier (str or int): What the user typed.
+
+        Returns:
+            int or None: The Pokémon's ID, or None if there's no exact match.
+        """
+        key = str(identifier).strip()
+        if key.isdigit():
+            pokemon_id = int(key)
+            return pokemon_id if pokemon_id in self.names else None
+        name = normalize_name(key)
+        if name in self.ids:
+            return self.ids[name]
+        if name in self._default_forms:
+            return self.ids[self._default_forms[name]]
+        return None
+
+    def suggest(self, identifier, limit=5):
+        """
+        Ranks the names most similar to `identifier`.
+
+        Candidates sharing trigrams with the query are scored by their Dice
+        coefficient and refined with `difflib`'s similarity ratio. The
+        trigram index is built on the first call; exact lookups never need
+        it.
+
+        Args:
+            identifier (str): The (possibly misspelled) name.
+            limit (int, optional): Maximum number of suggestions.
+
+        Returns:
+            list of tuple: `(name, score)` pairs, best first; scores are
+                           between 0 and 1.
+        """
+        import difflib
+
+        name = normalize_name(identifier)
+        if not name:
+            return []
+        if self._trigram_index is None:
+            self._entries = sorted(self.ids)
+            trigram_index = defaultdict(list)
+            for position, entry in enumerate(self._entries):
+                for trigram in _trigrams(entry):
+                    trigram_index[trigram].append(position)
+            self._trigram_index = trigram_index
+        query = _trigrams(name)
+        shared = defaultdict(int)
+        for trigram in query:
+            for position in self._trigram_index.get(trigram, ()):
+                shared[position] += 1
+        if not shared:
+            return []
+
+        candidates = sorted(shared, key=lambda position: -shared[position])[:limit * 8]
+        scored = []
+        for position in candidates:
+            candidate = self._entries[position]
+            dice = 2 * shared[position] / (len(query) + len(_trigrams(candidate)))
+            ratio = difflib.SequenceMatcher(None, name, candidate).ratio()
+            scored.append((candidate, round((dice + ratio) / 2, 3)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def complete(self, prefix, limit=8):
+        """
+        Suggests Pokémon whose name or ID starts with `prefix`.
+
+        The prefix trie is built on the first call.
+
+        Args:
+            prefix (str): The text typed so far, e.g. "pika", "Mr. M" or "25".
+            limit (int, optional): Maximum number of completions.
+
+        Returns:
+            list of tuple: `(id, name)` pairs, lowest ID first.
+        """
+        if self._trie is None:
+            trie = PrefixTrie(limit=max(limit, 10))
+            for pokemon_id in sorted(self.names):
+                entry = (pokemon_id, self.names[pokemon_id])
+                trie.insert(entry[1], entry)
+                trie.insert(str(pokemon_id), entry)
+            self._trie = trie
+        key = prefix.strip()
+        if not key.isdigit():
+            key = normalize_name(key)
+        if not key:
+            return []
+        return self._trie.complete(key, limit)
+
+    def resolve(self, identifier):
+        """
+        Resolves user input to a Pokémon ID without touching the network.
+
+        Args:
+            identifier (str or int): What the user typed.
+
+        Returns:
+            tuple: `(pokemon_id, suggestions)`. `pokemon_id` is None if
+                   nothing matched confidently, in which case `suggestions`
+                   lists the closest names.
+        """
+        pokemon_id = self.lookup(identifier)
+        if pokemon_id is not None:
+            return pokemon_id, []
+        if str(identifier).strip().isdigit():
+            return None, []
+
+        suggestions = self.suggest(identifier)
+        if suggestions:
+            best_name, best_score = suggestions[0]
+            runner_up = suggestions[1][1] if len(suggestions) > 1 else 0
+            if best_score >= AUTO_CORRECT_SCORE and best_score - runner_up >= AUTO_CORRECT_MARGIN:
+                return self.ids[best_name], []
+        return None, [name for name, _ in suggestions]
+
+
+def _compact_listing(body):
+    # Keep just [id, name] pairs of the /pokemon listing in the cache.
+    page = json.loads(body)
+    entries = []
+    for result in page["results"]:
+        pokemon_id = result["url"].rstrip("/").rsplit("/", 1)[-1]
+        if pokemon_id.isdigit():
+            entries.append([int(pokemon_id), result["name"]])
+    return json.dumps(entries, separators=(",", ":")).encode("utf-8")
+
+
+def build_name_index(use_cache=True, refresh=False):
+    """
+    Builds the name index from the snapshot or the (cached) /pokemon listing.
+
+    Args:
+        use_cache (bool, optional): If False, always download the listing.
+        refresh (bool, optional): If True, revalidate the cached listing.
+
+    Returns:
+        NameIndex: The index.
+
+    Raises:
+        requests.exceptions.RequestException: If the listing is needed and
+                                              can't be fetched.
+    """
+    with span("index.build"):
+        image = get_default_image() if use_cache and not refresh else None
+        if image is not None:
+            return NameIndex(image.names())
+        snapshot = get_default_snapshot() if use_cache and not refresh else None
+        if snapshot is not None:
+            return NameIndex(snapshot.names())
+
+        url = f"{api_url('pokemon')}?limit={LISTING_PAGE_SIZE}"
+        response = get_client().fetch(url, use_cache=use_cache, refresh=refresh,
+                                      transform=_compact_listing)
+        response.raise_for_status()
+        return NameIndex(response.json())
+
+
+def _index_errors():
+    """The errors that mean the index can't be built right now."""
+    import requests  # only needed once something has gone wrong
+    return (requests.exceptions.RequestException, ValueError, KeyError)
+
+
+_name_index = None
+_name_index_retry_at = 0.0
+_name_index_lock = threading.Lock()
+
+
+def get_name_index():
+    """
+    Returns the shared `NameIndex`, building it on first use.
+
+    Once built, the index is kept for the life of the process. If it can't be
+    built (for example, offline with nothing cached yet) None is returned and
+    callers fall back to asking the PokeAPI directly; the build is tried again
+    on the first call after `INDEX_RETRY_DELAY` seconds.
+    """
+    global _name_index, _name_index_retry_at
+    with _name_index_lock:
+        if _name_index is None and time.monotonic() >= _name_index_retry_at:
+            try:
+                _name_index = build_name_index()
+            except _index_errors():
+                _name_index_retry_at = time.monotonic() + INDEX_RETRY_DELAY
+        return _name_index
+
+
+def suggest_names(identifier, limit=3):
+    """
+    Returns up to `limit` "did you mean" names for an unknown identifier.
+
+    Uses the shared index if it is already available; returns an empty list
+    otherwise.
+    """
+    index = get_name_index()
+    if index is None:
+        return []
+    return [name for name, _ in index.suggest(identifier, limit=limit)]
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+PyDex Model: A compact record type for Pokémon data.
+
+A raw PokeAPI /pokemon payload is hundreds of kilobytes, almost all of it
+`moves` and `game_indices`, yet PyDex only ever shows a handful of fields.
+`Pokemon` keeps just those fields in a `__slots__` object, with the six base
+stats in a fixed-order array of small integers. The projecting parser drops
+everything else as soon as a payload arrives, and the cache and snapshot
+store the compact form (a short JSON list) instead of the full payload.
+"""
+
+import json
+import sys
+from array import array
+
+from pokedex_trace import span
+
+# The order PokeAPI lists base stats in, and the order PyDex stores them.
+STAT_NAMES = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+STAT_LABELS = ("HP", "Attack", "Defense", "Special Attack", "Special Defense", "Speed")
+
+# The 18 types, in the order the PokeAPI numbers them (/type/1 is "normal").
+TYPE_NAMES = ("normal", "fighting", "flying", "poison", "ground", "rock", "bug",
+              "ghost", "steel", "fire", "water", "grass", "electric", "psychic",
+              "ice", "dragon", "dark", "fairy")
+
+_STAT_INDEX = {name: index for index, name in enumerate(STAT_NAMES)}
+
+
+class Pokemon:
+    """
+    The fields of a Pokémon that PyDex displays.
+
+    Attributes:
+        id (int): National Pokédex ID (alternate forms use IDs above 10000).
+        name (str): Lower-case API name, e.g. "mr-mime".
+        types (tuple of str): Type names in slot order, e.g. ("fire", "flying").
+        stats (array.array): Base stats as unsigned shorts, ordered like
+                             `STAT_NAMES`.
+        abilities (tuple): `(name, is_hidden)` pairs in slot order.
+        height (int): Height in decimeters.
+        weight (int): Weight in hectograms.
+        sprite_url (str or None): URL of the default front sprite.
+        species_id (int or None): ID of the species this Pokémon belongs to.
+    """
+
+    __slots__ = ("id", "name", "types", "stats", "abilities", "height",
+                 "weight", "sprite_url", "species_id")
+
+    def __init__(self, id, name, types, stats, abilities, height, weight,
+                 sprite_url=None, species_id=None):
+        self.id = id
+        self.name = name
+        self.types = tuple(sys.intern(type_name) for type_name in types)
+        self.stats = array("H", stats)
+        self.abilities = tuple((sys.intern(ability), bool(hidden)) for ability, hidden in abilities)
+        self.height = height
+        self.weight = weight
+        self.sprite_url = sprite_url
+        self.species_id = species_id
+
+    @classmethod
+    def from_api(cls, payload):
+        """
+        Builds a record from a full PokeAPI /pokemon payload.
+
+        Args:
+            payload (dict): The decoded JSON returned by the PokeAPI.
+
+        Returns:
+            Pokemon: The projected record.
+        """
+        stats = [0] * len(STAT_NAMES)
+        for stat in payload["stats"]:
+            index = _STAT_INDEX.get(stat["stat"]["name"])
+            if index is not None:
+                stats[index] = stat["base_stat"]
+        species = payload.get("species") or {}
+        species_url = species.get("url") or ""
+        species_id = species_url.rstrip("/").rsplit("/", 1)[-1]
+        return cls(
+            payload["id"],
+            payload["name"],
+            [entry["type"]["name"] for entry in sorted(payload["types"], key=lambda t: t["slot"])],
+            stats,
+            [(entry["ability"]["name"], entry["is_hidden"])
+             for entry in sorted(payload["abilities"], key=lambda a: a["slot"])],
+            payload["height"],
+            payload["weight"],
+            (payload.get("sprites") or {}).get("front_default"),
+            int(species_id) if species_id.isdigit() else None,
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """Builds a record from the compact list produced by `to_row`."""
+        return cls(*row)
+
+    @classmethod
+    def from_json(cls, body):
+        """
+        Parses either a compact record or a full PokeAPI payload.
+
+        Args:
+            body (bytes or str): JSON text.
+
+        Returns:
+            Pokemon: The parsed record.
+        """
+        with span("json.decode", bytes=len(body)):
+            data = json.loads(body)
+            if isinstance(data, list):
+                return cls.from_row(data)
+            return cls.from_api(data)
+
+    def to_row(self):
+        """Returns the record as a plain list, in `__slots__` order."""
+        return [self.id, self.name, list(self.types), list(self.stats),
+                [list(ability) for ability in self.abilities], self.height,
+                self.weight, self.sprite_url, self.species_id]
+
+    def to_json(self):
+        """Returns the compact JSON encoding used by the cache and snapshot."""
+        return json.dumps(self.to_row(), separators=(",", ":")).encode("utf-8")
+
+    def to_dict(self):
+        """
+        Returns a PokeAPI-shaped dictionary with just the projected fields.
+
+        Useful for code written against raw PokeAPI payloads: the keys
+        (`name`, `id`, `types`, `stats`, `abilities`, `height`, `weight`
+        and `sprites.front_default`) match the API.
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "types": [{"slot": slot, "type": {"name": type_name}}
+                      for slot, type_name in enumerate(self.types, start=1)],
+            "stats": [{"base_stat": value, "stat": {"name": name}}
+                      for name, value in zip(STAT_NAMES, self.stats)],
+            "abilities": [{"ability": {"name": ability}, "is_hidden": hidden}
+                          for ability, hidden in self.abilities],
+            "height": self.height,
+            "weight": self.weight,
+            "sprites": {"front_default": self.sprite_url},
+        }
+
+    @property
+    def base_stat_total(self):
+        """The sum of all six base stats."""
+        return sum(self.stats)
+
+    @property
+    def regular_abilities(self):
+        """Names of the Pokémon's non-hidden abilities."""
+        return [ability for ability, hidden in self.abilities if not hidden]
+
+    @property
+    def hidden_abilities(self):
+        """Names of the Pokémon's hidden abilities."""
+        return [ability for ability, hidden in self.abilities if hidden]
+
+    def __eq__(self, other):
+        if not isinstance(other, Pokemon):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __repr__(self):
+        return f"Pokemon(id={self.id}, name={self.name!r}, types={self.types!r})"
+
+
+def project_pokemon_body(body):
+    """
+    Shrinks a raw /pokemon response body to the compact record encoding.
+
+    Used as the cache/snapshot `transform` so that only the fields PyDex
+    needs are ever written to disk.
+
+    Args:
+        body (bytes): A PokeAPI /pokemon JSON body.
+
+    Returns:
+        bytes: The compact JSON encoding of the same Pokémon.
+    """
+    with span("json.project", bytes=len(body)):
+        return Pokemon.from_json(body).to_json()
+
+
+def project_type_body(body):
+    """
+    Shrinks a raw /type response body to what PyDex uses of it.
+
+    Keeps the attacking side of the damage relations (for the type chart)
+    and the IDs of the Pokémon with the type (for filtering random draws).
+
+    Args:
+        body (bytes): A PokeAPI /type JSON body.
+
+    Returns:
+        bytes: JSON with `name`, `double_damage_to`, `half_damage_to`,
+               `no_damage_to` (type names) and `pokemon` (IDs).
+    """
+    data = json.loads(body)
+    relations = data["damage_relations"]
+    compact = {"name": data["name"]}
+    for key in ("double_damage_to", "half_damage_to", "no_damage_to"):
+        compact[key] = [entry["name"] for entry in relations[key]]
+    compact["pokemon"] = []
+    for entry in data.get("pokemon", []):
+        pokemon_id = entry["pokemon"]["url"].rstrip("/").rsplit("/", 1)[-1]
+        if pokemon_id.isdigit():
+            compact["pokemon"].append(int(pokemon_id))
+    return json.dumps(compact, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+PyDex Output: Machine-readable output for batch lookups.
+
+`python pokedex.py --format FORMAT ...` prints one record per Pokémon in
+one of these formats instead of the coloured text:
+
+    json     a single JSON array, streamed one element per line
+    ndjson   one JSON object per line
+    csv      a header row, then one row per Pokémon
+
+Records are written as each lookup completes, so nothing holds the whole
+result set in memory and a consumer can start on the first record while
+later ones are still being fetched. Output goes through a `BlockWriter`,
+which collects lines into large blocks instead of writing (and, with
+PYTHONUNBUFFERED or `-u`, flushing) every line on its own.
+"""
+
+import csv
+import json
+import sys
+
+from pokedex_model import STAT_NAMES
+
+FORMATS = ("text", "json", "ndjson", "csv")
+
+# Bytes collected before a block is written out.
+BLOCK_SIZE = 64 * 1024
+
+CSV_FIELDS = (("id", "name", "type1", "type2") + STAT_NAMES
+              + ("base_stat_total", "abilities", "hidden_abilities", "height_m", "weight_kg"))
+MATCHUP_FIELDS = ("weak_to", "resists", "immune_to")
+EVOLUTION_FIELDS = ("evolves_from", "evolves_to")
+
+
+class BlockWriter:
+    """
+    A file-like object that writes to a stream in large blocks.
+
+    `write` only collects text; it goes out in one write once `block_size`
+    characters have accumulated, and on `flush`. Callers that wait for more
+    data (e.g. a slow lookup) should flush first, so what is ready doesn't
+    sit in the buffer.
+    """
+
+    def __init__(self, stream=None, block_size=BLOCK_SIZE):
+        """
+        Args:
+            stream (file, optional): Where the blocks go. Defaults to the
+                                     current `sys.stdout`.
+            block_size (int, optional): Characters collected per write.
+        """
+        self.stream = sys.stdout if stream is None else stream
+        self.block_size = block_size
+        self._chunks = []
+        self._size = 0
+
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self.block_size:
+            self._write_block()
+        return len(text)
+
+    def _write_block(self):
+        if self._chunks:
+            self.stream.write("".join(self._chunks))
+            self._chunks = []
+            self._size = 0
+
+    def flush(self):
+        """Writes out everything collected so far."""
+        self._write_block()
+        self.stream.flush()
+
+
+def _matchup_groups(pokemon, type_chart):
+    weak, resists, immune = [], [], []
+    for value, type_names in type_chart.matchups(pokemon.types).items():
+        if value > 1:
+            weak.append((value, type_names))
+        elif value > 0:
+            resists.append((value, type_names))
+        else:
+            immune.extend(type_names)
+    return weak, resists, immune
+
+
+def record_dict(pokemon, type_chart=None):
+    """
+    Returns the flat, JSON-ready record written by the json and ndjson
+    formats.
+
+    Args:
+        pokemon (pokedex_model.Pokemon): The Pokémon.
+        type_chart (pokedex_types.TypeChart, optional): If given, the record
+                                    gets a `matchups` object mapping each
+                                    multiplier other than 1 (e.g. "2",
+                                    "0.5", "0") to the attacking types.
+    """
+    record = {
+        "id": pokemon.id,
+        "name": pokemon.name,
+        "types": list(pokemon.types),
+        "stats": dict(zip(STAT_NAMES, pokemon.stats)),
+        "base_stat_total": pokemon.base_stat_total,
+        "abilities": pokemon.regular_abilities,
+        "hidden_abilities": pokemon.hidden_abilities,
+        "height_m": pokemon.height / 10,
+        "weight_kg": pokemon.weight / 10,
+        "sprite_url": pokemon.sprite_url,
+    }
+    if type_chart is not None:
+        record["matchups"] = {f"{value:g}": type_names
+                              for value, type_names in type_chart.matchups(pokemon.types).items()}
+    return record
+
+
+def csv_row(pokemon, type_chart=None):
+    """
+    Returns the values of a CSV row, in `CSV_FIELDS` order (followed by
+    `MATCHUP_FIELDS` if a type chart is given). Lists are joined with ";".
+    """
+    types = list(pokemon.types) + [""] * (2 - len(pokemon.types))
+    row = [pokemon.id, pokemon.name, types[0], types[1]]
+    row.extend(pokemon.stats)
+    row.extend([pokemon.base_stat_total, ";".join(pokemon.regular_abilities),
+                ";".join(pokemon.hidden_abilities), pokemon.height / 10, pokemon.weight / 10])
+    if type_chart is not None:
+        weak, resists, immune = _matchup_groups(pokemon, type_chart)
+        for groups in (weak, resists):
+            row.append(";".join(f"{type_name}:{value:g}"
+                                for value, type_names in groups for type_name in type_names))
+        row.append(";".join(immune))
+    return row
+
+
+class RecordWriter:
+    """
+    Writes Pokémon records in one of the machine-readable formats.
+
+    Usage:
+        records = RecordWriter("ndjson", BlockWriter())
+        for pokemon in ...:
+            records.write(pokemon)
+        records.close()
+    """
+
+    def __init__(self, format, out, type_chart=None, evolution=False):
+        """
+        Args:
+            format (str): "json", "ndjson" or "csv".
+            out (file): Where the records go, typically a `BlockWriter`.
+            type_chart (pokedex_types.TypeChart, optional): Adds type
+                                    matchups to every record.
+            evolution (bool, optional): Adds the evolution family (JSON) or
+                                        the species evolved from and into
+                                        (CSV) to every record.
+
+        Raises:
+            ValueError: If the format isn't one of the above.
+        """
+        if format not in FORMATS or format == "text":
+            raise ValueError(f"Unknown record format '{format}'.")
+        self.format = format
+        self.out = out
+        self.type_chart = type_chart
+        self.evolution = evolution
+        self.written = 0
+        if format == "csv":
+            self._csv = csv.writer(out, lineterminator="\n")
+            self._csv.writerow(CSV_FIELDS + (MATCHUP_FIELDS if type_chart is not None else ())
+                               + (EVOLUTION_FIELDS if evolution else ()))
+
+    def write(self, pokemon, evolution=None):
+        """
+        Writes one record.
+
+        Args:
+            pokemon (pokedex_model.Pokemon): The Pokémon.
+            evolution (pokedex_evolution.EvolutionChain, optional): Its
+                                    family, if the writer was created with
+                                    `evolution=True`; None if unknown.
+        """
+        if self.format == "csv":
+            row = csv_row(pokemon, self.type_chart)
+            if self.evolution:
+                parent = evolution.parent(pokemon.species_id) if evolution else None
+                children = evolution.children(pokemon.species_id) if evolution else []
+                row.extend([parent[1] if parent else "",
+                            ";".join(child[1] for child in children)])
+            self._csv.writerow(row)
+        else:
+            record = record_dict(pokemon, self.type_chart)
+            if self.evolution:
+                record["evolution"] = evolution.to_list() if evolution is not None else None
+            line = json.dumps(record, ensure_ascii=False)
+            if self.format == "json":
+                line = ("[" if not self.written else ",") + line
+            self.out.write(line + "\n")
+        self.written += 1
+
+    def close(self):
+        """Finishes the output (closes the JSON array) and flushes it."""
+        if self.format == "json":
+            self.out.write("]\n" if self.written else "[]\n")
+        self.out.flush()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+PyDex Paths: Where PyDex keeps its files.
+
+This module imports nothing but the standard library's `os` and `sys`, so
+the CLI can find a running daemon's socket (see `pokedex_daemon`) without
+loading the rest of PyDex first.
+"""
+
+import os
+import sys
+
+
+def default_cache_dir():
+    """
+    Returns the directory PyDex uses for its on-disk caches.
+
+    Honours PYDEX_CACHE_DIR first, then the platform's usual per-user
+    cache location (XDG_CACHE_HOME / ~/.cache on Linux, ~/Library/Caches
+    on macOS and %LOCALAPPDATA% on Windows).
+
+    Returns:
+        str: Absolute path of the PyDex cache directory.
+    """
+    override = os.environ.get("PYDEX_CACHE_DIR")
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(home, "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    return os.path.join(base, "pydex")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+PyDex Sample: Random Pokémon drawn from the data, not a hardcoded range.
+
+`python pokedex.py --random N` draws N different Pokémon from the ID index
+(see `pokedex_index`), which lists every entry the PokeAPI has, including
+alternate forms above 10000, and is cached after its first download.
+Draws can be narrowed down:
+
+- `--generation 4` (or "iv", "generation-iv") keeps the species introduced
+  in that generation, from the /generation listing. Alternate forms are
+  left out, as the listing only names species.
+- `--type fire` keeps the Pokémon with that type, from the /type listing
+  (the same cached resource the type chart uses). Given twice, both types
+  are required.
+
+`--seed` makes the draw repeatable: the same seed, filters and index give
+the same Pokémon in the same order.
+"""
+
+import json
+import random
+
+from pokedex_client import api_url, get_client
+from pokedex_index import build_name_index, get_name_index
+from pokedex_model import TYPE_NAMES, project_type_body
+
+
+def _compact_generation(body):
+    # Keep just the IDs of the species a generation introduced.
+    data = json.loads(body)
+    ids = []
+    for species in data["pokemon_species"]:
+        species_id = species["url"].rstrip("/").rsplit("/", 1)[-1]
+        if species_id.isdigit():
+            ids.append(int(species_id))
+    return json.dumps({"name": data["name"], "species": ids},
+                      separators=(",", ":")).encode("utf-8")
+
+
+def all_ids(use_cache=True, refresh=False):
+    """
+    Returns every Pokémon ID in the index, in ascending order.
+
+    Raises:
+        requests.exceptions.RequestException: If the index isn't cached and
+                                              the listing can't be fetched.
+    """
+    index = get_name_index() if use_cache and not refresh else None
+    if index is None:
+        index = build_name_index(use_cache=use_cache, refresh=refresh)
+    return sorted(index.names)
+
+
+def normalize_generation(generation):
+    """
+    Turns "4", "IV" or "generation-iv" into the PokeAPI's resource key.
+
+    Raises:
+        ValueError: If the text is empty.
+    """
+    key = str(generation).strip().lower()
+    if not key:
+        raise ValueError("Empty generation.")
+    if key.isdigit() or key.startswith("generation-"):
+        return key
+    return f"generation-{key}"
+
+
+def generation_ids(generation, use_cache=True, refresh=False):
+    """
+    Returns the IDs of the species introduced in a generation.
+
+    Args:
+        generation (str or int): E.g. 4, "iv" or "generation-iv".
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+
+    Returns:
+        set of int: The species IDs.
+
+    Raises:
+        ValueError: If there is no such generation.
+        requests.exceptions.RequestException: On network problems.
+    """
+    key = normalize_generation(generation)
+    response = get_client().fetch(api_url("generation", key), use_cache=use_cache,
+                                  refresh=refresh, transform=_compact_generation)
+    if response.status_code == 404:
+        raise ValueError(f"Unknown generation '{generation}'.")
+    response.raise_for_status()
+    return set(response.json()["species"])
+
+
+def type_ids(type_name, use_cache=True, refresh=False):
+    """
+    Returns the IDs of the Pokémon that have a type.
+
+    Args:
+        type_name (str): One of `pokedex_model.TYPE_NAMES`.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+
+    Returns:
+        set of int: The Pokémon IDs, alternate forms included.
+
+    Raises:
+        ValueError: If the type doesn't exist.
+        requests.exceptions.RequestException: On network problems.
+    """
+    type_name = str(type_name).strip().lower()
+    if type_name not in TYPE_NAMES:
+        raise ValueError(f"Unknown type '{type_name}'. Types: {', '.join(TYPE_NAMES)}.")
+    url = api_url("type", type_name)
+    response = get_client().fetch(url, use_cache=use_cache, refresh=refresh,
+                                  transform=project_type_body)
+    response.raise_for_status()
+    data = response.json()
+    if "pokemon" not in data:
+        # Cached by an older PyDex that only kept the damage relations.
+        response = get_client().fetch(url, use_cache=use_cache, refresh=True,
+                                      transform=project_type_body)
+        response.raise_for_status()
+        data = response.json()
+    return set(data.get("pokemon", []))
+
+
+def sample_ids(count, seed=None, generation=None, types=(), use_cache=True, refresh=False):
+    """
+    Draws Pokémon IDs at random, without replacement.
+
+    Args:
+        count (int): How many to draw.
+        seed (int, optional): Seed for a repeatable draw.
+        generation (str or int, optional): Only draw species from this
+                                           generation.
+        types (sequence of str, optional): Only draw Pokémon with all of
+                                           these types.
+        use_cache (bool, optional): If False, bypass the response cache.
+        refresh (bool, optional): If True, revalidate cached data.
+
+    Returns:
+        list of int: Up to `count` different IDs, fewer if fewer Pokémon
+                     match the filters.
+
+    Raises:
+        ValueError: If `count` is less than 1 or a filter is invalid.
+        requests.exceptions.RequestException: On network problems.
+    """
+    if count < 1:
+        raise ValueError("The number of random Pokémon must be at least 1.")
+    pool = set(all_ids(use_cache=use_cache, refresh=refresh))
+    if generation is not None:
+        pool &= generation_ids(generation, use_cache=use_cache, refresh=refresh)
+    for type_name in types:
+        pool &= type_ids(type_name, use_cache=use_cache, refresh=refresh)
+    # Sort first so a seed gives the same draw whatever the set order.
+    return random.Random(seed).sample(sorted(pool), min(count, len(pool)))
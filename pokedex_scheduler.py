@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+PyDex Scheduler: Decides when each request may go out to the PokeAPI.
+
+Every network request made by the shared client (see `pokedex_client`)
+first takes a slot from the process-wide scheduler, which enforces:
+
+- A global rate limit: a token bucket refilled at `rate` requests per
+  second, holding up to `burst` tokens. Set PYDEX_RATE (or `--rate`) to
+  change the rate; 0 disables the limit.
+- Pauses requested by the server: a 429 response or a Retry-After header
+  stops *all* requests for that long, not just the one that got it.
+- A global concurrency limit, with a few slots reserved for interactive
+  work so bulk jobs can never occupy all of them.
+- Priorities: interactive requests (a CLI lookup, a GUI search) always go
+  before bulk ones (batch runs, syncs, GUI prefetching) that are waiting,
+  so a full-dex sync running in the background doesn't slow down lookups.
+
+Cache hits never reach the scheduler.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from pokedex_trace import count
+
+# Request priorities; lower goes first.
+INTERACTIVE = 0
+BULK = 1
+
+# Requests per second, and how many may be sent back to back after a quiet
+# period. Polite defaults for a free API; see PYDEX_RATE.
+DEFAULT_RATE = 20.0
+DEFAULT_BURST = 40
+
+# Slots that bulk requests may never take, so an interactive request finds
+# one free even while a sync saturates the rest.
+DEFAULT_RESERVED = 2
+
+
+def rate_from_env():
+    """Returns PYDEX_RATE as a float, or `DEFAULT_RATE` if unset or invalid."""
+    value = os.environ.get("PYDEX_RATE")
+    if not value:
+        return DEFAULT_RATE
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return DEFAULT_RATE
+
+
+class TokenBucket:
+    """
+    A token bucket with support for server-requested pauses.
+
+    Not thread-safe on its own; the `Scheduler` guards it with its lock.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate (float): Tokens added per second; 0 means unlimited.
+            burst (int): Maximum number of tokens held.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now):
+        """Seconds until a token can be taken (0 if one is available now)."""
+        wait = self.paused_until - now
+        if not self.rate:
+            return max(0.0, wait)
+        self._refill(now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return max(0.0, wait)
+
+    def take(self, now):
+        """Removes one token; call only when `delay` returned 0."""
+        if self.rate:
+            self._refill(now)
+            self.tokens -= 1
+
+    def pause(self, seconds, now):
+        """Hands out no tokens for `seconds`, then restarts from an empty bucket."""
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = max(self.updated, self.paused_until)
+
+
+class Scheduler:
+    """
+    Hands out request slots by priority, within rate and concurrency limits.
+
+    Usage:
+        with scheduler.slot(BULK):
+            response = session.get(url)
+    """
+
+    def __init__(self, rate=None, burst=DEFAULT_BURST, concurrency=10,
+                 reserved=DEFAULT_RESERVED):
+        """
+        Args:
+            rate (float, optional): Requests per second; 0 for no limit.
+                                    Defaults to PYDEX_RATE or `DEFAULT_RATE`.
+            burst (int, optional): Requests that may be sent back to back.
+            concurrency (int, optional): Maximum requests in flight.
+            reserved (int, optional): Slots bulk requests can't use.
+        """
+        self.bucket = TokenBucket(rate_from_env() if rate is None else rate, burst)
+        self.concurrency = max(1, concurrency)
+        self.reserved = min(max(0, reserved), self.concurrency - 1)
+        self.active = 0
+        self._waiting = []  # heap of (priority, sequence) tickets
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _ready_in(self, ticket, now):
+        # None: wait to be notified; 0: go; > 0: wait that long for a token.
+        if self._waiting[0] is not ticket:
+            return None
+        limit = self.concurrency if ticket[0] == INTERACTIVE else self.concurrency - self.reserved
+        if self.active >= limit:
+            return None
+        return self.bucket.delay(now)
+
+    def acquire(self, priority=INTERACTIVE):
+        """
+        Blocks until a request of the given priority may be sent.
+
+        Every `acquire` must be followed by a `release`; prefer `slot`.
+        """
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            throttled = False
+            try:
+                while True:
+                    delay = self._ready_in(ticket, time.monotonic())
+                    if delay == 0:
+                        break
+                    throttled = throttled or delay is not None
+                    self._cond.wait(delay)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self.bucket.take(time.monotonic())
+            self.active += 1
+            # The next ticket in line may be able to go as well.
+            self._cond.notify_all()
+        if throttled:
+            count("scheduler.throttled")
+
+    def release(self):
+        """Frees a slot taken by `acquire`."""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def slot(self, priority=INTERACTIVE):
+        """Context manager around `acquire` and `release`."""
+        return _Slot(self, priority)
+
+    def pause(self, seconds):
+        """
+        Stops handing out slots for `seconds`, e.g. after "429 Too Many
+        Requests" or a Retry-After header. Requests already in flight are
+        not affected.
+        """
+        with self._cond:
+            self.bucket.pause(seconds, time.monotonic())
+            self._cond.notify_all()
+        count("scheduler.pauses")
+
+    @property
+    def waiting(self):
+        """Number of requests waiting for a slot."""
+        return len(self._waiting)
+
+
+class _Slot:
+    __slots__ = ("scheduler", "priority")
+
+    def __init__(self, scheduler, priority):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def __enter__(self):
+        self.scheduler.acquire(self.priority)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.scheduler.release()
+        return False
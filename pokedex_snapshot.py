@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+PyDex Snapshot: An offline copy of the whole Pokédex.
+
+`python pokedex.py --sync` walks the PokeAPI's /pokemon listing and downloads
+every entry into a local SQLite snapshot. Once a sync has completed, all CLI
+and GUI lookups (and the range used for random Pokémon) are answered from the
+snapshot without any network calls.
+
+Syncs are:
+- Concurrent: entries are downloaded on a bounded thread pool.
+- Resumable: every entry is committed as soon as it arrives, so an
+  interrupted sync picks up where it left off the next time it runs.
+- Incremental: re-syncs send the stored ETag with each request and only
+  download entries the server reports as changed.
+- Compact: entries are stored as `pokedex_model.Pokemon` records rather
+  than full API payloads.
+- Polite: requests are sent at bulk priority, so lookups made while a
+  sync runs go first (see `pokedex_scheduler`).
+
+A completed sync also writes the snapshot out as a memory-mapped dex image
+(see `pokedex_image`), which is what lookups and queries actually read.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from pokedex_cache import default_cache_dir
+from pokedex_client import api_url, get_client
+from pokedex_image import default_image_path, write_image
+from pokedex_model import Pokemon, project_pokemon_body
+from pokedex_scheduler import BULK
+
+# Large enough to list every Pokémon (including alternate forms) in one page.
+LISTING_PAGE_SIZE = 100000
+
+_ID_FROM_URL = re.compile(r"/(\d+)/?$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pokemon (
+    id        INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL UNIQUE,
+    etag      TEXT,
+    body      BLOB,
+    sync_run  INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def default_snapshot_path():
+    """Returns the location of the snapshot database in the cache directory."""
+    return os.path.join(default_cache_dir(), "snapshot.sqlite3")
+
+
+class SyncResult:
+    """Counts of what happened during a sync."""
+
+    __slots__ = ("total", "downloaded", "unchanged", "skipped", "failed", "removed")
+
+    def __init__(self, total=0):
+        self.total = total
+        self.downloaded = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.failed = []
+        self.removed = 0
+
+
+class Snapshot:
+    """
+    A local, SQLite-backed copy of every /pokemon entry.
+
+    Like `pokedex_cache.ResponseCache`, one instance can be shared between
+    threads.
+    """
+
+    def __init__(self, path=None):
+        """
+        Opens (and creates, if necessary) the snapshot database.
+
+        Args:
+            path (str, optional): Location of the SQLite file. Defaults to
+                                  `default_snapshot_path()`.
+        """
+        self.path = path or default_snapshot_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._ids = None
+
+    # -- Metadata --------------------------------------------------------
+
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        if value is None:
+            self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+        else:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               (key, str(value)))
+
+    @property
+    def is_complete(self):
+        """True once at least one sync has finished."""
+        with self._lock:
+            return self._get_meta("completed_run") is not None
+
+    @property
+    def synced_at(self):
+        """Time (seconds since the epoch) the last sync finished, or None."""
+        with self._lock:
+            value = self._get_meta("completed_at")
+        return float(value) if value else None
+
+    # -- Lookups ---------------------------------------------------------
+
+    def get(self, identifier):
+        """
+        Looks up a Pokémon by name or National Pokédex ID.
+
+        Args:
+            identifier (str or int): The name or ID.
+
+        Returns:
+            bytes or None: The stored record (compact JSON), or None if it
+                           isn't in the snapshot.
+        """
+        key = str(identifier).strip().lower()
+        column = "id" if key.isdigit() else "name"
+        value = int(key) if key.isdigit() else key
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT body FROM pokemon WHERE {column} = ? AND body IS NOT NULL", (value,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_pokemon(self, identifier):
+        """Like `get`, but returns a `Pokemon` record (or None)."""
+        body = self.get(identifier)
+        return Pokemon.from_json(body) if body is not None else None
+
+    def ids(self):
+        """Returns the sorted IDs of every Pokémon in the snapshot."""
+        if self._ids is None:
+            with self._lock:
+                self._ids = [row[0] for row in self._conn.execute(
+                    "SELECT id FROM pokemon WHERE body IS NOT NULL ORDER BY id")]
+        return self._ids
+
+    def records(self):
+        """Returns every Pokémon in the snapshot as `Pokemon` records, by ID."""
+        with self._lock:
+            bodies = [row[0] for row in self._conn.execute(
+                "SELECT body FROM pokemon WHERE body IS NOT NULL ORDER BY id")]
+        return [Pokemon.from_json(body) for body in bodies]
+
+    def names(self):
+        """Returns `(id, name)` pairs for every Pokémon in the snapshot."""
+        with self._lock:
+            return list(self._conn.execute(
+                "SELECT id, name FROM pokemon WHERE body IS NOT NULL ORDER BY id"))
+
+    def __len__(self):
+        return len(self.ids())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- Syncing ---------------------------------------------------------
+
+    def sync(self, workers=8, progress=None):
+        """
+        Downloads (or refreshes) every Pokémon listed by the PokeAPI.
+
+        Args:
+            workers (int, optional): Number of concurrent downloads.
+            progress (callable, optional): Called as `progress(done, total)`
+                                           after each entry.
+
+        Returns:
+            SyncResult: What was downloaded, skipped and so on.
+
+        Raises:
+            requests.exceptions.RequestException: If the listing itself
+                                                  can't be fetched.
+        """
+        listing = fetch_listing()
+        with self._lock:
+            run = self._get_meta("active_run")
+            if run is None:
+                run = int(self._get_meta("completed_run", 0)) + 1
+                self._set_meta("active_run", run)
+            run = int(run)
+            done = {row[0] for row in self._conn.execute(
+                "SELECT id FROM pokemon WHERE sync_run = ?", (run,))}
+            etags = dict(self._conn.execute("SELECT id, etag FROM pokemon"))
+
+        result = SyncResult(total=len(listing))
+        result.skipped = sum(1 for pokemon_id, _ in listing if pokemon_id in done)
+        pending = [(pokemon_id, name) for pokemon_id, name in listing if pokemon_id not in done]
+        counter_lock = threading.Lock()
+        finished = [result.skipped]
+
+        def download(entry):
+            pokemon_id, name = entry
+            outcome = self._download(pokemon_id, name, etags.get(pokemon_id), run)
+            with counter_lock:
+                if outcome == "downloaded":
+                    result.downloaded += 1
+                elif outcome == "unchanged":
+                    result.unchanged += 1
+                else:
+                    result.failed.append((name, outcome))
+                finished[0] += 1
+                if progress:
+                    progress(finished[0], result.total)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        client = get_client()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, client.pool_size))) as executor:
+            list(executor.map(download, pending))
+
+        if not result.failed:
+            listed_ids = [pokemon_id for pokemon_id, _ in listing]
+            with self._lock:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS listed (id INTEGER PRIMARY KEY)")
+                self._conn.execute("DELETE FROM listed")
+                self._conn.executemany("INSERT OR IGNORE INTO listed (id) VALUES (?)",
+                                       [(pokemon_id,) for pokemon_id in listed_ids])
+                result.removed = self._conn.execute(
+                    "DELETE FROM pokemon WHERE id NOT IN (SELECT id FROM listed)").rowcount
+                self._set_meta("completed_run", run)
+                self._set_meta("completed_at", time.time())
+                self._set_meta("active_run", None)
+            self.write_image()
+        self._ids = None
+        return result
+
+    def write_image(self, path=None):
+        """
+        Writes the snapshot as a dex image (see `pokedex_image`).
+
+        Args:
+            path (str, optional): Defaults to the image next to the default
+                                  snapshot, or next to this snapshot's file.
+        """
+        if path is None:
+            path = (default_image_path() if self.path == default_snapshot_path()
+                    else os.path.splitext(self.path)[0] + ".img")
+        try:
+            write_image(self.records(), path, self.synced_at or 0.0)
+        except OSError:
+            pass  # lookups fall back to the snapshot itself
+
+    def _download(self, pokemon_id, name, etag, run):
+        """Fetches one entry and stores it. Returns a short outcome string."""
+        import requests
+
+        headers = {"If-None-Match": etag} if etag else None
+        try:
+            response = get_client().get(api_url("pokemon", pokemon_id), headers=headers,
+                                        priority=BULK)
+        except requests.exceptions.RequestException as e:
+            return f"could not connect ({e.__class__.__name__})"
+
+        now = time.time()
+        if response.status_code == 304:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE pokemon SET sync_run = ?, synced_at = ? WHERE id = ?",
+                    (run, now, pokemon_id))
+            return "unchanged"
+        if response.status_code != 200:
+            return f"HTTP {response.status_code}"
+        try:
+            body = project_pokemon_body(response.content)
+        except (ValueError, KeyError, TypeError):
+            return "invalid response"
+
+        with self._lock:
+            # A name can move to a new ID between syncs; drop the stale row.
+            self._conn.execute("DELETE FROM pokemon WHERE name = ? AND id != ?", (name, pokemon_id))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pokemon (id, name, etag, body, sync_run, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (pokemon_id, name, response.headers.get("ETag"),
+                 sqlite3.Binary(body), run, now))
+        return "downloaded"
+
+
+def fetch_listing():
+    """
+    Fetches the names and IDs of every Pokémon from the /pokemon listing.
+
+    Returns:
+        list of tuple: `(id, name)` pairs in listing order.
+
+    Raises:
+        requests.exceptions.RequestException: If the listing can't be fetched.
+    """
+    entries = []
+    url = f"{api_url('pokemon')}?limit={LISTING_PAGE_SIZE}"
+    while url:
+        response = get_client().get(url, priority=BULK)
+        response.raise_for_status()
+        page = response.json()
+        for result in page["results"]:
+            match = _ID_FROM_URL.search(result["url"])
+            if match:
+                entries.append((int(match.group(1)), result["name"]))
+        url = page.get("next")
+    return entries
+
+
+_default_snapshot = None
+_default_snapshot_lock = threading.Lock()
+
+
+def get_default_snapshot():
+    """
+    Returns the shared snapshot if a sync has completed, otherwise None.
+
+    Nothing is created on disk until `pokedex.py --sync` runs, so lookups
+    without a snapshot cost no more than a single `os.path.exists` check.
+    """
+    global _default_snapshot
+    with _default_snapshot_lock:
+        if _default_snapshot is None:
+            path = default_snapshot_path()
+            if not os.path.exists(path):
+                return None
+            try:
+                snapshot = Snapshot(path)
+            except sqlite3.Error:
+                return None
+            if not snapshot.is_complete:
+                snapshot.close()
+                return None
+            _default_snapshot = snapshot
+        return _default_snapshot
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+PyDex Stats: Vectorized queries over the base stats of the whole Pokédex.
+
+Answering "which Electric types are faster than 100?" one record at a time
+means loading and checking every Pokémon in a Python loop. `StatMatrix`
+instead keeps the whole dex in a few NumPy arrays (an N×6 int16 matrix of
+base stats, the derived base stat total, a bit mask of types, and the ID
+and name columns), so a filter, sort or top-k is a handful of array
+operations over every row at once.
+
+The matrix comes from the offline snapshot (`pokedex.py --sync`). Its
+columns are views of the memory-mapped dex image (see `pokedex_image`), so
+loading it copies nothing but the names; without an image it is built
+from the snapshot and saved next to it as a .npz file instead, which is
+rebuilt whenever the snapshot is re-synced.
+
+Query expressions are comparisons joined with `and` / `or` (`and` binds
+tighter), for example:
+
+    speed>100 and type=electric
+    bst>=600 or type=dragon and attack>=120
+
+The same matrix answers "which Pokémon have stats like Garchomp's?": each
+Pokémon is a point in six-dimensional stat space, and `nearest` ranks the
+whole dex by Euclidean or cosine distance from one of them in a single
+vectorized pass. `pairwise_distances` computes every pair at once.
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+
+from pokedex_cache import default_cache_dir
+from pokedex_image import get_default_image
+from pokedex_model import STAT_NAMES, TYPE_NAMES
+from pokedex_snapshot import get_default_snapshot
+
+# Column names accepted by `StatMatrix.column`, including short aliases.
+FIELD_ALIASES = {
+    "hp": "hp",
+    "atk": "attack", "attack": "attack",
+    "def": "defense", "defense": "defense",
+    "spa": "special-attack", "sp-atk": "special-attack", "special-attack": "special-attack",
+    "spd": "special-defense", "sp-def": "special-defense", "special-defense": "special-defense",
+    "spe": "speed", "speed": "speed",
+    "bst": "bst", "total": "bst",
+    "id": "id", "height": "height", "weight": "weight",
+}
+
+METRICS = ("euclidean", "cosine")
+
+_TYPE_BITS = {name: 1 << index for index, name in enumerate(TYPE_NAMES)}
+
+_COMPARISON = re.compile(r"^\s*([a-z][a-z_. -]*?)\s*(<=|>=|==|!=|=|<|>)\s*(-?[a-z0-9_.-]+)\s*$")
+_OPERATORS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "=": np.equal, "==": np.equal, "!=": np.not_equal,
+}
+
+
+def _field_name(text):
+    name = re.sub(r"[\s_.]+", "-", text.strip().lower())
+    return FIELD_ALIASES.get(name, name)
+
+
+def default_matrix_path():
+    """Returns the location of the cached stat matrix in the cache directory."""
+    return os.path.join(default_cache_dir(), "stats.npz")
+
+
+class StatMatrix:
+    """
+    Column-oriented base stats for every Pokémon.
+
+    Rows are ordered by ID.
+
+    Attributes:
+        ids (numpy.ndarray): Pokédex IDs (int32).
+        names (numpy.ndarray): API names (unicode strings).
+        stats (numpy.ndarray): N×6 int16 base stats, ordered like
+                               `pokedex_model.STAT_NAMES`.
+        bst (numpy.ndarray): Base stat totals (int16).
+        type_slots (numpy.ndarray): N×2 indices into `TYPE_NAMES` for the
+                                    primary and secondary type; -1 if none.
+        type_mask (numpy.ndarray): One bit per type (uint32), bit i set for
+                                   `TYPE_NAMES[i]`.
+        height (numpy.ndarray): Heights in decimeters (int32).
+        weight (numpy.ndarray): Weights in hectograms (int32).
+    """
+
+    def __init__(self, ids, names, stats, type_slots, height, weight):
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.names = np.asarray(names, dtype=str)
+        self.stats = np.asarray(stats, dtype=np.int16).reshape(-1, len(STAT_NAMES))
+        self.type_slots = np.asarray(type_slots, dtype=np.int8).reshape(-1, 2)
+        self.height = np.asarray(height, dtype=np.int32)
+        self.weight = np.asarray(weight, dtype=np.int32)
+        self.bst = self.stats.sum(axis=1, dtype=np.int16)
+
+        self.type_mask = np.zeros(len(self.ids), dtype=np.uint32)
+        for slot in range(2):
+            column = self.type_slots[:, slot]
+            present = column >= 0
+            self.type_mask[present] |= np.left_shift(
+                np.uint32(1), column[present].astype(np.uint32))
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds the matrix from `pokedex_model.Pokemon` records.
+
+        Args:
+            records (iterable): The records; they are sorted by ID.
+
+        Returns:
+            StatMatrix: The matrix.
+        """
+        records = sorted(records, key=lambda record: record.id)
+        type_index = {name: index for index, name in enumerate(TYPE_NAMES)}
+        type_slots = []
+        for record in records:
+            slots = [type_index.get(type_name, -1) for type_name in record.types[:2]]
+            type_slots.append(slots + [-1] * (2 - len(slots)))
+        return cls(
+            [record.id for record in records],
+            [record.name for record in records],
+            [list(record.stats) for record in records] or np.empty((0, len(STAT_NAMES))),
+            type_slots or np.empty((0, 2)),
+            [record.height for record in records],
+            [record.weight for record in records],
+        )
+
+    @classmethod
+    def from_image(cls, image):
+        """
+        Builds the matrix on top of a `pokedex_image.DexImage`.
+
+        The ID, stat, type, height and weight columns are views of the
+        mapped file rather than copies.
+
+        Returns:
+            StatMatrix: The matrix.
+        """
+        records = image.array()
+        names = [name for _, name in image.names()]
+        return cls(records["id"], names, records["stats"], records["type_slots"],
+                   records["height"], records["weight"])
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a matrix saved with `save`.
+
+        Returns:
+            tuple: `(matrix, synced_at)`, where `synced_at` is the value
+                   passed to `save`.
+        """
+        with np.load(path) as data:
+            matrix = cls(data["ids"], data["names"], data["stats"], data["type_slots"],
+                         data["height"], data["weight"])
+            return matrix, float(data["synced_at"])
+
+    def save(self, path, synced_at=0.0):
+        """
+        Saves the matrix as an uncompressed .npz file.
+
+        Args:
+            path (str): Where to write it; replaced atomically.
+            synced_at (float, optional): When the source snapshot was
+                                         synced, so a stale file can be
+                                         detected later.
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as handle:
+            np.savez(handle, ids=self.ids, names=self.names, stats=self.stats,
+                     type_slots=self.type_slots, height=self.height,
+                     weight=self.weight, synced_at=np.float64(synced_at))
+        os.replace(temp_path, path)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row_of(self, identifier):
+        """
+        Finds the row of a Pokémon by ID or exact name.
+
+        Returns:
+            int or None: The row index, or None if it isn't in the matrix.
+        """
+        key = str(identifier).strip().lower()
+        if key.isdigit():
+            row = int(np.searchsorted(self.ids, int(key)))
+            return row if row < len(self.ids) and self.ids[row] == int(key) else None
+        rows = np.flatnonzero(self.names == key)
+        return int(rows[0]) if len(rows) else None
+
+    def types_of(self, row):
+        """Returns the type names of the Pokémon in `row`, in slot order."""
+        return tuple(TYPE_NAMES[slot] for slot in self.type_slots[row] if slot >= 0)
+
+    def column(self, field):
+        """
+        Returns a numeric column by name.
+
+        Args:
+            field (str): A stat name ("speed", "special-attack", ...), an
+                         alias from `FIELD_ALIASES` ("spe", "spa", "bst",
+                         ...), "id", "height" or "weight".
+
+        Returns:
+            numpy.ndarray: The column, one value per row.
+
+        Raises:
+            ValueError: If the field is unknown.
+        """
+        name = _field_name(field)
+        if name in STAT_NAMES:
+            return self.stats[:, STAT_NAMES.index(name)]
+        if name == "bst":
+            return self.bst
+        if name == "id":
+            return self.ids
+        if name in ("height", "weight"):
+            return getattr(self, name)
+        raise ValueError(f"Unknown field '{field}'. "
+                         f"Known fields: {', '.join(sorted(set(FIELD_ALIASES)))}, type.")
+
+    def where(self, expression):
+        """
+        Evaluates a filter expression over every row at once.
+
+        Args:
+            expression (str): Comparisons such as "speed>100" or
+                              "type=electric", joined with "and" / "or".
+
+        Returns:
+            numpy.ndarray: A boolean mask with one entry per row.
+
+        Raises:
+            ValueError: If the expression can't be parsed.
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        for alternative in re.split(r"\s+or\s+", expression.strip().lower()):
+            terms = np.ones(len(self), dtype=bool)
+            for term in re.split(r"\s+and\s+", alternative):
+                terms &= self._compare(term)
+            mask |= terms
+        return mask
+
+    def _compare(self, term):
+        match = _COMPARISON.match(term)
+        if not match:
+            raise ValueError(f"Can't understand '{term}'. Use comparisons like 'speed>100' or 'type=fire'.")
+        field, operator, value = match.groups()
+        if _field_name(field) in ("type", "types"):
+            if value not in _TYPE_BITS:
+                raise ValueError(f"Unknown type '{value}'.")
+            if operator not in ("=", "==", "!="):
+                raise ValueError(f"Types can only be compared with '=' or '!=', not '{operator}'.")
+            has_type = (self.type_mask & np.uint32(_TYPE_BITS[value])) != 0
+            return ~has_type if operator == "!=" else has_type
+        column = self.column(field)
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a number (in '{term}').")
+        return _OPERATORS[operator](column.astype(np.int32), number)
+
+    def query(self, where=None, sort=None, top=None):
+        """
+        Filters, sorts and truncates the dex.
+
+        Args:
+            where (str, optional): Filter expression (see `where`).
+            sort (str, optional): Comma-separated fields to sort by, each
+                                  optionally prefixed with "-" for
+                                  descending order, e.g. "-speed,name".
+                                  Ties are broken by ID.
+            top (int, optional): Keep only the first `top` rows. Without
+                                 `sort`, the highest base stat totals
+                                 are kept.
+
+        Returns:
+            numpy.ndarray: Matching row indices, in result order.
+
+        Raises:
+            ValueError: If the filter or sort keys are invalid.
+        """
+        rows = np.flatnonzero(self.where(where)) if where else np.arange(len(self))
+        if top is not None and top < 0:
+            raise ValueError("--top must not be negative.")
+        if top is not None and not sort:
+            sort = "-bst"
+        if sort:
+            keys = [self.ids[rows]]
+            for key in reversed(sort.split(",")):
+                key = key.strip()
+                descending = key.startswith("-")
+                field = key.lstrip("+-")
+                if _field_name(field) == "name":
+                    values = self.names[rows]
+                    if descending:
+                        raise ValueError("Names can only be sorted in ascending order.")
+                else:
+                    values = self.column(field)[rows].astype(np.int32)
+                    if descending:
+                        values = -values
+                keys.append(values)
+            rows = rows[np.lexsort(keys)]
+        return rows[:top] if top is not None else rows
+
+    def _vectors(self, normalize):
+        vectors = self.stats.astype(np.float64)
+        if normalize and len(vectors):
+            # Standardize each stat so that, e.g., a 20-point gap in Speed
+            # counts as much as a 20-point gap in HP relative to its spread.
+            spread = vectors.std(axis=0)
+            spread[spread == 0] = 1.0
+            vectors = (vectors - vectors.mean(axis=0)) / spread
+        return vectors
+
+    @staticmethod
+    def _unit(vectors):
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def distances(self, row, metric="euclidean", normalize=False):
+        """
+        Computes the distance from one Pokémon to every row.
+
+        Args:
+            row (int): Row of the reference Pokémon (see `row_of`).
+            metric (str, optional): "euclidean" or "cosine" (1 minus the
+                                    cosine similarity).
+            normalize (bool, optional): If True, standardize each stat to
+                                        zero mean and unit variance first.
+
+        Returns:
+            numpy.ndarray: One float64 distance per row.
+
+        Raises:
+            ValueError: If the metric is unknown.
+        """
+        vectors = self._vectors(normalize)
+        if metric == "euclidean":
+            return np.linalg.norm(vectors - vectors[row], axis=1)
+        if metric == "cosine":
+            units = self._unit(vectors)
+            return np.clip(1.0 - units @ units[row], 0.0, 2.0)
+        raise ValueError(f"Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}.")
+
+    def nearest(self, row, k=10, metric="euclidean", normalize=False):
+        """
+        Finds the Pokémon whose base stats are closest to one Pokémon's.
+
+        Args:
+            row (int): Row of the reference Pokémon; it is left out of the
+                       results.
+            k (int, optional): Number of neighbours to return.
+            metric (str, optional): See `distances`.
+            normalize (bool, optional): See `distances`.
+
+        Returns:
+            tuple: `(rows, distances)` arrays, closest first; ties are
+                   broken by ID.
+        """
+        distances = self.distances(row, metric, normalize)
+        distances[row] = np.inf
+        k = max(0, min(k, len(self) - 1))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        candidates = np.argpartition(distances, k - 1)[:k]
+        # Round away float noise so equal stat lines tie and sort by ID
+        order = np.lexsort((self.ids[candidates], np.round(distances[candidates], 9)))
+        rows = candidates[order]
+        return rows, distances[rows]
+
+    def pairwise_distances(self, metric="euclidean", normalize=False):
+        """
+        Computes the distance between every pair of Pokémon at once.
+
+        Args:
+            metric (str, optional): See `distances`.
+            normalize (bool, optional): See `distances`.
+
+        Returns:
+            numpy.ndarray: A symmetric N×N float64 matrix with zeros on
+                           the diagonal.
+
+        Raises:
+            ValueError: If the metric is unknown.
+        """
+        vectors = self._vectors(normalize)
+        if metric == "euclidean":
+            # |a - b|^2 = |a|^2 + |b|^2 - 2ab, as one matrix product
+            squared = np.einsum("ij,ij->i", vectors, vectors)
+            result = squared[:, None] + squared[None, :] - 2.0 * (vectors @ vectors.T)
+            result = np.sqrt(np.clip(result, 0.0, None))
+        elif metric == "cosine":
+            units = self._unit(vectors)
+            result = np.clip(1.0 - units @ units.T, 0.0, 2.0)
+        else:
+            raise ValueError(f"Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}.")
+        np.fill_diagonal(result, 0.0)
+        return result
+
+
+_stat_matrix = None
+_stat_matrix_lock = threading.Lock()
+
+
+def build_stat_matrix(snapshot, path=None):
+    """
+    Returns the stat matrix for a snapshot, reusing the saved copy if current.
+
+    Args:
+        snapshot (pokedex_snapshot.Snapshot): A completed snapshot.
+        path (str, optional): Location of the .npz file. Defaults to
+                              `default_matrix_path()`.
+
+    Returns:
+        StatMatrix: The matrix.
+    """
+    path = path or default_matrix_path()
+    synced_at = snapshot.synced_at or 0.0
+    if os.path.exists(path):
+        try:
+            matrix, saved_at = StatMatrix.load(path)
+            if saved_at == synced_at:
+                return matrix
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable or from an older version; rebuild it
+    matrix = StatMatrix.from_records(snapshot.records())
+    try:
+        matrix.save(path, synced_at)
+    except OSError:
+        pass  # a read-only cache just means rebuilding next time
+    return matrix
+
+
+def get_stat_matrix():
+    """
+    Returns the shared `StatMatrix`, or None if there's no offline snapshot.
+    """
+    global _stat_matrix
+    with _stat_matrix_lock:
+        if _stat_matrix is None:
+            image = get_default_image()
+            if image is not None:
+                _stat_matrix = StatMatrix.from_image(image)
+                return _stat_matrix
+            snapshot = get_default_snapshot()
+            if snapshot is None:
+                return None
+            _stat_matrix = build_stat_matrix(snapshot)
+        return _stat_matrix
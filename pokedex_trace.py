@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+PyDex Trace: Opt-in timing spans and counters for the hot paths.
+
+When a lookup is slow, tracing shows where the time went: name resolution,
+DNS and connection setup, the HTTP request itself, JSON decoding, or
+rendering. It also counts cache hits, misses, revalidations and
+evictions, HTTP retries and bytes transferred.
+
+Tracing is off by default and costs a single flag check per instrumented
+call while off. Turn it on with `--trace` (or `--trace-file`) on the CLI,
+or by setting PYDEX_TRACE=1 for any PyDex program including the GUI. A
+summary table is printed to stderr at exit. Setting PYDEX_TRACE_FILE (or
+passing `--trace-file`) also writes the raw data, either as Chrome trace
+events (open in chrome://tracing or https://ui.perfetto.dev) or as plain
+JSON.
+
+Instrumenting code:
+
+    from pokedex_trace import count, span, traced
+
+    with span("index.build", entries=len(entries)):
+        ...
+    count("cache.hit")
+
+    @traced("render.cli")
+    def display_pokemon_info(...):
+        ...
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Individual span and counter events kept for exporting; aggregates keep
+# counting past this limit.
+MAX_EVENTS = 100000
+
+_enabled = os.environ.get("PYDEX_TRACE", "") not in ("", "0")
+_origin = time.perf_counter()
+_lock = threading.Lock()
+_spans = []       # (name, start, duration, thread id, attrs)
+_span_stats = {}  # name -> [count, total, max]
+_counters = {}    # name -> total
+_counter_events = []  # (name, time, total)
+_report = None
+
+
+def is_enabled():
+    """True while tracing is on."""
+    return _enabled
+
+
+class _NullSpan:
+    """What `span` returns while tracing is off: does nothing, as cheaply as possible."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _record_span(self.name, self.start, duration, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Adds attributes (e.g. a status code) once they are known."""
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    """
+    Times a block of code.
+
+    Args:
+        name (str): Span name, dotted by area (e.g. "http.get").
+        **attrs: Details to attach to the span, such as a URL.
+
+    Returns:
+        A context manager; its `set(**attrs)` adds attributes later.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def traced(name):
+    """Decorator that wraps every call of a function in a span."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """
+    Adds `value` to a counter, e.g. count("http.bytes", len(body)).
+    """
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        if len(_counter_events) < MAX_EVENTS:
+            _counter_events.append((name, time.perf_counter(), total))
+
+
+def _record_span(name, start, duration, attrs):
+    with _lock:
+        stats = _span_stats.get(name)
+        if stats is None:
+            stats = _span_stats[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+        if len(_spans) < MAX_EVENTS:
+            _spans.append((name, start, duration, threading.get_ident(), attrs))
+
+
+def enable():
+    """Turns tracing on (idempotent) and instruments socket setup."""
+    global _enabled
+    _enabled = True
+    _instrument_network()
+
+
+def disable():
+    """Turns tracing off and restores socket setup. Recorded data is kept until `reset`."""
+    global _enabled
+    _enabled = False
+    _restore_network()
+
+
+def reset():
+    """Discards everything recorded so far."""
+    with _lock:
+        del _spans[:]
+        del _counter_events[:]
+        _span_stats.clear()
+        _counters.clear()
+
+
+_network_original = None  # (urllib3.util.connection, its create_connection)
+
+
+def _instrument_network():
+    # DNS lookups and TCP connects happen deep inside urllib3. Its
+    # create_connection is wrapped so both show up as their own spans: the
+    # wrapper resolves the host itself, then hands each address to the
+    # original, which has nothing left to look up. Nothing outside urllib3
+    # is touched, and `_restore_network` puts the original back.
+    global _network_original
+    if _network_original is not None:
+        return
+    try:
+        from urllib3.util import connection
+    except ImportError:
+        return
+    import socket
+
+    create_connection = connection.create_connection
+
+    @functools.wraps(create_connection)
+    def traced_create_connection(address, *args, **kwargs):
+        host, port = address
+        host = host.strip("[]")
+        try:
+            host.encode("idna")
+        except UnicodeError:
+            return create_connection(address, *args, **kwargs)  # raises its own error
+
+        with span("net.dns", host=host):
+            addresses = socket.getaddrinfo(host, port, connection.allowed_gai_family(),
+                                           socket.SOCK_STREAM)
+        error = OSError("getaddrinfo returns an empty list")
+        for *_, sockaddr in addresses:
+            try:
+                with span("net.connect", host=f"{host}:{port}"):
+                    count("net.connections")
+                    return create_connection((sockaddr[0], port), *args, **kwargs)
+            except OSError as e:
+                error = e
+        raise error
+
+    connection.create_connection = traced_create_connection
+    _network_original = (connection, create_connection)
+
+
+def _restore_network():
+    global _network_original
+    if _network_original is None:
+        return
+    connection, create_connection = _network_original
+    connection.create_connection = create_connection
+    _network_original = None
+
+
+# -- Reporting ---------------------------------------------------------
+
+def summary():
+    """
+    Aggregates the recorded spans and counters.
+
+    Returns:
+        dict: `{"spans": {name: {"count", "total_ms", "mean_ms", "max_ms"}},
+                "counters": {name: total}}`.
+    """
+    with _lock:
+        spans = {
+            name: {
+                "count": stats[0],
+                "total_ms": round(stats[1] * 1000, 3),
+                "mean_ms": round(stats[1] * 1000 / stats[0], 3),
+                "max_ms": round(stats[2] * 1000, 3),
+            }
+            for name, stats in _span_stats.items()
+        }
+        return {"spans": spans, "counters": dict(_counters)}
+
+
+def format_summary():
+    """Returns the summary as a text table, slowest spans first."""
+    data = summary()
+    lines = [f"{'Span':<24}{'Count':>8}{'Total ms':>12}{'Mean ms':>12}{'Max ms':>12}"]
+    for name, stats in sorted(data["spans"].items(), key=lambda item: -item[1]["total_ms"]):
+        lines.append(f"{name:<24}{stats['count']:>8}{stats['total_ms']:>12.3f}"
+                     f"{stats['mean_ms']:>12.3f}{stats['max_ms']:>12.3f}")
+    if data["counters"]:
+        lines.append("")
+        lines.append(f"{'Counter':<24}{'Value':>8}")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"{name:<24}{value:>8}")
+    return "\n".join(lines)
+
+
+def print_summary(file=None):
+    """Prints `format_summary()` to stderr (or `file`)."""
+    print("\n--- PyDex trace ---", file=file or sys.stderr)
+    print(format_summary(), file=file or sys.stderr)
+
+
+def chrome_trace():
+    """
+    Returns the recorded data in the Chrome trace event format.
+
+    Spans become complete ("X") events and counters become counter ("C")
+    events, with timestamps in microseconds since the module was loaded.
+    """
+    pid = os.getpid()
+    with _lock:
+        events = [
+            {"name": name, "cat": name.split(".", 1)[0], "ph": "X", "pid": pid, "tid": thread,
+             "ts": round((start - _origin) * 1e6, 1), "dur": round(duration * 1e6, 1),
+             "args": {key: str(value) for key, value in attrs.items()}}
+            for name, start, duration, thread, attrs in _spans
+        ]
+        events.extend(
+            {"name": name, "ph": "C", "pid": pid, "ts": round((at - _origin) * 1e6, 1),
+             "args": {"value": total}}
+            for name, at, total in _counter_events
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export(path, format="chrome"):
+    """
+    Writes the recorded data to a file.
+
+    Args:
+        path (str): Where to write.
+        format (str, optional): "chrome" for Chrome trace events, or "json"
+                                for the summary plus every span.
+    """
+    if format == "chrome":
+        data = chrome_trace()
+    else:
+        data = summary()
+        with _lock:
+            data["events"] = [
+                {"name": name, "start_ms": round((start - _origin) * 1000, 3),
+                 "duration_ms": round(duration * 1000, 3), "thread": thread,
+                 "attrs": {key: str(value) for key, value in attrs.items()}}
+                for name, start, duration, thread, attrs in _spans
+            ]
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+
+
+def report_at_exit(path=None, format="chrome"):
+    """
+    Prints the summary (and writes `path`, if given) when the program exits.
+
+    Calling it again replaces the earlier settings.
+    """
+    global _report
+    first = _report is None
+    _report = (path, format)
+    if first:
+        atexit.register(_report_now)
+
+
+def _report_now():
+    path, format = _report
+    print_summary()
+    if path:
+        try:
+            export(path, format)
+            print(f"Trace written to {path}", file=sys.stderr)
+        except OSError as e:
+            print(f"Could not write trace to {path}: {e}", file=sys.stderr)
+
+
+if _enabled:
+    _instrument_network()
+    report_at_exit(os.environ.get("PYDEX_TRACE_FILE") or None,
+                   os.environ.get("PYDEX_TRACE_FORMAT", "chrome"))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+PyDex Types: Type matchups as a precomputed effectiveness matrix.
+
+The damage relations of the 18 types are fetched once from the PokeAPI's
+/type endpoints (through the response cache, so later runs are offline)
+and turned into an 18×18 matrix `E`, where `E[a, d]` is the damage
+multiplier of an attack of type `a` against a defender of type `d`.
+
+Every question PyDex asks about matchups is then a vectorized product:
+
+- A Pokémon's weaknesses are the product of the columns for its types.
+- A team's defensive profile stacks those products for every member.
+- A team's offensive coverage is the element-wise maximum of its attack
+  types' rows against all 171 defender type combinations (18 single types
+  and 153 pairs) at once.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pokedex_client import api_url, get_client
+from pokedex_model import TYPE_NAMES, project_type_body
+
+_TYPE_INDEX = {name: index for index, name in enumerate(TYPE_NAMES)}
+
+# Column index standing for "no second type" in the extended matrix.
+_NO_TYPE = len(TYPE_NAMES)
+
+_RELATIONS = (("double_damage_to", 2.0), ("half_damage_to", 0.5), ("no_damage_to", 0.0))
+
+
+def _type_slots(types):
+    """Maps one or two type names to matrix columns (the second may be none)."""
+    slots = [_TYPE_INDEX[type_name] for type_name in types if type_name in _TYPE_INDEX][:2]
+    if not slots:
+        raise ValueError("A Pokémon needs at least one type.")
+    return slots[0], slots[1] if len(slots) > 1 else _NO_TYPE
+
+
+class TypeChart:
+    """
+    The type effectiveness matrix and the matchup calculations built on it.
+
+    Attributes:
+        matrix (numpy.ndarray): 18×18 float32 multipliers, attacking type by
+                                defending type, ordered like `TYPE_NAMES`.
+        combos (numpy.ndarray): 171×2 column indices of every defender type
+                                combination; single types use the "no type"
+                                column (18) as their second slot.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=np.float32)
+        # A column of ones for "no second type" lets single and dual types
+        # be handled by the same product.
+        self._extended = np.hstack([self.matrix, np.ones((len(TYPE_NAMES), 1), np.float32)])
+        first, second = np.triu_indices(len(TYPE_NAMES), k=1)
+        singles = np.arange(len(TYPE_NAMES))
+        self.combos = np.vstack([
+            np.column_stack([singles, np.full_like(singles, _NO_TYPE)]),
+            np.column_stack([first, second]),
+        ])
+
+    @classmethod
+    def from_relations(cls, relations):
+        """
+        Builds the chart from per-type damage relations.
+
+        Args:
+            relations (dict): Maps each attacking type name to a dict with
+                              "double_damage_to", "half_damage_to" and
+                              "no_damage_to" lists of type names.
+
+        Returns:
+            TypeChart: The chart. Pairs not mentioned are neutral (1×).
+        """
+        matrix = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)), dtype=np.float32)
+        for attacker, relation in relations.items():
+            row = _TYPE_INDEX.get(attacker)
+            if row is None:
+                continue
+            for key, multiplier in _RELATIONS:
+                for defender in relation.get(key, ()):
+                    if defender in _TYPE_INDEX:
+                        matrix[row, _TYPE_INDEX[defender]] = multiplier
+        return cls(matrix)
+
+    def combo_names(self, combo):
+        """Returns the type names of a row of `combos`."""
+        return tuple(TYPE_NAMES[slot] for slot in combo if slot != _NO_TYPE)
+
+    def defense(self, types):
+        """
+        Computes how hard every attacking type hits a defender.
+
+        Args:
+            types (sequence of str): The defender's one or two types.
+
+        Returns:
+            numpy.ndarray: 18 multipliers, one per attacking type.
+        """
+        first, second = _type_slots(types)
+        return self._extended[:, first] * self._extended[:, second]
+
+    def team_defense(self, team_types):
+        """
+        Computes the defensive multipliers of a whole team at once.
+
+        Args:
+            team_types (sequence): Each member's types.
+
+        Returns:
+            numpy.ndarray: members×18 multipliers.
+        """
+        slots = np.array([_type_slots(types) for types in team_types])
+        return (self._extended[:, slots[:, 0]] * self._extended[:, slots[:, 1]]).T
+
+    def coverage(self, attack_types):
+        """
+        Finds the best multiplier a set of attack types gets against every
+        defender type combination.
+
+        Args:
+            attack_types (iterable of str): Types of the available attacks.
+
+        Returns:
+            numpy.ndarray: One multiplier per row of `combos`.
+        """
+        rows = sorted({_TYPE_INDEX[type_name] for type_name in attack_types})
+        if not rows:
+            return np.ones(len(self.combos), dtype=np.float32)
+        attacks = self._extended[rows]
+        against = attacks[:, self.combos[:, 0]] * attacks[:, self.combos[:, 1]]
+        return against.max(axis=0)
+
+    def matchups(self, types):
+        """
+        Groups the attacking types by their multiplier against a defender.
+
+        Args:
+            types (sequence of str): The defender's one or two types.
+
+        Returns:
+            dict: Maps each multiplier other than 1 (e.g. 4.0, 0.25, 0.0) to
+                  the attacking type names, strongest multiplier first.
+        """
+        multipliers = self.defense(types)
+        groups = {}
+        for value in sorted(set(multipliers.tolist()) - {1.0}, reverse=True):
+            groups[value] = [TYPE_NAMES[index] for index in np.flatnonzero(multipliers == value)]
+        return groups
+
+
+def fetch_type_relations(use_cache=True, refresh=False):
+    """
+    Fetches the damage relations of all 18 types.
+
+    Returns:
+        dict: Relations keyed by type name (see `TypeChart.from_relations`).
+
+    Raises:
+        requests.exceptions.RequestException: If a /type entry can't be
+                                              fetched.
+    """
+    client = get_client()
+
+    def load(type_name):
+        response = client.fetch(api_url("type", type_name), use_cache=use_cache,
+                                refresh=refresh, transform=project_type_body)
+        response.raise_for_status()
+        return response.json()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(8, client.pool_size))) as executor:
+        return dict(zip(TYPE_NAMES, executor.map(load, TYPE_NAMES)))
+
+
+_type_chart = None
+_type_chart_lock = threading.Lock()
+
+
+def get_type_chart():
+    """
+    Returns the shared `TypeChart`, fetching the relations on first use.
+
+    Raises:
+        requests.exceptions.RequestException: If the chart isn't cached yet
+                                              and can't be fetched.
+    """
+    global _type_chart
+    with _type_chart_lock:
+        if _type_chart is None:
+            _type_chart = TypeChart.from_relations(fetch_type_relations())
+        return _type_chart
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex benchmark suite and the mock server's network knobs.
+Run with: python -m pytest test_bench_pokedex.py
+"""
+
+import json
+
+import requests
+
+import pokedex_client
+from bench_pokedex import BenchEnvironment, compare, run_benchmarks
+from mock_pokeapi import MockPokeAPI, load_fixtures, synthetic_dex, synthetic_pokemon
+
+
+def test_benchmarks_produce_json_summaries(cache_dir, monkeypatch):
+    # The environment repoints the shared client; undo that afterwards.
+    monkeypatch.setattr(pokedex_client, "API_BASE_URL", pokedex_client.API_BASE_URL)
+    with MockPokeAPI(synthetic_dex(10)) as api:
+        env = BenchEnvironment(api, workers=4)
+        try:
+            results = run_benchmarks(env, ["single_cold", "single_warm", "batch_warm"], repeat=2)
+        finally:
+            env.close()
+
+    assert set(results) == {"single_cold", "single_warm", "batch_warm"}
+    assert results["single_warm"]["runs"] == 20
+    assert results["batch_warm"]["pokemon"] == 10
+    assert results["single_warm"]["median_ms"] < results["single_cold"]["median_ms"]
+    json.dumps(results)
+
+
+def test_compare_flags_slower_medians():
+    baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+    current = {"results": {"a": {"median_ms": 11.0}, "b": {"median_ms": 20.0},
+                           "c": {"skipped": "no display"}}}
+    assert compare(baseline, current, threshold=0.25) == [("b", 10.0, 20.0, 2.0)]
+
+
+def test_mock_error_rate_and_fixtures(tmp_path):
+    with MockPokeAPI(synthetic_dex(3), error_rate=1.0, seed=1) as api:
+        assert requests.get(f"{api.base_url}/pokemon/1", timeout=5).status_code == 503
+
+    (tmp_path / "pokemon").mkdir()
+    (tmp_path / "pokemon" / "7.json").write_text(json.dumps(synthetic_pokemon(7)))
+    pokemon, resources = load_fixtures(str(tmp_path))
+    assert list(pokemon) == [7]
+    with MockPokeAPI(pokemon, resources, latency=0.01, jitter=0.01, seed=1) as api:
+        assert requests.get(f"{api.base_url}/pokemon/squirtle", timeout=5).json()["id"] == 7
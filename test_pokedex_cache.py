@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex on-disk response cache.
+Run with: python -m pytest test_pokedex_cache.py
+"""
+
+import time
+
+from pokedex_cache import ResponseCache, cached_get
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeGet:
+    """Records requests and replays a list of canned responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, url, headers=None):
+        self.calls.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+
+URL = "https://pokeapi.co/api/v2/pokemon/pikachu"
+
+
+def test_fresh_entry_is_served_without_network(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    get = FakeGet(FakeResponse(200, b'{"name": "pikachu"}', {"ETag": '"abc"'}))
+
+    first = cached_get(URL, cache=cache, get=get)
+    second = cached_get(URL, cache=cache, get=get)
+
+    assert len(get.calls) == 1
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.json() == {"name": "pikachu"}
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    get = FakeGet(
+        FakeResponse(200, b'{"name": "pikachu"}', {"ETag": '"abc"'}),
+        FakeResponse(304),
+    )
+
+    cached_get(URL, cache=cache, ttl=-1, get=get)
+    response = cached_get(URL, cache=cache, get=get)
+
+    assert get.calls[1][1]["If-None-Match"] == '"abc"'
+    assert response.from_cache
+    assert response.json() == {"name": "pikachu"}
+    assert cache.get(URL).is_fresh()
+
+
+def test_refresh_revalidates_fresh_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    get = FakeGet(
+        FakeResponse(200, b'{"v": 1}', {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        FakeResponse(200, b'{"v": 2}'),
+    )
+
+    cached_get(URL, cache=cache, get=get)
+    response = cached_get(URL, cache=cache, refresh=True, get=get)
+
+    assert get.calls[1][1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert response.json() == {"v": 2}
+    assert cache.get(URL).body == b'{"v": 2}'
+
+
+def test_not_found_is_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    get = FakeGet(FakeResponse(404))
+
+    cached_get(URL, cache=cache, get=get)
+    response = cached_get(URL, cache=cache, get=get)
+
+    assert len(get.calls) == 1
+    assert response.status_code == 404
+    assert not response.ok
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    cache.put("a", 200, b"x" * 100)
+    time.sleep(0.01)
+    cache.put("b", 200, b"x" * 100)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", 200, b"x" * 100)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.total_size() <= 250
+
+
+def test_no_cache_always_hits_network():
+    get = FakeGet(FakeResponse(200, b"{}"), FakeResponse(200, b"{}"))
+
+    cached_get(URL, cache=None, get=get)
+    cached_get(URL, cache=None, get=get)
+
+    assert len(get.calls) == 2
+
+
+def test_default_cache_is_returned_even_when_empty(tmp_path, monkeypatch):
+    import pokedex_cache
+
+    monkeypatch.setenv("PYDEX_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pokedex_cache, "_default_cache", None)
+
+    cache = pokedex_cache.get_default_cache()
+
+    assert isinstance(cache, ResponseCache)
+    assert len(cache) == 0
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the command-line helpers in pokedex.py.
+Run with: python -m pytest test_pokedex_cli.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pokedex import expand_identifiers
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_expand_names_ids_and_ranges():
+    assert expand_identifiers(["Pikachu", "25", "1-3", "mr-mime", "ho-oh"]) == [
+        "pikachu", "25", "1", "2", "3", "mr-mime", "ho-oh"
+    ]
+
+
+def test_expand_file(tmp_path):
+    team = tmp_path / "team.txt"
+    team.write_text("pikachu, charizard  # starters\n4-5\n\n# comment only\nmew\n")
+
+    assert expand_identifiers([f"@{team}", "eevee"]) == [
+        "pikachu", "charizard", "4", "5", "mew", "eevee"
+    ]
+
+
+def test_reversed_range_is_rejected():
+    with pytest.raises(ValueError):
+        expand_identifiers(["151-1"])
+
+
+def test_missing_file_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        expand_identifiers([f"@{tmp_path / 'missing.txt'}"])
+
+
+def _run_cli(api, *args):
+    env = dict(os.environ, PYDEX_API_URL=api.base_url)
+    return subprocess.run([sys.executable] + list(args), cwd=_HERE, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, timeout=60)
+
+
+def test_cached_lookup_skips_network_and_color_imports(mock_api):
+    assert "Pikachu" in _run_cli(mock_api, "pokedex.py", "pikachu").stdout
+
+    script = ("import sys; sys.argv = ['pokedex.py', 'pikachu']; import pokedex; pokedex.main(); "
+              "print(sorted(name for name in ('requests', 'asyncio', 'colorama') if name in sys.modules))")
+    result = _run_cli(mock_api, "-c", script)
+    assert "--- Pikachu ---" in result.stdout
+    assert "\x1b[" not in result.stdout  # not a terminal, so no colors
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_missing_pokemon_prints_help(mock_api):
+    result = _run_cli(mock_api, "pokedex.py")
+    assert result.returncode == 1
+    assert "No Pokémon specified" in result.stdout
+    assert "usage:" in result.stdout
+
+
+def test_ndjson_output_streams_records_and_reports_errors_on_stderr(mock_api):
+    result = _run_cli(mock_api, "pokedex.py", "1-3", "zzzzzqq", "--format", "ndjson")
+    assert result.returncode == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record["name"] for record in records] == ["bulbasaur", "ivysaur", "venusaur"]
+    assert "zzzzzqq: not found" in result.stderr
+
+    result = _run_cli(mock_api, "pokedex.py", "pikachu", "--format", "json")
+    assert [record["id"] for record in json.loads(result.stdout)] == [25]
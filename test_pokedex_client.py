@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared PyDex HTTP client.
+Run with: python -m pytest test_pokedex_client.py
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from pokedex_client import PokeClient
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers with the queued statuses, then with a small JSON body."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        server.client_ports.add(self.client_address[1])
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = json.dumps({"name": "pikachu"}).encode() if status == 200 else b""
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), FlakyHandler)
+    httpd.statuses = []
+    httpd.requests = 0
+    httpd.client_ports = set()
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url_for(server, path="/pokemon/pikachu"):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_retries_transient_errors(server):
+    server.statuses = [503, 429]
+    client = PokeClient(backoff=0.001)
+
+    response = client.get(url_for(server))
+
+    assert response.status_code == 200
+    assert server.requests == 3
+
+
+def test_too_many_requests_pauses_the_scheduler(server, monkeypatch):
+    server.statuses = [429]
+    client = PokeClient(backoff=0.001)
+    pauses = []
+    monkeypatch.setattr(client.scheduler, "pause", pauses.append)
+
+    assert client.get(url_for(server)).status_code == 200
+    assert len(pauses) == 1
+    assert client.scheduler.active == 0
+
+
+def test_gives_up_after_max_retries(server):
+    server.statuses = [500, 500, 500]
+    client = PokeClient(retries=2, backoff=0.001)
+
+    response = client.get(url_for(server))
+
+    assert response.status_code == 500
+    assert server.requests == 3
+
+
+def test_does_not_retry_not_found(server):
+    server.statuses = [404]
+    client = PokeClient(backoff=0.001)
+
+    assert client.get(url_for(server)).status_code == 404
+    assert server.requests == 1
+
+
+def test_connections_are_reused(server):
+    client = PokeClient()
+
+    for _ in range(5):
+        client.get(url_for(server)).content
+
+    assert server.requests == 5
+    assert len(server.client_ports) == 1
+
+
+def test_backoff_honours_retry_after():
+    client = PokeClient(backoff=0.001)
+
+    assert client.backoff_delay(0, retry_after="2") >= 2
+    assert client.backoff_delay(10) <= 10
+
+
+def test_fetch_pokemon_data_async_matches_sync(mock_api):
+    from pokedex import fetch_pokemon_data, fetch_pokemon_data_async
+
+    async_data = asyncio.run(fetch_pokemon_data_async("pikachu", use_cache=False))
+
+    assert async_data == fetch_pokemon_data("pikachu", use_cache=False)
+    assert async_data["id"] == 25
+
+
+def test_fetch_pokemon_data_keeps_the_dict_shape(mock_api):
+    from pokedex import fetch_pokemon, fetch_pokemon_data
+
+    data = fetch_pokemon_data("pikachu", use_cache=False)
+
+    assert isinstance(data, dict)
+    assert data["name"] == "pikachu"
+    assert data["stats"][0]["base_stat"] == mock_api.pokemon[25]["stats"][0]["base_stat"]
+    assert data == fetch_pokemon("pikachu", use_cache=False).to_dict()
+
+
+def test_fetch_many_async_keeps_order_and_bounds_concurrency(mock_api):
+    from pokedex import fetch_many_async
+
+    mock_api.latency = 0.02
+    ids = list(range(1, 31))
+
+    results = asyncio.run(fetch_many_async(ids, concurrency=4, use_cache=False))
+
+    assert [data["id"] for data in results] == ids
+    assert mock_api.max_in_flight <= 4
+
+
+def test_fetch_many_async_can_return_exceptions(mock_api):
+    import requests
+    from pokedex import fetch_many_async
+
+    results = asyncio.run(fetch_many_async([1, "missingno", 2], return_exceptions=True))
+
+    assert results[0]["id"] == 1
+    assert isinstance(results[1], requests.exceptions.HTTPError)
+    assert results[2]["id"] == 2
+
+
+def test_async_lookup_times_out_without_blocking_the_loop(mock_api):
+    from pokedex import load_pokemon_data_async
+
+    mock_api.latency = 0.5
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.ensure_future(ticker())
+        with pytest.raises(asyncio.TimeoutError):
+            await load_pokemon_data_async(1, timeout=0.1, use_cache=False)
+        ticker_task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
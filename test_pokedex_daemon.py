@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex daemon and its thin client.
+Run with: python -m pytest test_pokedex_daemon.py
+"""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import pokedex_daemon
+from pokedex import _should_forward, run_redirected
+from pokedex_daemon import Daemon, DaemonError, forward, send_request
+
+pytestmark = pytest.mark.skipif(not pokedex_daemon.is_supported(),
+                                reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def start_daemon(tmp_path):
+    daemons = []
+
+    def start(run, **options):
+        daemon = Daemon(run, path=str(tmp_path / "pydex.sock"), **options)
+        daemon.bind()
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        daemons.append((daemon, thread))
+        return daemon, thread
+
+    yield start
+    for daemon, thread in daemons:
+        send_request({"command": "stop"}, path=daemon.path)
+        thread.join(5)
+
+
+def test_forwarded_calls_print_the_daemons_output(start_daemon, capsys, monkeypatch):
+    calls = []
+
+    def run(argv, stdout, stderr, color):
+        calls.append((argv, color, os.getcwd()))
+        print("out", file=stdout)
+        print("err", file=stderr)
+        return 3
+
+    reloads = []
+    monkeypatch.setenv("PYDEX_API_URL", "http://a")
+    daemon, _ = start_daemon(run, reload=lambda: reloads.append(True))
+
+    assert forward(["pikachu", "-a"], path=daemon.path) == 3
+    assert capsys.readouterr() == ("out\n", "err\n")
+    assert calls == [(["pikachu", "-a"], False, os.getcwd())]
+
+    # A client with different settings (another API, another cache
+    # directory, a rate limit) runs the call itself.
+    monkeypatch.setenv("PYDEX_API_URL", "http://b")
+    assert forward(["pikachu"], path=daemon.path) is None
+    monkeypatch.setenv("PYDEX_API_URL", "http://a")
+    for name, value in (("PYDEX_CACHE_DIR", os.path.join(os.getcwd(), "elsewhere")),
+                        ("PYDEX_RATE", "1")):
+        saved = os.environ.get(name)
+        monkeypatch.setenv(name, value)
+        assert forward(["pikachu"], path=daemon.path) is None
+        if saved is None:
+            monkeypatch.delenv(name)
+        else:
+            monkeypatch.setenv(name, saved)
+    assert len(calls) == 1
+    assert send_request({"command": "reload"}, path=daemon.path) == {"reloaded": True}
+    assert reloads == [True]
+    with pytest.raises(DaemonError):
+        Daemon(run, path=daemon.path).bind()
+
+
+def test_no_daemon_means_run_in_process(tmp_path):
+    path = str(tmp_path / "pydex.sock")
+    assert forward(["pikachu"], path=path) is None
+
+    # A socket file left behind by a daemon that died is replaced.
+    daemon = Daemon(lambda argv, stdout, stderr, color: 0, path=path)
+    daemon.bind()
+    daemon._sock.close()
+    daemon._sock = None
+    assert os.path.exists(path)
+    assert forward(["pikachu"], path=path) is None
+    Daemon(lambda argv, stdout, stderr, color: 0, path=path).bind()
+
+
+def test_daemon_exits_when_idle(start_daemon):
+    daemon, thread = start_daemon(lambda argv, stdout, stderr, color: 0, idle_timeout=0.2)
+    started = time.monotonic()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert time.monotonic() - started < 5
+    assert not os.path.exists(daemon.path)
+
+
+def test_daemon_answers_lookups(mock_api, start_daemon, capsys):
+    daemon, _ = start_daemon(run_redirected)
+
+    assert forward(["pikachu", "--abilities"], path=daemon.path) == 0
+    out = capsys.readouterr().out
+    assert "--- Pikachu ---" in out and "Abilities" in out
+    assert "\x1b[" not in out
+
+    assert forward(["--bogus"], path=daemon.path) == 2
+    assert "unrecognized arguments" in capsys.readouterr().err
+
+    # Calls that change process-wide settings are handed back to the client.
+    daemon.accept = _should_forward
+    assert forward(["pikachu", "--timeout", "5"], path=daemon.path) is None
+    assert forward(["pikachu", "--no-daemon"], path=daemon.path) is None
+    assert forward(["pikachu"], path=daemon.path) == 0
+    assert daemon.requests == 3
+
+
+def test_a_daemon_failing_mid_call_is_not_retried_in_process(tmp_path, capsys):
+    # A "daemon" that takes the request and dies without answering.
+    path = str(tmp_path / "pydex.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    def accept_and_close():
+        conn, _ = server.accept()
+        conn.recv(65536)
+        conn.close()
+
+    thread = threading.Thread(target=accept_and_close, daemon=True)
+    thread.start()
+    try:
+        assert forward(["--random"], path=path) == 1
+    finally:
+        thread.join(5)
+        server.close()
+    assert "before the call finished" in capsys.readouterr().err
+
+
+def test_output_streams_to_the_client_in_chunks(start_daemon):
+    release = threading.Event()
+    line = "x" * 99 + "\n"
+
+    def run(argv, stdout, stderr, color):
+        for _ in range(pokedex_daemon.CHUNK_SIZE // len(line) + 1):
+            stdout.write(line)
+        release.wait(5)  # the first chunk must arrive before the call ends
+        stdout.write(line * 10)
+        print("failed: 999", file=stderr)
+        return 0
+
+    daemon, _ = start_daemon(run)
+    sock = pokedex_daemon._open({"argv": [], "settings": pokedex_daemon.call_settings()},
+                                 daemon.path)
+    with sock:
+        replies = pokedex_daemon._replies(sock)
+        first = next(replies)
+        assert len(first["stdout"]) >= pokedex_daemon.CHUNK_SIZE
+        release.set()
+        rest = list(replies)
+    # stdout is sent before the error line, so the two stay in order.
+    assert rest == [{"stdout": line * 10}, {"stderr": "failed: 999\n"}, {"exit": 0}]
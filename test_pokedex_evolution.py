@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for PyDex's evolution chains and the graph that shares them.
+Run with: python -m pytest test_pokedex_evolution.py
+"""
+
+import json
+
+from pokedex import fetch_many, load_evolution
+from pokedex_evolution import EvolutionChain, _compact_chain, get_evolution_graph
+
+
+def _link(species_id, name, details=(), evolves_to=()):
+    return {"species": {"name": name, "url": f"/api/v2/pokemon-species/{species_id}/"},
+            "evolution_details": list(details), "evolves_to": list(evolves_to)}
+
+
+def test_branching_chain_renders_as_a_tree():
+    stone = {"trigger": {"name": "use-item"}, "item": {"name": "water-stone"}}
+    friendship = {"trigger": {"name": "level-up"}, "min_happiness": 160, "time_of_day": "day"}
+    payload = {"id": 67, "chain": _link(133, "eevee", evolves_to=[
+        _link(134, "vaporeon", [stone]),
+        _link(196, "espeon", [friendship]),
+    ])}
+
+    chain = EvolutionChain.from_json(_compact_chain(json.dumps(payload).encode()))
+
+    assert chain.species_ids == [133, 134, 196]
+    assert chain.parent(196)[1] == "eevee" and chain.parent(133) is None
+    assert chain.tree_lines() == [
+        ("Eevee", 133),
+        ("├─ Vaporeon (use water-stone)", 134),
+        ("└─ Espeon (high friendship (day))", 196),
+    ]
+
+
+def test_family_members_share_one_chain_fetch(mock_api):
+    results = list(fetch_many(["bulbasaur", "ivysaur", "venusaur"], workers=3,
+                              prefetch=load_evolution))
+
+    assert mock_api.hits["/api/v2/evolution-chain/1"] == 1
+    graph = get_evolution_graph()
+    assert [graph.known(data.species_id).id for _, data, _ in results] == [1, 1, 1]
+
+    # Once a family is known, its other members need no request at all.
+    before = sum(mock_api.hits.values())
+    charmander = next(fetch_many(["charmander"]))[1]
+    chain = load_evolution(charmander)
+    assert [name for _, name, _, _ in chain.nodes] == ["charmander", "charmeleon", "charizard"]
+    charizard = next(fetch_many(["charizard"]))[1]
+    assert load_evolution(charizard) is chain
+    assert mock_api.hits["/api/v2/pokemon-species/6"] == 0
+    assert sum(mock_api.hits.values()) - before == 4  # 2 Pokémon, 1 species, 1 chain
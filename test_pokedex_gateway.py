@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex caching HTTP gateway.
+Run with: python -m pytest test_pokedex_gateway.py
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pokedex_client
+from mock_pokeapi import MockPokeAPI
+from pokedex import load_pokemon_data
+from pokedex_gateway import Coalescer, Gateway, GatewayServer, parse_address
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, response.headers.get("X-PyDex-Source"), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("X-PyDex-Source"), json.loads(e.read())
+
+
+def test_coalescer_shares_one_call():
+    coalescer = Coalescer()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(coalescer.run, "key", work) for _ in range(8)]
+        while not calls or len(coalescer) != 1:
+            time.sleep(0.01)
+        time.sleep(0.1)  # let the others queue up behind the first call
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert {result for result, _ in results} == {"result"}
+
+    def fail():
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        coalescer.run("key", fail)
+    assert len(coalescer) == 0
+
+
+def test_parse_address():
+    assert parse_address(":8080") == ("127.0.0.1", 8080)
+    assert parse_address("0.0.0.0:80") == ("0.0.0.0", 80)
+    assert parse_address("9000") == ("127.0.0.1", 9000)
+    with pytest.raises(ValueError):
+        parse_address("localhost:http")
+
+
+def test_concurrent_requests_are_coalesced(cache_dir, monkeypatch):
+    with MockPokeAPI(latency=0.2) as api:
+        monkeypatch.setattr(pokedex_client, "API_BASE_URL", api.base_url)
+        with GatewayServer(Gateway(load_pokemon_data)) as server:
+            _get(f"{server.url}/pokemon/1")  # builds the name index
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                results = list(executor.map(_get, [f"{server.url}/pokemon/pikachu"] * 10))
+            assert {status for status, _, _ in results} == {200}
+            assert sorted(source for _, source, _ in results).count("load") == 1
+            assert api.hits["/api/v2/pokemon/25"] == 1
+
+            status, source, body = _get(f"{server.url}/pokemon/25")
+            assert (status, source, body["name"]) == (200, "memory", "pikachu")
+            assert body["stats"][0]["stat"]["name"] == "hp"
+
+            status, _, body = _get(f"{server.url}/pokemon/25?view=raw")
+            assert status == 200 and "base_experience" in body
+
+            status, source, body = _get(f"{server.url}/pokemon/pikachuu")
+            assert status == 200 and body["id"] == 25
+            status, source, body = _get(f"{server.url}/pokemon/zzzz")
+            assert (status, source) == (404, "index")
+
+            metrics = _get(f"{server.url}/metrics")[2]
+            assert metrics["requests"] == 15
+            assert metrics["loads"] == 3
+            assert metrics["coalesced"] == 9
+            assert metrics["hit_rate"] == round(12 / 15, 4)
+
+
+def test_memory_is_bounded(mock_api):
+    gateway = Gateway(load_pokemon_data, max_entries=2)
+    for pokemon_id in ("1", "2", "3", "1"):
+        assert gateway.get(pokemon_id)[0] == 200
+    metrics = gateway.snapshot_metrics()
+    assert metrics["memory_entries"] == 2
+    assert metrics["evictions"] == 2
+    assert metrics["loads"] == 4
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Display-free tests for the PyDex GUI: the browse grid, searches and prefetching.
+Run with: python -m pytest test_pokedex_gui.py
+
+Tk widgets are replaced with small fakes, and background work runs only when
+a test says so, so no display (or timing luck) is needed.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+pokedex_gui = pytest.importorskip("pokedex_gui")
+from PIL import Image
+
+from mock_pokeapi import synthetic_pokemon
+from pokedex_gui import GRID_CELL, PREFETCH_OFFSETS, SPRITE_CACHE_SIZE, THUMBNAIL_CACHE_SIZE, PokedexGUI
+from pokedex_index import NameIndex
+from pokedex_model import Pokemon
+
+tk = pokedex_gui.tk
+
+DEX_SIZE = 1300
+
+
+class FakeWidget:
+    """Stands in for any Tk widget the code under test only packs, binds or configures."""
+
+    def __init__(self, *args, **options):
+        self.options = options
+
+    def pack(self, **options):
+        pass
+
+    def pack_forget(self):
+        pass
+
+    def place_forget(self):
+        pass
+
+    def bind(self, sequence, callback):
+        pass
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def set(self, *args):
+        pass
+
+    def winfo_ismapped(self):
+        return False
+
+
+class FakeVar:
+    """Stands in for tk.StringVar."""
+
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeRoot(FakeWidget):
+    """A Tk root whose `after` callbacks run only when the test calls `run_after`."""
+
+    def __init__(self):
+        super().__init__()
+        self.scheduled = {}
+        self._next_id = 0
+
+    def title(self, *args):
+        pass
+
+    geometry = resizable = iconphoto = protocol = title
+
+    def after(self, delay_ms, callback):
+        self._next_id += 1
+        self.scheduled[self._next_id] = (delay_ms, callback)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def pending(self):
+        return [callback for _, callback in self.scheduled.values()]
+
+    def run_after(self):
+        """Runs the callbacks scheduled so far (not the ones they schedule)."""
+        scheduled, self.scheduled = self.scheduled, {}
+        for _, callback in scheduled.values():
+            callback()
+
+
+class FakeCanvas(FakeWidget):
+    """
+    Just enough of tk.Canvas for the browse grid: tagged items and a view
+    that scrolls vertically. It counts the item moves and reconfigurations a
+    scroll costs.
+    """
+
+    def __init__(self, parent=None, width=1040, height=640, **options):
+        super().__init__(**options)
+        self.width, self.height = width, height
+        self.top = 0
+        self.items = {}  # id -> options, with "tags" and "coords"
+        self.moves = 0
+        self.itemconfigs = 0
+
+    def _create(self, *coords, tags=(), **options):
+        item = len(self.items) + 1
+        self.items[item] = dict(options, tags=tuple(tags), coords=list(coords))
+        return item
+
+    create_rectangle = create_image = create_text = _create
+
+    def find(self, tag_or_id):
+        return [item for item, options in self.items.items()
+                if item == tag_or_id or tag_or_id in options["tags"]]
+
+    def itemconfig(self, tag_or_id, **options):
+        self.itemconfigs += 1
+        for item in self.find(tag_or_id):
+            self.items[item].update(options)
+
+    def move(self, tag_or_id, dx, dy):
+        self.moves += 1
+        for item in self.find(tag_or_id):
+            coords = self.items[item]["coords"]
+            coords[0::2] = [x + dx for x in coords[0::2]]
+            coords[1::2] = [y + dy for y in coords[1::2]]
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def canvasx(self, x):
+        return x
+
+    def canvasy(self, y):
+        return self.top + y
+
+    def yview(self, *args):
+        pass  # the scrollbar's command; tests scroll with scroll_to
+
+    def scroll_height(self):
+        return self.options["scrollregion"][3]
+
+    def scroll_to(self, top):
+        """Scrolls the view so `top` is its first line, as the scrollbar would."""
+        self.top = max(0, min(top, self.scroll_height() - self.height))
+        height = self.scroll_height()
+        self.options["yscrollcommand"](self.top / height, (self.top + self.height) / height)
+
+
+class ManualExecutor:
+    """Stands in for a ThreadPoolExecutor: work runs only when `run_pending` is called."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, work):
+        future = Future()
+        self.pending.append((future, work))
+        return future
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for future, work in pending:
+            if not future.set_running_or_notify_cancel():
+                continue  # cancelled before it started
+            try:
+                future.set_result(work())
+            except Exception as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait=True):
+        pass
+
+
+@pytest.fixture
+def app(monkeypatch):
+    for name in ("Frame", "Scrollbar", "Label", "Button", "Entry", "Listbox"):
+        monkeypatch.setattr(tk, name, FakeWidget)
+    monkeypatch.setattr(tk, "Canvas", FakeCanvas)
+    monkeypatch.setattr(pokedex_gui.ImageTk, "PhotoImage", lambda image: ("photo", image))
+    monkeypatch.setattr(PokedexGUI, "setup_ui", lambda self: None)
+
+    gui = PokedexGUI(FakeRoot())
+    for pool in (gui.executor, gui.prefetcher, gui.thumbnailer):
+        pool.shutdown()
+    gui.executor, gui.prefetcher, gui.thumbnailer = (ManualExecutor(), ManualExecutor(),
+                                                     ManualExecutor())
+
+    # What setup_ui would have built
+    gui.status_label = gui.suggestion_list = gui.pokemon_card = FakeWidget()
+    gui.welcome_frame = FakeWidget()
+    gui.result_frame = gui.browse_frame = None
+    gui.search_var = FakeVar()
+    gui.suggestions = []
+    gui.name_index = None
+    gui._index_requested = False
+    return gui
+
+
+@pytest.fixture
+def searches(app, monkeypatch):
+    """The app with lookups answered from synthetic records; returns what got displayed."""
+    shown = []
+    monkeypatch.setattr(app, "load_search_result", lambda query, priority=None: (record(query), None, None))
+    monkeypatch.setattr(app, "display_pokemon",
+                        lambda data, sprite, evolution: shown.append((data.id, threading.get_ident())))
+    monkeypatch.setattr(app, "prefetch_neighbours", lambda pokemon_id: None)
+    return shown
+
+
+@pytest.fixture
+def prefetches(app, monkeypatch):
+    """The app with lookups (searches and prefetches alike) answered from synthetic records."""
+    failing = set()
+
+    def load(query, priority=None):
+        if int(query) in failing:
+            raise RuntimeError("offline")
+        return record(query), Image.new("RGBA", (4, 4)), None
+
+    monkeypatch.setattr(app, "load_search_result", load)
+    monkeypatch.setattr(app, "display_pokemon", lambda data, sprite, evolution: None)
+    return failing
+
+
+@pytest.fixture
+def grid(app, monkeypatch):
+    """The app with its browse grid showing a dex of DEX_SIZE entries."""
+    monkeypatch.setattr(app, "load_thumbnail", lambda pokemon_id: Image.new("RGBA", (4, 4)))
+    app.show_browse()
+    app.executor.pending.clear()  # the index load; it is delivered by hand below
+    app.on_browse_index_loaded(NameIndex((number, f"mon-{number}") for number in range(1, DEX_SIZE + 1)))
+    return app
+
+
+def record(number):
+    data = synthetic_pokemon(int(number))
+    data["sprites"] = {"front_default": f"https://sprites.test/{int(number)}.png"}
+    return Pokemon.from_api(data)
+
+
+def search(app, query):
+    app.search_var.set(query)
+    app.search_pokemon()
+    return app._search_future
+
+
+def search_and_show(app, query):
+    """Runs a search through to its result being shown (which starts the prefetches)."""
+    search(app, query)
+    app.executor.run_pending()
+    app._drain_results()
+
+
+def neighbours(pokemon_id):
+    return {pokemon_id + offset for offset in PREFETCH_OFFSETS}
+
+
+def visible_ids(app):
+    return [cell.pokemon_id for cell in app.grid_cells if cell.pokemon_id is not None]
+
+
+def expected_ids(app):
+    """The IDs that belong in view, from the first row the canvas shows."""
+    canvas = app.grid_canvas
+    first = int(canvas.canvasy(0)) // GRID_CELL[1] * app.grid_columns
+    return [pokemon_id for pokemon_id, _ in app.grid_entries[first:first + len(app.grid_cells)]]
+
+
+def load_thumbnails(app):
+    """Lets scrolling 'pause', then runs the thumbnail loads and delivers them."""
+    app.root.run_after()
+    app.thumbnailer.run_pending()
+    app._drain_results()
+
+
+def test_grid_pool_covers_the_rows_in_view(grid):
+    canvas = grid.grid_canvas
+    rows_in_view = canvas.height // GRID_CELL[1] + 2
+    assert grid.grid_columns == canvas.width // GRID_CELL[0]
+    assert len(grid.grid_cells) == rows_in_view * grid.grid_columns
+    assert canvas.scroll_height() == -(-DEX_SIZE // grid.grid_columns) * GRID_CELL[1]
+    assert visible_ids(grid) == expected_ids(grid)
+
+
+def test_a_scroll_within_the_same_rows_moves_no_cells(grid):
+    canvas = grid.grid_canvas
+    canvas.scroll_to(2 * GRID_CELL[1])
+    moves, itemconfigs = canvas.moves, canvas.itemconfigs
+    scheduled = len(grid.root.scheduled)
+
+    for top in range(2 * GRID_CELL[1] + 1, 3 * GRID_CELL[1], 7):
+        canvas.scroll_to(top)
+
+    assert (canvas.moves, canvas.itemconfigs) == (moves, itemconfigs)
+    assert len(grid.root.scheduled) == scheduled  # no new thumbnail request either
+
+
+def test_the_cell_pool_stays_fixed_across_the_whole_dex(grid):
+    canvas = grid.grid_canvas
+    pool = list(grid.grid_cells)
+    items = len(canvas.items)
+
+    top = 0
+    while top < canvas.scroll_height() - canvas.height:
+        top += GRID_CELL[1] // 2
+        canvas.scroll_to(top)
+        assert visible_ids(grid) == expected_ids(grid)
+    canvas.scroll_to(0)
+
+    assert grid.grid_cells == pool
+    assert len(canvas.items) == items
+    assert visible_ids(grid)[-1] == grid.grid_entries[len(pool) - 1][0]
+    cell = grid.grid_cells[grid.grid_columns + 1]
+    x, y = canvas.items[canvas.find(cell.tag)[0]]["coords"][:2]
+    assert (x - 5, y - 5) == (grid.grid_margin + GRID_CELL[0], GRID_CELL[1])
+
+
+def test_thumbnail_cache_never_grows_past_its_limit(grid):
+    canvas = grid.grid_canvas
+    loaded = set()
+    for top in range(0, canvas.scroll_height(), canvas.height):
+        canvas.scroll_to(top)
+        load_thumbnails(grid)
+        loaded.update(visible_ids(grid))
+        assert len(grid._thumbnails) <= THUMBNAIL_CACHE_SIZE
+
+    assert len(loaded) > THUMBNAIL_CACHE_SIZE
+    assert len(grid._thumbnails) == THUMBNAIL_CACHE_SIZE
+    assert all(cell.photo is not None for cell in grid.grid_cells if cell.pokemon_id is not None)
+    assert 1 not in grid._thumbnails  # the oldest went first
+
+
+def test_thumbnail_loads_wait_for_scrolling_to_pause(grid):
+    canvas = grid.grid_canvas
+    for top in range(0, 20 * GRID_CELL[1], GRID_CELL[1]):
+        canvas.scroll_to(top)
+
+    assert grid.root.pending().count(grid.load_visible_thumbnails) == 1
+    assert not grid.thumbnailer.pending
+
+
+def test_requests_for_cells_scrolled_away_are_cancelled(grid):
+    canvas = grid.grid_canvas
+    grid.root.run_after()
+    first_view = dict(grid._thumbnail_futures)
+    assert sorted(first_view) == sorted(visible_ids(grid))
+    assert all(not future.done() for future in first_view.values())
+
+    canvas.scroll_to(50 * GRID_CELL[1])
+    grid.root.run_after()
+
+    assert all(future.cancelled() for future in first_view.values())
+    assert sorted(grid._thumbnail_futures) == sorted(visible_ids(grid))
+    assert not set(first_view) & set(grid._thumbnail_futures)
+
+    grid.thumbnailer.run_pending()
+    grid._drain_results()
+    assert set(grid._thumbnails) == set(visible_ids(grid))
+    assert not grid._thumbnail_futures
+
+
+def test_a_search_still_queued_is_cancelled_by_the_next(app, searches):
+    first = search(app, "1")
+    search(app, "2")
+    app.executor.run_pending()
+    app._drain_results()
+
+    assert first.cancelled()
+    assert [pokemon_id for pokemon_id, _ in searches] == [2]
+
+
+def test_results_of_superseded_searches_are_discarded(app, searches, monkeypatch):
+    errors = []
+    monkeypatch.setattr(pokedex_gui.messagebox, "showerror", lambda *args: errors.append(args))
+
+    search(app, "1")
+    app.executor.run_pending()  # finishes before the next search, but isn't delivered yet
+    search(app, "2")
+    app.executor.run_pending()
+    app._drain_results()
+    assert [pokemon_id for pokemon_id, _ in searches] == [2]
+
+    def fail(query, priority=None):
+        raise RuntimeError("offline")
+
+    monkeypatch.setattr(app, "load_search_result", fail)
+    search(app, "3")
+    app.executor.run_pending()
+    monkeypatch.setattr(app, "load_search_result", lambda query, priority=None: (record(query), None, None))
+    search(app, "4")
+    app.executor.run_pending()
+    app._drain_results()
+
+    assert [pokemon_id for pokemon_id, _ in searches] == [2, 4]
+    assert errors == []  # the stale failure is dropped too
+    assert app.status_label.options["text"] == ""
+
+
+def test_results_reach_their_callbacks_only_on_the_tk_thread(app, searches):
+    app.executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        search(app, "25").result(timeout=10)
+    finally:
+        app.executor.shutdown(wait=True)
+    assert searches == []  # finished on the worker, waiting in the queue
+    assert app.status_label.options["text"] == "Searching for '25'..."
+
+    app.root.scheduled.clear()
+    app._drain_results()
+
+    assert searches == [(25, threading.get_ident())]
+    assert app.root.pending() == [app._drain_results]
+    assert list(app.root.scheduled.values())[0][0] == 16
+
+
+def test_prefetches_are_cancelled_by_the_next_search(app, prefetches):
+    search_and_show(app, "25")
+    earlier = [future for _, future in app._prefetch_futures]
+    assert app._prefetching == neighbours(25)
+    assert len(earlier) == len(PREFETCH_OFFSETS)
+
+    search_and_show(app, "100")
+    assert all(future.cancelled() for future in earlier)
+    assert app._prefetching == neighbours(100)
+
+    app.prefetcher.run_pending()
+    app._drain_results()
+    assert app._prefetching == set()
+    assert set(app._sprites) == {25, 100} | neighbours(100)  # none of 25's neighbours
+
+
+def test_prefetch_bookkeeping_survives_errors(app, prefetches):
+    prefetches.update({24, 26})
+    search_and_show(app, "25")
+    app.prefetcher.run_pending()
+    app._drain_results()
+
+    assert app._prefetching == set()
+    assert set(app._sprites) == {23, 25, 27}
+
+    prefetches.clear()  # back online: the failed neighbours are tried again
+    search_and_show(app, "25")
+    assert app._prefetching == {24, 26}
+    app.prefetcher.run_pending()
+    app._drain_results()
+    assert set(app._sprites) == {23, 24, 25, 26, 27}
+
+
+def test_sprite_cache_keeps_the_most_recently_used(app):
+    image = Image.new("RGBA", (4, 4))
+    for number in range(1, SPRITE_CACHE_SIZE + 1):
+        app.sprite_photo(record(number), image)
+    assert app.sprite_photo(record(1)) is not None  # a hit moves it to the back
+
+    for number in range(SPRITE_CACHE_SIZE + 1, SPRITE_CACHE_SIZE + 11):
+        app.sprite_photo(record(number), image)
+
+    assert len(app._sprites) == SPRITE_CACHE_SIZE
+    assert 1 in app._sprites
+    assert not set(range(2, 12)) & set(app._sprites)
+    assert app.sprite_photo(record(2)) is None  # evicted: loaded again next time
+
+
+def test_not_found_suggestions_are_looked_up_on_the_worker(app, monkeypatch):
+    import requests
+
+    errors, lookups = [], []
+    monkeypatch.setattr(pokedex_gui.messagebox, "showerror", lambda *args: errors.append(args))
+    monkeypatch.setattr(pokedex_gui, "suggest_names", lambda query: lookups.append(query) or ["mew"])
+
+    def not_found(query, priority=None):
+        error = requests.exceptions.HTTPError("404")
+        if query == "charm":
+            error.suggestions = ["charmander", "charmeleon"]  # attached by the name index
+        raise error
+
+    monkeypatch.setattr(pokedex_gui, "load_pokemon_data", not_found)
+    search(app, "charm")
+    app.executor.run_pending()
+    app._drain_results()
+    assert lookups == []
+    assert "Did you mean: charmander, charmeleon?" in errors[-1][1]
+
+    search(app, "mewz")
+    app.executor.run_pending()
+    assert lookups == ["mewz"]  # on the worker, before the Tk thread sees the error
+    app._drain_results()
+    assert lookups == ["mewz"]
+    assert "Did you mean: mew?" in errors[-1][1]
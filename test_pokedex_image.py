@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex memory-mapped dex image.
+Run with: python -m pytest test_pokedex_image.py
+"""
+
+import pytest
+
+from mock_pokeapi import synthetic_pokemon
+from pokedex_image import DexImage, ImageError, write_image
+from pokedex_model import Pokemon
+from pokedex_snapshot import Snapshot
+
+RECORDS = [Pokemon.from_api(synthetic_pokemon(number)) for number in (25, 1, 150, 6)]
+
+
+def test_round_trip_and_lookups(tmp_path):
+    path = str(tmp_path / "dex.img")
+    assert write_image(RECORDS, path, synced_at=123.5) == 4
+
+    image = DexImage(path)
+    assert len(image) == 4
+    assert image.synced_at == 123.5
+    assert image.ids() == [1, 6, 25, 150]
+    assert [record.to_dict() for record in image.records()] == \
+        [record.to_dict() for record in sorted(RECORDS, key=lambda record: record.id)]
+
+    assert image.get_pokemon(25).name == "pikachu"
+    assert image.get_pokemon(" Charizard ").id == 6
+    assert image.get_pokemon("mewtwo").abilities == RECORDS[2].abilities
+    assert image.get_pokemon(151) is None
+    assert image.get_pokemon("missingno") is None
+    image.close()
+    assert image._map.closed  # ids() and names() left no views of the map behind
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    path = tmp_path / "dex.img"
+    path.write_bytes(b"SQLite format 3\x00" + bytes(100))
+    with pytest.raises(ImageError):
+        DexImage(str(path))
+
+    write_image(RECORDS, str(path))
+    path.write_bytes(path.read_bytes()[:100])
+    with pytest.raises(ImageError):
+        DexImage(str(path))
+
+
+def test_sync_writes_image_shared_by_stat_matrix(mock_api, cache_dir):
+    np = pytest.importorskip("numpy")
+    from pokedex_stats import StatMatrix
+
+    Snapshot().sync()
+    image = DexImage(str(cache_dir / "dex.img"))
+    assert len(image) == 151
+
+    matrix = StatMatrix.from_image(image)
+    assert np.shares_memory(matrix.stats, image.array())
+    assert matrix.stats[matrix.row_of("pikachu")][0] == mock_api.pokemon[25]["stats"][0]["base_stat"]
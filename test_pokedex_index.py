@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for local name resolution and suggestions.
+Run with: python -m pytest test_pokedex_index.py
+"""
+
+import pytest
+import requests
+
+from pokedex_index import NameIndex, PrefixTrie, normalize_name
+
+ENTRIES = [
+    (25, "pikachu"), (26, "raichu"), (83, "farfetchd"), (122, "mr-mime"),
+    (250, "ho-oh"), (386, "deoxys-normal"), (669, "flabebe"),
+    (10001, "deoxys-attack"), (10026, "raichu-alola"), (29, "nidoran-f"),
+]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(ENTRIES)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Mr. Mime", "mr-mime"),
+    ("Farfetch'd", "farfetchd"),
+    ("Flabébé", "flabebe"),
+    ("Nidoran♀", "nidoran-f"),
+    ("  ho oh ", "ho-oh"),
+])
+def test_normalize_name(text, expected):
+    assert normalize_name(text) == expected
+
+
+def test_lookup_exact_names_ids_and_default_forms(index):
+    assert index.lookup("pikachu") == 25
+    assert index.lookup("25") == 25
+    assert index.lookup(10026) == 10026
+    assert index.lookup("mr mime") == 122
+    assert index.lookup("deoxys") == 386
+    assert index.lookup("9999") is None
+
+
+def test_typos_are_corrected_or_suggested(index):
+    assert index.resolve("pikachuu") == (25, [])
+    assert index.resolve("picachu") == (25, [])
+    assert index.resolve("raich") == (26, [])
+    # Too close to call: ask rather than guess.
+    assert index.resolve("raichu-a") == (None, ["raichu", "raichu-alola", "pikachu"])
+
+    assert index.resolve("zzzzzz") == (None, [])
+    assert index.resolve("9999") == (None, [])
+
+
+def test_lookups_resolve_before_any_http(mock_api):
+    from pokedex import load_pokemon_data
+    from pokedex_index import get_name_index
+
+    get_name_index()
+    mock_api.hits.clear()
+
+    assert load_pokemon_data("Pikachuu").name == "pikachu"
+    with pytest.raises(requests.exceptions.HTTPError):
+        load_pokemon_data("definitely-not-a-pokemon")
+
+    assert list(mock_api.hits) == ["/api/v2/pokemon/25"]
+
+
+def test_failed_index_build_is_retried_after_a_delay(cache_dir, monkeypatch):
+    import pokedex_index
+
+    built = NameIndex(ENTRIES)
+    outcomes = [requests.exceptions.ConnectionError("offline"), built]
+    calls = []
+
+    def build():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(pokedex_index, "build_name_index", build)
+    assert pokedex_index.get_name_index() is None
+    assert pokedex_index.get_name_index() is None
+    assert len(calls) == 1
+
+    monkeypatch.setattr(pokedex_index, "_name_index_retry_at", 0.0)
+    assert pokedex_index.get_name_index() is built
+    assert pokedex_index.get_name_index() is built
+    assert len(calls) == 2
+
+
+def test_unexpected_index_errors_are_not_swallowed(cache_dir, monkeypatch):
+    import pokedex_index
+
+    def build():
+        raise TypeError("bug")
+
+    monkeypatch.setattr(pokedex_index, "build_name_index", build)
+    with pytest.raises(TypeError):
+        pokedex_index.get_name_index()
+
+
+def test_rejected_names_carry_their_suggestions(mock_api):
+    from pokedex import load_pokemon_data
+
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        load_pokemon_data("charm")
+    assert error.value.suggestions[:2] == ["charmander", "charmeleon"]
+
+
+def test_not_found_message_suggests_names(mock_api, capsys):
+    from pokedex import fetch_pokemon_data
+
+    assert fetch_pokemon_data("charm") is None
+    assert "did you mean: charmander, charmeleon" in capsys.readouterr().out.lower()
+
+
+def test_prefix_trie_keeps_insertion_order_and_limit():
+    trie = PrefixTrie(limit=2)
+    for word in ["pichu", "pikachu", "pidgey", "raichu"]:
+        trie.insert(word, word)
+
+    assert trie.complete("pi") == ["pichu", "pikachu"]
+    assert trie.complete("pik") == ["pikachu"]
+    assert trie.complete("x") == []
+
+
+def test_complete_names_and_ids(index):
+    assert index.complete("r") == [(26, "raichu"), (10026, "raichu-alola")]
+    assert index.complete("Mr. M") == [(122, "mr-mime")]
+    assert index.complete("25") == [(25, "pikachu"), (250, "ho-oh")]
+    assert index.complete("") == []
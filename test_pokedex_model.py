@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact Pokémon record model.
+Run with: python -m pytest test_pokedex_model.py
+"""
+
+import json
+
+from mock_pokeapi import synthetic_pokemon
+from pokedex_model import STAT_NAMES, Pokemon, project_pokemon_body
+
+
+def test_from_api_projects_displayed_fields():
+    payload = synthetic_pokemon(6)
+    # PokeAPI doesn't guarantee list order; slots and stat names decide it.
+    payload["stats"].reverse()
+    payload["sprites"]["front_default"] = "https://example.com/6.png"
+
+    pokemon = Pokemon.from_api(payload)
+
+    assert pokemon.id == 6
+    assert pokemon.name == "charizard"
+    assert pokemon.types == tuple(t["type"]["name"] for t in synthetic_pokemon(6)["types"])
+    assert list(pokemon.stats) == [
+        {s["stat"]["name"]: s["base_stat"] for s in payload["stats"]}[name]
+        for name in STAT_NAMES
+    ]
+    assert pokemon.regular_abilities == ["overgrow"]
+    assert pokemon.hidden_abilities == ["chlorophyll"]
+    assert pokemon.sprite_url == "https://example.com/6.png"
+    assert pokemon.species_id == 6
+    assert not hasattr(pokemon, "__dict__")
+
+
+def test_compact_encoding_round_trips_and_is_small():
+    body = json.dumps(synthetic_pokemon(25)).encode()
+
+    compact = project_pokemon_body(body)
+
+    assert Pokemon.from_json(compact) == Pokemon.from_json(body)
+    assert len(compact) * 50 < len(body)
+
+
+def test_to_dict_is_pokeapi_shaped():
+    data = Pokemon.from_api(synthetic_pokemon(25)).to_dict()
+
+    assert data["name"] == "pikachu"
+    assert data["types"][0]["type"]["name"] == synthetic_pokemon(25)["types"][0]["type"]["name"]
+    assert data["stats"][0]["stat"]["name"] == "hp"
+    assert data["sprites"]["front_default"] is None
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for PyDex's machine-readable output formats.
+Run with: python -m pytest test_pokedex_output.py
+"""
+
+import csv
+import io
+import json
+
+from mock_pokeapi import synthetic_pokemon
+from pokedex_model import Pokemon
+from pokedex_output import CSV_FIELDS, BlockWriter, RecordWriter
+
+_POKEMON = [Pokemon.from_api(synthetic_pokemon(number)) for number in (1, 6, 25)]
+
+
+class _CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def _write_all(format, pokemon=_POKEMON):
+    stream = _CountingStream()
+    records = RecordWriter(format, BlockWriter(stream))
+    for entry in pokemon:
+        records.write(entry)
+    records.close()
+    return stream
+
+
+def test_block_writer_writes_in_blocks():
+    stream = _CountingStream()
+    out = BlockWriter(stream, block_size=100)
+    for _ in range(45):
+        out.write("0123456789\n")
+    assert stream.writes == 4  # every 10 lines
+    out.flush()
+    assert stream.getvalue() == "0123456789\n" * 45
+    assert stream.writes == 5
+
+
+def test_formats_parse_back():
+    ndjson = _write_all("ndjson")
+    assert ndjson.writes == 1
+    lines = ndjson.getvalue().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["bulbasaur", "charizard", "pikachu"]
+    assert json.loads(lines[1])["stats"]["hp"] == _POKEMON[1].stats[0]
+
+    array = _write_all("json").getvalue()
+    assert len(array.splitlines()) == 4  # one element per line, then "]"
+    assert [record["id"] for record in json.loads(array)] == [1, 6, 25]
+    assert json.loads(_write_all("json", []).getvalue()) == []
+
+    rows = list(csv.DictReader(io.StringIO(_write_all("csv").getvalue())))
+    assert tuple(rows[0]) == CSV_FIELDS
+    assert rows[2]["name"] == "pikachu"
+    assert rows[2]["hidden_abilities"] == "chlorophyll"
+    assert float(rows[2]["weight_kg"]) == _POKEMON[2].weight / 10
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for drawing random Pokémon from the ID index.
+Run with: python -m pytest test_pokedex_sample.py
+"""
+
+import pytest
+
+import pokedex_client
+from mock_pokeapi import MockPokeAPI, synthetic_dex, synthetic_pokemon
+from pokedex import fetch_many
+from pokedex_sample import sample_ids
+
+
+def test_seeded_draws_are_repeatable_and_distinct(mock_api):
+    first = sample_ids(20, seed=42)
+    assert first == sample_ids(20, seed=42)
+    assert len(set(first)) == 20
+    assert set(first) <= set(range(1, 152))
+    assert sample_ids(20, seed=43) != first
+
+    # Asking for more than there are draws each one once.
+    assert sorted(sample_ids(500, seed=1)) == list(range(1, 152))
+    with pytest.raises(ValueError):
+        sample_ids(0)
+
+
+def test_filters(mock_api):
+    fire = sample_ids(10, seed=5, types=["fire"])
+    for _, data, _ in fetch_many(fire):
+        assert "fire" in data.types
+
+    grass = sample_ids(5, seed=5, generation="i", types=["grass"])
+    assert grass == sample_ids(5, seed=5, generation="generation-i", types=["grass"])
+    for _, data, _ in fetch_many(grass):
+        assert "grass" in data.types and data.id <= 151
+
+    with pytest.raises(ValueError):
+        sample_ids(1, types=["plasma"])
+    with pytest.raises(ValueError):
+        sample_ids(1, generation="x")
+
+
+def test_alternate_forms_come_from_the_listing(cache_dir, monkeypatch):
+    pokemon = synthetic_dex(3)
+    pokemon[10033] = synthetic_pokemon(10033, name="venusaur-mega")
+    pokemon[10033]["species"] = {"name": "venusaur", "url": "/api/v2/pokemon-species/3/"}
+    with MockPokeAPI(pokemon) as api:
+        monkeypatch.setattr(pokedex_client, "API_BASE_URL", api.base_url)
+        pokedex_client.configure(backoff=0.001, rate=0)
+        try:
+            assert sorted(sample_ids(10, seed=0)) == [1, 2, 3, 10033]
+            # Generations list species, so forms are left out.
+            assert sorted(sample_ids(10, seed=0, generation=1)) == [1, 2, 3]
+        finally:
+            pokedex_client.configure()
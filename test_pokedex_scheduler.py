@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex request scheduler.
+Run with: python -m pytest test_pokedex_scheduler.py
+"""
+
+import threading
+import time
+
+import pokedex_client
+from pokedex import fetch_many, load_pokemon_data
+from pokedex_client import parse_retry_after
+from pokedex_scheduler import BULK, INTERACTIVE, Scheduler
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_token_bucket_limits_the_rate():
+    scheduler = Scheduler(rate=50, burst=5, concurrency=10)
+    start = time.monotonic()
+    for _ in range(15):
+        with scheduler.slot():
+            pass
+    # 5 from the burst, then 10 more at 50 per second.
+    assert time.monotonic() - start >= 0.18
+
+
+def test_interactive_requests_jump_the_queue():
+    scheduler = Scheduler(rate=0, concurrency=1, reserved=0)
+    order = []
+
+    def request(name, priority):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    scheduler.acquire()  # occupy the only slot
+    threads = [_start(request, f"bulk{number}", BULK) for number in range(3)]
+    _wait_for(lambda: scheduler.waiting == 3)
+    threads.append(_start(request, "interactive", INTERACTIVE))
+    _wait_for(lambda: scheduler.waiting == 4)
+    scheduler.release()
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "bulk0", "bulk1", "bulk2"]
+
+
+def test_bulk_work_leaves_reserved_slots_free():
+    scheduler = Scheduler(rate=0, concurrency=3, reserved=1)
+    scheduler.acquire(BULK)
+    scheduler.acquire(BULK)
+    blocked = _start(scheduler.acquire, BULK)
+    _wait_for(lambda: scheduler.waiting == 1)
+
+    scheduler.acquire(INTERACTIVE)  # doesn't wait
+    assert scheduler.active == 3 and blocked.is_alive()
+    scheduler.release()
+    scheduler.release()
+    blocked.join(5)
+    assert scheduler.active == 2
+
+
+def test_retry_after_pauses_every_request():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+
+    scheduler = Scheduler(rate=0, concurrency=4)
+    scheduler.pause(0.2)
+    start = time.monotonic()
+    with scheduler.slot(INTERACTIVE):
+        pass
+    assert time.monotonic() - start >= 0.18
+
+
+def test_lookups_stay_fast_during_bulk_work(mock_api):
+    mock_api.latency = 0.05
+    pokedex_client.configure(backoff=0.001, rate=0, pool_size=4)
+
+    bulk = _start(lambda: list(fetch_many(range(1, 61), workers=8, use_cache=False)))
+    _wait_for(lambda: pokedex_client.get_client().scheduler.waiting > 0)
+
+    start = time.monotonic()
+    assert load_pokemon_data("pikachu", use_cache=False).id == 25
+    elapsed = time.monotonic() - start
+    bulk.join(30)
+
+    # 60 bulk requests take ~1.5 s on the two slots bulk work may use; the
+    # lookup only waits for its own request.
+    assert elapsed < 0.5
+    assert mock_api.max_in_flight <= 4
+
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex offline snapshot.
+Run with: python -m pytest test_pokedex_snapshot.py
+"""
+
+import pytest
+import requests
+
+import pokedex_snapshot
+from pokedex_snapshot import Snapshot
+
+
+@pytest.fixture
+def snapshot(mock_api):
+    return Snapshot()
+
+
+def pokemon_hits(api):
+    return sum(count for path, count in api.hits.items() if path.startswith("/api/v2/pokemon/"))
+
+
+def test_sync_downloads_every_listed_pokemon(mock_api, snapshot):
+    result = snapshot.sync(workers=4)
+
+    assert result.total == result.downloaded == 151
+    assert not result.failed
+    assert snapshot.is_complete
+    assert snapshot.get_pokemon("pikachu").id == 25
+    assert snapshot.get_pokemon(151).name == "mew"
+
+
+def test_resync_only_downloads_changed_entries(mock_api, snapshot):
+    snapshot.sync()
+    mock_api.pokemon[25]["stats"][0]["base_stat"] = 250
+
+    result = snapshot.sync()
+
+    assert result.downloaded == 1
+    assert result.unchanged == 150
+    assert snapshot.get_pokemon(25).stats[0] == 250
+
+
+def test_interrupted_sync_resumes(mock_api, snapshot, monkeypatch):
+    # Keep 10 and 20 in the listing but make their downloads fail.
+    listing = pokedex_snapshot.fetch_listing()
+    monkeypatch.setattr(pokedex_snapshot, "fetch_listing", lambda: listing)
+    flaky = {pokemon_id: mock_api.pokemon.pop(pokemon_id) for pokemon_id in (10, 20)}
+
+    first = snapshot.sync()
+    assert len(first.failed) == 2
+    assert not snapshot.is_complete
+
+    mock_api.pokemon.update(flaky)
+    mock_api.hits.clear()
+    second = snapshot.sync()
+
+    assert second.skipped == 149
+    assert second.downloaded == 2
+    assert pokemon_hits(mock_api) == 2
+    assert snapshot.is_complete
+
+
+def test_lookups_use_the_snapshot_without_network(mock_api, snapshot):
+    from pokedex import get_random_pokemon_id, load_pokemon_data
+
+    snapshot.sync()
+    mock_api.hits.clear()
+
+    assert load_pokemon_data("charizard").id == 6
+    assert 1 <= get_random_pokemon_id() <= 151
+    with pytest.raises(requests.exceptions.HTTPError):
+        load_pokemon_data("missingno")
+    assert not mock_api.hits
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex stat matrix queries.
+Run with: python -m pytest test_pokedex_stats.py
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from pokedex import parse_arguments
+from pokedex_model import Pokemon
+from pokedex_snapshot import Snapshot
+from pokedex_stats import StatMatrix, build_stat_matrix
+
+RECORDS = [
+    Pokemon(25, "pikachu", ["electric"], [35, 55, 40, 50, 50, 90], [], 4, 60),
+    Pokemon(135, "jolteon", ["electric"], [65, 65, 60, 110, 95, 130], [], 8, 245),
+    Pokemon(6, "charizard", ["fire", "flying"], [78, 84, 78, 109, 85, 100], [], 17, 905),
+    Pokemon(149, "dragonite", ["dragon", "flying"], [91, 134, 95, 100, 100, 80], [], 22, 2100),
+    Pokemon(642, "thundurus-incarnate", ["electric", "flying"], [79, 115, 70, 125, 80, 111], [], 15, 610),
+]
+
+
+@pytest.fixture
+def matrix():
+    return StatMatrix.from_records(RECORDS)
+
+
+def names(matrix, rows):
+    return [str(matrix.names[row]) for row in rows]
+
+
+def test_columns_and_derived_total(matrix):
+    assert list(matrix.ids) == [6, 25, 135, 149, 642]
+    assert matrix.stats.shape == (5, 6)
+    assert matrix.bst[matrix.row_of("pikachu")] == 320
+    assert matrix.types_of(matrix.row_of(6)) == ("fire", "flying")
+    assert list(matrix.column("spe")) == list(matrix.column("speed"))
+
+
+def test_where_sort_and_top(matrix):
+    rows = matrix.query(where="speed>100 and type=electric", sort="-attack")
+    assert names(matrix, rows) == ["thundurus-incarnate", "jolteon"]
+
+    rows = matrix.query(where="type=dragon or bst<400 and type!=flying", sort="id")
+    assert names(matrix, rows) == ["pikachu", "dragonite"]
+
+    assert names(matrix, matrix.query(top=2)) == ["dragonite", "thundurus-incarnate"]
+
+
+def test_invalid_queries_raise_value_error(matrix):
+    for expression in ("speed>>100", "luck>3", "type=plasma", "type>fire", "speed>fast"):
+        with pytest.raises(ValueError):
+            matrix.query(where=expression)
+
+
+def test_matrix_is_saved_and_rebuilt_after_a_resync(mock_api, cache_dir):
+    snapshot = Snapshot()
+    snapshot.sync()
+    path = str(cache_dir / "stats.npz")
+
+    first = build_stat_matrix(snapshot, path)
+    assert len(first) == 151
+    assert (cache_dir / "stats.npz").exists()
+
+    mock_api.pokemon[25]["stats"][5]["base_stat"] = 200
+    snapshot.sync()
+    second = build_stat_matrix(snapshot, path)
+    assert second.stats[second.row_of(25)][5] == 200
+
+
+def test_descending_sort_key_parses_without_equals_sign():
+    args = parse_arguments(["--where", "type=fire", "--sort", "-attack", "--top", "3"])
+    assert args.sort == "-attack"
+    assert args.top == 3
+
+
+def test_nearest_ranks_by_stat_distance(matrix):
+    jolteon = matrix.row_of("jolteon")
+
+    rows, distances = matrix.nearest(jolteon, k=2)
+    assert names(matrix, rows) == ["charizard", "thundurus-incarnate"]
+    assert list(distances) == sorted(distances)
+
+    rows, _ = matrix.nearest(jolteon, k=10, metric="cosine", normalize=True)
+    assert len(rows) == 4
+    assert jolteon not in rows
+
+
+def test_pairwise_distances_match_single_queries(matrix):
+    for metric in ("euclidean", "cosine"):
+        for normalize in (False, True):
+            pairs = matrix.pairwise_distances(metric, normalize)
+            assert pairs.shape == (5, 5)
+            assert abs(pairs - pairs.T).max() < 1e-9
+            for row in range(len(matrix)):
+                expected = matrix.distances(row, metric, normalize)
+                expected[row] = 0.0
+                assert abs(pairs[row] - expected).max() < 1e-9
+
+    with pytest.raises(ValueError):
+        matrix.nearest(0, metric="manhattan")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for PyDex tracing.
+Run with: python -m pytest test_pokedex_trace.py
+"""
+
+import json
+
+import pytest
+
+import pokedex_trace
+from pokedex import load_pokemon_data
+from pokedex_trace import count, span, traced
+
+
+@pytest.fixture
+def tracing():
+    pokedex_trace.reset()
+    pokedex_trace.enable()
+    yield
+    pokedex_trace.disable()
+    pokedex_trace.reset()
+
+
+def test_nothing_is_recorded_while_disabled():
+    pokedex_trace.reset()
+    with span("ignored") as trace:
+        trace.set(status=200)
+    count("ignored")
+    assert pokedex_trace.summary() == {"spans": {}, "counters": {}}
+
+
+def test_spans_and_counters_are_aggregated(tracing):
+    @traced("work")
+    def work():
+        return 42
+
+    assert work() == 42
+    with pytest.raises(KeyError):
+        with span("failing"):
+            raise KeyError("x")
+    count("items", 3)
+    count("items")
+
+    data = pokedex_trace.summary()
+    assert data["spans"]["work"]["count"] == 1
+    assert data["spans"]["failing"]["count"] == 1
+    assert data["counters"] == {"items": 4}
+    assert "work" in pokedex_trace.format_summary()
+
+
+def test_lookups_record_cache_and_http_activity(mock_api, tracing, tmp_path):
+    load_pokemon_data("pikachu")
+    load_pokemon_data("pikachu")
+
+    data = pokedex_trace.summary()
+    assert data["spans"]["lookup"]["count"] == 2
+    assert data["counters"]["cache.miss"] == 2  # the listing and pikachu
+    assert data["counters"]["cache.hit"] == 1
+    assert data["counters"]["http.bytes"] > 0
+
+    path = tmp_path / "trace.json"
+    pokedex_trace.export(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    http = [event for event in events if event["name"] == "http.get"]
+    assert http and http[0]["ph"] == "X" and http[0]["args"]["status"] == "200"
+
+
+def test_network_spans_only_patch_urllib3_and_are_removed_on_disable(mock_api):
+    import socket
+    from urllib.parse import urlsplit
+
+    from urllib3.util import connection
+
+    original = connection.create_connection
+    getaddrinfo = socket.getaddrinfo
+    pokedex_trace.reset()
+    pokedex_trace.enable()
+    try:
+        assert connection.create_connection is not original
+        assert socket.getaddrinfo is getaddrinfo
+        sock = connection.create_connection(("localhost", urlsplit(mock_api.base_url).port))
+        sock.close()
+        with pytest.raises(OSError):
+            connection.create_connection(("127.0.0.1", 1))
+
+        data = pokedex_trace.summary()
+        assert data["spans"]["net.dns"]["count"] == 2
+        assert data["counters"]["net.connections"] >= 2
+    finally:
+        pokedex_trace.disable()
+        pokedex_trace.reset()
+    assert connection.create_connection is original
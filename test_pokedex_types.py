@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the PyDex type effectiveness chart.
+Run with: python -m pytest test_pokedex_types.py
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import pokedex_types
+from mock_pokeapi import TYPE_CHART
+from pokedex_model import TYPE_NAMES
+from pokedex_types import TypeChart, fetch_type_relations
+
+
+@pytest.fixture
+def chart():
+    relations = {name: {"double_damage_to": double, "half_damage_to": half, "no_damage_to": none}
+                 for name, (double, half, none) in TYPE_CHART.items()}
+    return TypeChart.from_relations(relations)
+
+
+def test_dual_type_multipliers_combine(chart):
+    matchups = chart.matchups(["fire", "flying"])
+    assert matchups[4.0] == ["rock"]
+    assert set(matchups[2.0]) == {"water", "electric"}
+    assert set(matchups[0.25]) == {"bug", "grass"}
+    assert matchups[0.0] == ["ground"]
+
+
+def test_team_defense_matches_single_lookups(chart):
+    team = [("fire", "flying"), ("water",), ("ghost", "dark")]
+    defense = chart.team_defense(team)
+    assert defense.shape == (3, 18)
+    for row, types in enumerate(team):
+        assert (defense[row] == chart.defense(types)).all()
+
+
+def test_coverage_checks_every_type_combination(chart):
+    assert len(chart.combos) == 18 + 18 * 17 // 2
+
+    best = chart.coverage(["normal"])
+    assert best.max() == 1.0
+    ghost = next(index for index, combo in enumerate(chart.combos)
+                 if chart.combo_names(combo) == ("ghost",))
+    assert best[ghost] == 0.0
+
+    # Every single type is hit super effectively by at least one type.
+    best = chart.coverage(TYPE_NAMES)
+    singles = chart.combos[:, 1] == len(TYPE_NAMES)
+    assert (best[singles] == 2.0).all()
+
+
+def test_relations_are_fetched_once_and_cached(mock_api, monkeypatch):
+    relations = fetch_type_relations()
+    assert relations["electric"]["no_damage_to"] == ["ground"]
+    type_hits = sum(count for path, count in mock_api.hits.items() if "/type/" in path)
+    assert type_hits == 18
+
+    monkeypatch.setattr(pokedex_types, "_type_chart", None)
+    pokedex_types.get_type_chart()
+    assert sum(count for path, count in mock_api.hits.items() if "/type/" in path) == 18
+
+
+def test_load_type_chart_honours_cache_flags(mock_api, monkeypatch):
+    from pokedex import load_type_chart
+
+    def type_hits():
+        return sum(count for path, count in mock_api.hits.items() if "/type/" in path)
+
+    monkeypatch.setattr(pokedex_types, "_type_chart", None)
+    shared = load_type_chart()
+    assert load_type_chart() is shared
+    assert type_hits() == 18
+
+    assert load_type_chart(refresh=True) is not shared
+    assert type_hits() == 36  # revalidated
+    assert load_type_chart(use_cache=False) is not shared
+    assert type_hits() == 54
+    assert load_type_chart() is shared